@@ -0,0 +1,11 @@
+"""鞋垫数据链路的性能基准：无需硬件，输出 JSON 并与基线对比。"""
+
+from .runner import BenchmarkResult, compare_with_baseline, load_results, run_benchmark, save_results
+
+__all__ = [
+    "BenchmarkResult",
+    "compare_with_baseline",
+    "load_results",
+    "run_benchmark",
+    "save_results",
+]
@@ -0,0 +1,60 @@
+"""命令行入口：python -m benchmarks [--baseline PATH] [--tolerance 0.2] [--require-baseline] [--update-baseline]。"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .cases import SUITES, run_suites
+from .runner import compare_with_baseline, load_results, save_results
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="鞋垫数据链路性能基准")
+    parser.add_argument("suites", nargs="*", help=f"要运行的基准组（{', '.join(SUITES)}），缺省全部")
+    parser.add_argument("--output", type=Path, help="结果 JSON 输出路径，缺省仅打印")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线 JSON 路径")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的吞吐下降比例")
+    parser.add_argument("--scale", type=float, default=1.0, help="迭代次数缩放系数")
+    parser.add_argument("--update-baseline", action="store_true", help="将本次结果写为新的基线")
+    parser.add_argument(
+        "--require-baseline",
+        action="store_true",
+        help="找不到基线时以返回码 2 失败而非跳过对比，用于 CI 等回退门禁",
+    )
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"未知的基准组: {', '.join(unknown)}")
+
+    results = run_suites(args.suites, scale=args.scale)
+    for result in results:
+        print(f"{result.name:32s} {result.ops_per_sec:14.1f} ops/s {result.mean_us:12.2f} us/op")
+    if args.output:
+        save_results(results, args.output)
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"基线已更新: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        if args.require_baseline:
+            print(f"未找到基线 {args.baseline}（可使用 --update-baseline 在本机生成）", file=sys.stderr)
+            return 2
+        print(f"未找到基线 {args.baseline}，跳过对比（可使用 --update-baseline 生成）")
+        return 0
+    report = compare_with_baseline(results, load_results(args.baseline), tolerance=args.tolerance)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    regressions = [item["name"] for item in report if item["status"] == "regression"]
+    if regressions:
+        print(f"性能回退: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""基准项定义：使用仓库自带的标定 CSV 与合成帧，覆盖解析、校准、记录与总线分发。"""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from bus.event_bus import EventBus
+from hardware.insole.constants import COLS, LEFT_PORT, RIGHT_PORT, ROWS
+from hardware.insole.core.calibration import fit_calibration_from_csv
+from hardware.insole.core.parser import parse_frame_to_matrix
+from hardware.insole.core.pressure import apply_calibration_grid, compile_calibration_grid, compute_pressure_matrix
+from hardware.insole.core.processor import InsoleProcessor
+from hardware.insole.io.logger import DataLogger
+
+from .runner import BenchmarkResult, run_benchmark
+
+CALIBRATION_DIR = Path(__file__).resolve().parents[1] / "hardware" / "insole" / "calibrate_data"
+LEFT_CSV = CALIBRATION_DIR / "Calibratedata_left.csv"
+RIGHT_CSV = CALIBRATION_DIR / "Calibratedata_right.csv"
+
+
+def synthetic_frames(count: int, *, seed: int = 0) -> List[bytes]:
+    """生成 AA..BB 格式的合成帧，约一半点位为有效压力。"""
+    rng = np.random.default_rng(seed)
+    frames: List[bytes] = []
+    for _ in range(count):
+        values = rng.integers(0, 4096, ROWS * COLS)
+        values[rng.random(ROWS * COLS) < 0.5] = 0
+        frames.append(("AA," + ",".join(str(v) for v in values) + ",BB").encode("ascii"))
+    return frames
+
+
+def _cycle(items: List) -> Callable[[], object]:
+    """返回依次循环取出元素的函数。"""
+    state = {"index": 0}
+
+    def _next() -> object:
+        index = state["index"]
+        state["index"] = (index + 1) % len(items)
+        return items[index]
+
+    return _next
+
+
+def bench_parse(scale: float) -> List[BenchmarkResult]:
+    frames = synthetic_frames(64)
+    next_frame = _cycle(frames)
+    texts = [frame.decode("ascii") for frame in frames]
+    next_text = _cycle(texts)
+    number = _scaled(2000, scale)
+    return [
+        run_benchmark("parse.bytes", lambda: parse_frame_to_matrix(next_frame()), number=number),
+        run_benchmark("parse.text", lambda: parse_frame_to_matrix(next_text()), number=number),
+    ]
+
+
+def bench_pressure(scale: float) -> List[BenchmarkResult]:
+    left = fit_calibration_from_csv(LEFT_CSV)
+    right = fit_calibration_from_csv(RIGHT_CSV)
+    matrices = [parse_frame_to_matrix(frame) for frame in synthetic_frames(64)]
+    next_matrix = _cycle(matrices)
+    grid = compile_calibration_grid(True, left, right)
+    stack = np.stack(matrices)
+    return [
+        run_benchmark(
+            "pressure.compute",
+            lambda: compute_pressure_matrix(next_matrix(), True, left, right),
+            number=_scaled(50, scale),
+        ),
+        run_benchmark("pressure.apply_grid", lambda: apply_calibration_grid(next_matrix(), grid), number=_scaled(2000, scale)),
+        run_benchmark(
+            "pressure.apply_grid_batch64",
+            lambda: apply_calibration_grid(stack, grid),
+            number=_scaled(100, scale),
+            ops_per_call=len(matrices),
+        ),
+    ]
+
+
+def bench_calibration(scale: float) -> List[BenchmarkResult]:
+    return [run_benchmark("calibration.fit_csv", lambda: fit_calibration_from_csv(LEFT_CSV), number=_scaled(50, scale))]
+
+
+def bench_processor(scale: float) -> List[BenchmarkResult]:
+    processor = InsoleProcessor(left_csv=LEFT_CSV, right_csv=RIGHT_CSV, left_port=LEFT_PORT, right_port=RIGHT_PORT)
+    frames = synthetic_frames(64)
+    next_frame = _cycle(frames)
+    ports = [LEFT_PORT, RIGHT_PORT] * (len(frames) // 2)
+    return [
+        run_benchmark("processor.process", lambda: processor.process(next_frame(), LEFT_PORT), number=_scaled(2000, scale)),
+        run_benchmark(
+            "processor.process_batch64",
+            lambda: processor.process_batch(frames, ports),
+            number=_scaled(30, scale),
+            ops_per_call=len(frames),
+        ),
+    ]
+
+
+def bench_logger(scale: float) -> List[BenchmarkResult]:
+    matrices = [np.random.default_rng(i).random((ROWS, COLS)) * 10 for i in range(16)]
+    frames_per_session = _scaled(2000, scale)
+
+    def _session() -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            logger = DataLogger(out_dir=Path(tmp), queue_size=frames_per_session + 16)
+            logger.start_session(meta={"benchmark": True})
+            for index in range(frames_per_session):
+                logger.append(index % 2 == 0, matrices[index % len(matrices)], ts=float(index))
+            logger.stop_session(save=True)
+
+    return [
+        run_benchmark("logger.session", _session, number=1, repeat=3, ops_per_call=frames_per_session),
+    ]
+
+
+def bench_bus(scale: float) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+    frame = {"frame_index": 0, "stats": {}, "pressure": None}
+    for engine, prefix in (("pubsub", "bus.publish"), ("native", "bus.publish_native")):
+        for fanout in (1, 5):
+            bus = EventBus(engine=engine)
+            topic = f"benchmark.{engine}.fanout{fanout}"
+            subscriptions = [bus.subscribe(topic, _make_listener()) for _ in range(fanout)]
+            results.append(
+                run_benchmark(f"{prefix}_fanout{fanout}", lambda: bus.publish(topic, frame=frame), number=_scaled(5000, scale))
+            )
+            for subscription in subscriptions:
+                subscription.unsubscribe()
+    # 模式订阅在主题首次出现时解析进分发表，吞吐应与同等数量的精确订阅一致
+    bus = EventBus(engine="native")
+    topic = "benchmark.native.pattern.data"
+    subscriptions = [bus.subscribe(topic, _make_listener()), bus.subscribe("benchmark.#", _make_listener())]
+    results.append(
+        run_benchmark("bus.publish_native_pattern2", lambda: bus.publish(topic, frame=frame), number=_scaled(5000, scale))
+    )
+    for subscription in subscriptions:
+        subscription.unsubscribe()
+    # 开启监听器计时后的分发开销，对照 bus.publish_native_fanout5
+    bus = EventBus(engine="native", metrics=True, slow_listener_ms=5.0)
+    topic = "benchmark.native.metrics.data"
+    subscriptions = [bus.subscribe(topic, _make_listener()) for _ in range(5)]
+    results.append(
+        run_benchmark("bus.publish_native_metrics_fanout5", lambda: bus.publish(topic, frame=frame), number=_scaled(5000, scale))
+    )
+    for subscription in subscriptions:
+        subscription.unsubscribe()
+    return results
+
+
+def _make_listener() -> Callable[..., None]:
+    """为每个订阅生成独立的函数对象，避免总线按同一监听器去重。"""
+
+    def _listener(frame: Dict | None = None, **_: object) -> None:
+        return None
+
+    return _listener
+
+
+def _scaled(number: int, scale: float) -> int:
+    return max(1, int(number * scale))
+
+
+SUITES: Dict[str, Callable[[float], List[BenchmarkResult]]] = {
+    "parse": bench_parse,
+    "pressure": bench_pressure,
+    "calibration": bench_calibration,
+    "processor": bench_processor,
+    "logger": bench_logger,
+    "bus": bench_bus,
+}
+
+
+def run_suites(names: List[str] | Tuple[str, ...] | None = None, *, scale: float = 1.0) -> List[BenchmarkResult]:
+    """按名称执行基准组，缺省执行全部。"""
+    selected = list(names) if names else list(SUITES)
+    results: List[BenchmarkResult] = []
+    for name in selected:
+        results.extend(SUITES[name](scale))
+    return results
@@ -0,0 +1,100 @@
+"""基准测试的计时、结果序列化与基线对比工具。"""
+
+from __future__ import annotations
+
+import json
+import platform
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchmarkResult:
+    """单个基准项的结果，ops_per_sec 取多轮中最快的一轮。"""
+
+    name: str
+    ops_per_sec: float
+    mean_us: float
+    number: int
+    repeat: int
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "BenchmarkResult":
+        """从 JSON 字典恢复结果对象。"""
+        return cls(
+            name=str(payload["name"]),
+            ops_per_sec=float(payload["ops_per_sec"]),
+            mean_us=float(payload["mean_us"]),
+            number=int(payload.get("number", 0)),
+            repeat=int(payload.get("repeat", 0)),
+        )
+
+
+def run_benchmark(
+    name: str,
+    func: Callable[[], Any],
+    *,
+    number: int,
+    repeat: int = 5,
+    ops_per_call: int = 1,
+) -> BenchmarkResult:
+    """重复执行 func，取最快一轮计算吞吐；ops_per_call 用于一次调用处理多帧的场景。"""
+    func()  # 预热，排除首次调用的缓存与导入开销
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    ops = number * ops_per_call
+    best = max(best, 1e-12)
+    return BenchmarkResult(
+        name=name,
+        ops_per_sec=ops / best,
+        mean_us=best / ops * 1e6,
+        number=number,
+        repeat=repeat,
+    )
+
+
+def save_results(results: List[BenchmarkResult], path: Path) -> None:
+    """将结果与运行环境写入 JSON 文件。"""
+    payload = {
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": [asdict(result) for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_results(path: Path) -> Dict[str, BenchmarkResult]:
+    """读取 JSON 结果文件，按名称索引。"""
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return {item["name"]: BenchmarkResult.from_dict(item) for item in payload.get("results", [])}
+
+
+def compare_with_baseline(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    *,
+    tolerance: float = 0.2,
+    tolerances: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """对比当前结果与基线，吞吐低于基线 (1 - tolerance) 倍的项标记为回退。"""
+    tolerances = tolerances or {}
+    report: List[Dict[str, Any]] = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None or reference.ops_per_sec <= 0:
+            report.append({"name": result.name, "status": "new", "ratio": None})
+            continue
+        allowed = tolerances.get(result.name, tolerance)
+        ratio = result.ops_per_sec / reference.ops_per_sec
+        status = "regression" if ratio < 1.0 - allowed else "ok"
+        report.append({"name": result.name, "status": status, "ratio": ratio, "tolerance": allowed})
+    return report
@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+from .bridge import BridgeClient, BusBridge
+from .delivery import COALESCE_MODES, DELIVERY_POLICIES, AsyncDelivery, RateLimiter
 from .event_bus import EventBus, Subscription
 from .topics import TOPIC_REGISTRY, Topics, get_module_topics, register_module_topics
 
 __all__ = [
     "EventBus",
     "Subscription",
+    "AsyncDelivery",
+    "DELIVERY_POLICIES",
+    "RateLimiter",
+    "COALESCE_MODES",
+    "BusBridge",
+    "BridgeClient",
     "Topics",
     "TOPIC_REGISTRY",
     "register_module_topics",
@@ -0,0 +1,484 @@
+"""本地套接字桥：把选定的总线主题通过 Unix 域套接字或本机 TCP 推送给进程外的客户端。
+
+帧格式（小端序），双向相同::
+
+    [0, 7)    body 长度(uint32)、帧类型(uint8)、主题长度(uint16)
+    之后      主题 UTF-8 字节 + body
+
+事件帧（KIND_EVENT）的 body 为 JSON 文档长度(uint32) + JSON 文档 + 二进制数组区；
+消息中的 ndarray 在 JSON 中以 ``{"__ndarray__": [偏移, 字节数], "dtype": ..., "shape": [...]}``
+表示，数据按原始字节放在数组区，34×10 压力矩阵只占 1360 字节。数据类与映射按字段展开。
+
+客户端发送 KIND_SUBSCRIBE / KIND_UNSUBSCRIBE 控制帧，body 为 JSON
+``{"topics": [...], "mode": "queue" | "latest"}``（topics 为字符串列表，结构不符的客户端会被断开）；
+连接建立后服务端先发送 KIND_HELLO，列出可订阅的主题。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import errno
+import json
+import logging
+import os
+import socket
+import stat
+import struct
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .event_bus import EventBus, Subscription
+
+LOG = logging.getLogger(__name__)
+
+BRIDGE_VERSION = 1
+FRAME_HEADER = struct.Struct("<IBH")
+_DOC_LEN = struct.Struct("<I")
+KIND_HELLO = 1
+KIND_EVENT = 2
+KIND_SUBSCRIBE = 3
+KIND_UNSUBSCRIBE = 4
+CLIENT_MODES = ("queue", "latest")
+MAX_CONTROL_BODY = 1 << 16
+_CONTROL_KINDS = (KIND_SUBSCRIBE, KIND_UNSUBSCRIBE)
+_JSON_SCALARS = (str, int, float, bool)
+
+
+def encode_frame(kind: int, topic: str, body: bytes) -> bytes:
+    """按桥接帧格式打包一帧。"""
+    name = topic.encode("utf-8")
+    return FRAME_HEADER.pack(len(body), kind, len(name)) + name + body
+
+
+def encode_event(topic: str, message: Dict[str, Any]) -> bytes:
+    """将一条总线消息编码为事件帧，数组以原始字节附在 JSON 文档之后。"""
+    blobs: List[bytes] = []
+    offset = [0]
+
+    def _convert(value: Any) -> Any:
+        if value is None or type(value) in _JSON_SCALARS:
+            return value
+        if isinstance(value, np.ndarray):
+            data = np.ascontiguousarray(value).tobytes()
+            ref = {"__ndarray__": [offset[0], len(data)], "dtype": value.dtype.str, "shape": list(value.shape)}
+            blobs.append(data)
+            offset[0] += len(data)
+            return ref
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, (str, int, float, bool)):
+            return value
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return {item.name: _convert(getattr(value, item.name)) for item in dataclasses.fields(value) if item.init}
+        if isinstance(value, Mapping):
+            return {str(key): _convert(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [_convert(item) for item in value]
+        return str(value)
+
+    document = json.dumps(_convert(message), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return encode_frame(KIND_EVENT, topic, _DOC_LEN.pack(len(document)) + document + b"".join(blobs))
+
+
+def decode_event(body: bytes) -> Dict[str, Any]:
+    """解码事件帧 body，数组还原为只读 ndarray（与接收缓冲区共享内存）。"""
+    (doc_len,) = _DOC_LEN.unpack_from(body)
+    document = json.loads(body[_DOC_LEN.size : _DOC_LEN.size + doc_len].decode("utf-8"))
+    blob = memoryview(body)[_DOC_LEN.size + doc_len :]
+
+    def _restore(value: Any) -> Any:
+        if isinstance(value, dict):
+            ref = value.get("__ndarray__")
+            if ref is not None:
+                start, length = ref
+                array = np.frombuffer(blob[start : start + length], dtype=np.dtype(value["dtype"]))
+                return array.reshape(value["shape"])
+            return {key: _restore(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [_restore(item) for item in value]
+        return value
+
+    return _restore(document)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """读满 size 字节，对端关闭时返回 None。"""
+    chunks = bytearray()
+    while len(chunks) < size:
+        chunk = sock.recv(size - len(chunks))
+        if not chunk:
+            return None
+        chunks += chunk
+    return bytes(chunks)
+
+
+def read_frame(
+    sock: socket.socket,
+    *,
+    kinds: Optional[Tuple[int, ...]] = None,
+    max_size: Optional[int] = None,
+) -> Optional[Tuple[int, str, bytes]]:
+    """从套接字读取一帧，返回 (类型, 主题, body)；连接关闭时返回 None。
+
+    给定 kinds 或 max_size（主题与 body 的总字节数上限）时，解析帧头后立即校验，
+    不符合则在读取 body 之前抛出 ValueError。
+    """
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    body_len, kind, topic_len = FRAME_HEADER.unpack(header)
+    if kinds is not None and kind not in kinds:
+        raise ValueError(f"不接受的帧类型 {kind}")
+    if max_size is not None and topic_len + body_len > max_size:
+        raise ValueError(f"帧长度 {topic_len + body_len} 超出上限 {max_size}")
+    rest = _recv_exact(sock, topic_len + body_len)
+    if rest is None:
+        return None
+    return kind, rest[:topic_len].decode("utf-8"), rest[topic_len:]
+
+
+def _parse_request(body: bytes) -> Dict[str, Any]:
+    """解析订阅控制帧的 JSON 请求；不是对象或 topics 不是字符串列表时抛出 ValueError。"""
+    request = json.loads(body.decode("utf-8") or "{}")
+    if not isinstance(request, dict):
+        raise ValueError("请求必须是 JSON 对象")
+    topics = request.get("topics")
+    if topics is not None and not (isinstance(topics, list) and all(isinstance(topic, str) for topic in topics)):
+        raise ValueError("topics 必须是字符串列表")
+    return request
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """删除无人监听的残留 Unix 套接字文件；仍有进程在监听或路径不是套接字时抛出 OSError。"""
+    try:
+        mode = path.stat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(errno.EEXIST, "路径已存在且不是套接字文件", str(path))
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        path.unlink(missing_ok=True)
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, "已有进程在该套接字上监听", str(path))
+
+
+class _BridgeClient:
+    """服务端侧的单个客户端连接：独立的发送队列、发送线程与控制帧读取线程。"""
+
+    def __init__(self, bridge: "BusBridge", sock: socket.socket, peer: str) -> None:
+        self.bridge = bridge
+        self.sock = sock
+        self.peer = peer
+        self.topics: Set[str] = set()
+        self.mode = "queue"
+        self._queue: Deque[bytes] = deque()
+        self._latest: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.replaced = 0
+        self._sender = threading.Thread(target=self._send_loop, name=f"BusBridge-send-{peer}", daemon=True)
+        self._reader = threading.Thread(target=self._read_loop, name=f"BusBridge-read-{peer}", daemon=True)
+
+    def start(self, hello: bytes) -> None:
+        self._queue.append(hello)
+        self._sender.start()
+        self._reader.start()
+
+    def offer(self, topic: str, frame: bytes) -> None:
+        """在发布线程中入队，永不阻塞：queue 模式队列满时丢弃新帧，latest 模式每个主题只保留最新一帧。"""
+        with self._cond:
+            if self._closed:
+                return
+            if self.mode == "latest":
+                if topic in self._latest:
+                    self.replaced += 1
+                    del self._latest[topic]
+                self._latest[topic] = frame
+            elif len(self._queue) >= self.bridge.queue_size:
+                self.dropped += 1
+                return
+            else:
+                self._queue.append(frame)
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "peer": self.peer,
+                "topics": sorted(self.topics),
+                "mode": self.mode,
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "replaced": self.replaced,
+                "pending": len(self._queue) + len(self._latest),
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.clear()
+            self._latest.clear()
+            self._cond.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.bridge._forget(self)
+
+    def _send_loop(self) -> None:
+        """合并待发帧后一次写出，慢速客户端只会阻塞自己的发送线程。"""
+        while True:
+            with self._cond:
+                while not self._queue and not self._latest and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                batch = list(self._queue)
+                batch.extend(self._latest.values())
+                self._queue.clear()
+                self._latest.clear()
+            try:
+                self.sock.sendall(b"".join(batch))
+            except OSError:
+                self.close()
+                return
+            with self._cond:
+                self.sent += len(batch)
+
+    def _read_loop(self) -> None:
+        """处理客户端的订阅控制帧；对端断开、发送无效控制帧或处理出错时都会清理连接。"""
+        try:
+            while True:
+                try:
+                    # 先按帧头校验类型与长度，超限的连接在读取 body 前即断开，不为其分配内存
+                    frame = read_frame(self.sock, kinds=_CONTROL_KINDS, max_size=MAX_CONTROL_BODY)
+                    if frame is None:
+                        break
+                    kind, _, body = frame
+                    request = _parse_request(body)
+                except ValueError as exc:
+                    LOG.warning("桥接客户端 %s 发送了无效控制帧: %s", self.peer, exc)
+                    break
+                self._apply(kind, request)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    def _apply(self, kind: int, request: Dict[str, Any]) -> None:
+        requested = set(request.get("topics") or ())
+        if kind == KIND_SUBSCRIBE and not requested:
+            # 订阅请求未指定主题时订阅全部开放主题
+            requested = set(self.bridge.topics)
+        allowed = requested & self.bridge.topics
+        if requested - allowed:
+            LOG.info("桥接客户端 %s 请求了未开放的主题: %s", self.peer, sorted(requested - allowed))
+        with self._cond:
+            if kind == KIND_SUBSCRIBE:
+                self.topics |= allowed
+                mode = request.get("mode")
+                if mode in CLIENT_MODES and mode != self.mode:
+                    # 切换模式时把已排队的帧并入新的待发结构，保证不丢
+                    self.mode = mode
+                    if mode == "queue":
+                        self._queue.extend(self._latest.values())
+                        self._latest.clear()
+            else:
+                self.topics -= allowed
+        self.bridge._refresh_interest()
+
+
+class BusBridge:
+    """将指定主题桥接到本地套接字，每个客户端自选订阅主题与排队方式。
+
+    总线侧只做一次编码（仅当有客户端订阅该主题时）并向各客户端队列追加字节串，
+    套接字写入全部在各客户端自己的发送线程中完成，慢速客户端不会阻塞发布线程。
+    unix_path 非空时监听 Unix 域套接字，否则监听 host:port（port=0 表示随机端口）。
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        topics: Iterable[str],
+        *,
+        unix_path: Optional[Path | str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        queue_size: int = 256,
+    ) -> None:
+        self.bus = bus
+        self.topics: Set[str] = set(topics)
+        self.unix_path = Path(unix_path) if unix_path else None
+        self.host = host
+        self.port = port
+        self.queue_size = max(1, int(queue_size))
+        self._lock = threading.Lock()
+        self._clients: List[_BridgeClient] = []
+        self._interest: Dict[str, Tuple[_BridgeClient, ...]] = {}
+        self._server: Optional[socket.socket] = None
+        self._accept_thread: Optional[threading.Thread] = None
+        self._subscription: Optional[Subscription] = None
+        self.encoded = 0
+
+    @property
+    def address(self) -> Any:
+        """实际监听地址：Unix 套接字路径或 (host, port)。"""
+        if self._server is None:
+            return None
+        return self._server.getsockname()
+
+    def start(self) -> None:
+        """创建监听套接字、启动接受线程并开始监视总线。"""
+        if self._server is not None:
+            return
+        if self.unix_path is not None:
+            _remove_stale_socket(self.unix_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(str(self.unix_path))
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind((self.host, self.port))
+        server.listen()
+        self._server = server
+        self._subscription = self.bus.monitor(self._on_message)
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="BusBridge-accept", daemon=True)
+        self._accept_thread.start()
+        LOG.info("总线桥接已监听 %s，开放主题: %s", self.address, sorted(self.topics))
+
+    def stop(self) -> None:
+        """停止监视总线并断开全部客户端。"""
+        subscription, self._subscription = self._subscription, None
+        if subscription is not None:
+            subscription.unsubscribe()
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.close()
+        if self._accept_thread is not None:
+            self._accept_thread.join(timeout=1.0)
+            self._accept_thread = None
+        if self.unix_path is not None and self.unix_path.exists():
+            os.unlink(self.unix_path)
+
+    def clients(self) -> List[Dict[str, Any]]:
+        """返回各客户端的订阅与发送/丢弃计数。"""
+        with self._lock:
+            clients = list(self._clients)
+        return [client.stats() for client in clients]
+
+    def _on_message(self, topic: str, message: Dict[str, Any]) -> None:
+        """总线回调：无人订阅的主题直接返回，否则编码一次后分发给感兴趣的客户端。"""
+        clients = self._interest.get(topic)
+        if not clients:
+            return
+        frame = encode_event(topic, message)
+        self.encoded += 1
+        for client in clients:
+            client.offer(topic, frame)
+
+    def _accept_loop(self) -> None:
+        server = self._server
+        while server is not None:
+            try:
+                sock, peer = server.accept()
+            except OSError:
+                return
+            if sock.family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _BridgeClient(self, sock, str(peer) or "unix")
+            with self._lock:
+                self._clients.append(client)
+            hello = json.dumps({"version": BRIDGE_VERSION, "topics": sorted(self.topics)}).encode("utf-8")
+            client.start(encode_frame(KIND_HELLO, "", hello))
+            LOG.info("总线桥接客户端已连接: %s", client.peer)
+
+    def _forget(self, client: _BridgeClient) -> None:
+        with self._lock:
+            if client not in self._clients:
+                return
+            self._clients.remove(client)
+        LOG.info("总线桥接客户端已断开: %s", client.peer)
+        self._refresh_interest()
+
+    def _refresh_interest(self) -> None:
+        """订阅变化时重建 主题 -> 客户端 的分发表，发布路径只读该表。"""
+        with self._lock:
+            interest: Dict[str, List[_BridgeClient]] = {}
+            for client in self._clients:
+                for topic in client.topics:
+                    interest.setdefault(topic, []).append(client)
+            self._interest = {topic: tuple(clients) for topic, clients in interest.items()}
+
+
+class BridgeClient:
+    """桥接协议的 Python 客户端，供进程外的脚本或服务接收总线事件。"""
+
+    def __init__(self, address: Any, *, timeout: Optional[float] = None) -> None:
+        if isinstance(address, (str, Path)):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(str(address))
+        else:
+            self.sock = socket.create_connection(tuple(address))
+        self.sock.settimeout(timeout)
+        frame = read_frame(self.sock)
+        if frame is None or frame[0] != KIND_HELLO:
+            self.sock.close()
+            raise ConnectionError("桥接服务端未返回握手帧")
+        self.hello: Dict[str, Any] = json.loads(frame[2].decode("utf-8"))
+
+    def __enter__(self) -> "BridgeClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def topics(self) -> List[str]:
+        """服务端开放的主题。"""
+        return list(self.hello.get("topics", []))
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None, *, mode: Optional[str] = None) -> None:
+        """订阅主题（缺省全部开放主题），mode 可切换为 queue 或 latest。"""
+        request: Dict[str, Any] = {"topics": list(topics) if topics is not None else []}
+        if mode is not None:
+            if mode not in CLIENT_MODES:
+                raise ValueError(f"未知的客户端模式: {mode}，可选 {CLIENT_MODES}")
+            request["mode"] = mode
+        self.sock.sendall(encode_frame(KIND_SUBSCRIBE, "", json.dumps(request).encode("utf-8")))
+
+    def unsubscribe(self, topics: Iterable[str]) -> None:
+        """取消订阅指定主题。"""
+        body = json.dumps({"topics": list(topics)}).encode("utf-8")
+        self.sock.sendall(encode_frame(KIND_UNSUBSCRIBE, "", body))
+
+    def recv(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """阻塞读取下一条事件，返回 (主题, 消息)；连接关闭时返回 None。"""
+        while True:
+            frame = read_frame(self.sock)
+            if frame is None:
+                return None
+            kind, topic, body = frame
+            if kind == KIND_EVENT:
+                return topic, decode_event(body)
+
+    def close(self) -> None:
+        self.sock.close()
@@ -0,0 +1,328 @@
+"""订阅者侧的投递控制：异步有界队列与工作线程、限速与合并，使慢速或低频订阅者不拖累发布线程。"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+
+Listener = Callable[..., None]
+Merger = Callable[[Optional[Dict[str, Any]], Dict[str, Any]], Dict[str, Any]]
+
+DELIVERY_POLICIES = ("keep_all", "keep_latest", "sample")
+COALESCE_MODES = ("mean",)
+
+
+class AsyncDelivery:
+    """在独立线程中调用监听器，发布线程只做一次入队。
+
+    - keep_all：按顺序投递全部消息，队列满时丢弃新消息并计数；
+    - keep_latest：只保留最近一条未处理消息，新消息覆盖旧消息；
+    - sample：每 sample_every 条消息取一条入队，队列满时同 keep_all。
+    """
+
+    def __init__(
+        self,
+        listener: Listener,
+        *,
+        policy: str = "keep_all",
+        queue_size: int = 256,
+        sample_every: int = 1,
+        name: Optional[str] = None,
+    ) -> None:
+        if policy not in DELIVERY_POLICIES:
+            raise ValueError(f"未知的投递策略: {policy}，可选 {DELIVERY_POLICIES}")
+        self.listener = listener
+        self.policy = policy
+        self.queue_size = 1 if policy == "keep_latest" else max(1, int(queue_size))
+        self.sample_every = max(1, int(sample_every))
+        self._pending: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.errors = 0
+        self.max_pending = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"AsyncDelivery-{name or getattr(listener, '__qualname__', 'listener')}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def as_listener(self) -> Listener:
+        """返回挂到总线上的入队函数；其签名与原监听器一致，以通过 pypubsub 的参数校验。"""
+
+        def _enqueue(**message: Any) -> None:
+            self.offer(message)
+
+        functools.update_wrapper(_enqueue, self.listener)
+        return _enqueue
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        """在发布线程中按策略入队，永不阻塞。"""
+
+        with self._cond:
+            if self._closed:
+                return
+            self.received += 1
+            if self.policy == "sample" and (self.received - 1) % self.sample_every:
+                self.skipped += 1
+                return
+            if len(self._pending) >= self.queue_size:
+                self.dropped += 1
+                if self.policy != "keep_latest":
+                    return
+                self._pending.popleft()
+            self._pending.append((time.perf_counter(), message))
+            self.max_pending = max(self.max_pending, len(self._pending))
+            self._cond.notify()
+
+    def close(self, timeout: float = 1.0) -> None:
+        """停止工作线程并丢弃未投递的消息；在工作线程内部调用时不等待。"""
+
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回收到、投递、丢弃、抽样跳过的消息数，以及队列深度与投递延迟。"""
+
+        with self._cond:
+            return {
+                "policy": self.policy,
+                "received": self.received,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "skipped": self.skipped,
+                "errors": self.errors,
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "lag_ms": self.lag * 1000.0,
+                "max_lag_ms": self.max_lag * 1000.0,
+            }
+
+    def _run(self) -> None:
+        """逐条取出消息并调用监听器，记录从发布到开始处理的延迟。"""
+
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                enqueued, message = self._pending.popleft()
+            lag = time.perf_counter() - enqueued
+            try:
+                self.listener(**message)
+            except Exception:
+                LOG.exception("异步监听器 %s 处理消息失败", getattr(self.listener, "__qualname__", self.listener))
+                with self._cond:
+                    self.errors += 1
+            with self._cond:
+                self.delivered += 1
+                self.lag = lag
+                self.max_lag = max(self.max_lag, lag)
+
+
+class RateLimiter:
+    """在发布线程中把投递频率限制在 max_rate 次/秒以内。
+
+    每个间隔内首条到达且间隔已满的消息立即投递；其间的消息默认直接丢弃，
+    coalesce="mean" 时对其中的数组字段求平均后随下一次投递一并送出，也可传入
+    自定义合并函数 ``merge(accumulated, message) -> accumulated``。
+    没有新消息时不会补发，被合并的最后一段消息会在下一条消息到达时送出。
+    """
+
+    def __init__(
+        self,
+        deliver: Listener,
+        *,
+        max_rate: float,
+        coalesce: Union[str, Merger, None] = None,
+    ) -> None:
+        if max_rate <= 0:
+            raise ValueError("max_rate 必须为正数")
+        if isinstance(coalesce, str) and coalesce not in COALESCE_MODES:
+            raise ValueError(f"未知的合并方式: {coalesce}，可选 {COALESCE_MODES}")
+        self.max_rate = float(max_rate)
+        self.coalesce = coalesce
+        self._deliver = deliver
+        self._interval = 1.0 / self.max_rate
+        self._merger: Optional[_Merger] = None
+        if coalesce == "mean":
+            self._merger = _MeanMerger()
+        elif callable(coalesce):
+            self._merger = _CallableMerger(coalesce)
+        self._lock = threading.Lock()
+        self._next_due = 0.0
+        self.offered = 0
+        self.passed = 0
+        self.throttled = 0
+
+    def as_listener(self, listener: Listener) -> Listener:
+        """返回挂到总线上的限速函数，签名复制自原监听器。"""
+
+        def _limited(**message: Any) -> None:
+            self.offer(message)
+
+        functools.update_wrapper(_limited, listener)
+        return _limited
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        """到达投递时刻则（合并后）投递，否则丢弃或并入累积结果。"""
+
+        now = time.monotonic()
+        with self._lock:
+            self.offered += 1
+            if self._merger is not None:
+                self._merger.add(message)
+            if now < self._next_due:
+                self.throttled += 1
+                return
+            # 按理论时刻推进以抵消到达抖动；落后超过一个间隔（或首次投递）时从当前时刻重新计时
+            due = self._next_due + self._interval
+            self._next_due = due if due > now else now + self._interval
+            if self._merger is not None:
+                message = self._merger.pop()
+            self.passed += 1
+        self._deliver(**message)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回限速配置与放行、节流的消息数。"""
+
+        with self._lock:
+            return {
+                "max_rate": self.max_rate,
+                "coalesce": self.coalesce if isinstance(self.coalesce, str) or self.coalesce is None else "custom",
+                "offered": self.offered,
+                "passed": self.passed,
+                "throttled": self.throttled,
+            }
+
+
+class _Merger(ABC):
+    """合并器接口：逐条累积消息，投递时取出合并结果并重置。"""
+
+    @abstractmethod
+    def add(self, message: Dict[str, Any]) -> None:
+        """累积一条消息。"""
+
+    @abstractmethod
+    def pop(self) -> Dict[str, Any]:
+        """取出合并结果并重置累积状态。"""
+
+
+class _CallableMerger(_Merger):
+    """包装用户提供的 merge(accumulated, message) 函数。"""
+
+    def __init__(self, merge: Merger) -> None:
+        self._merge = merge
+        self._accumulated: Optional[Dict[str, Any]] = None
+
+    def add(self, message: Dict[str, Any]) -> None:
+        self._accumulated = self._merge(self._accumulated, message)
+
+    def pop(self) -> Dict[str, Any]:
+        accumulated, self._accumulated = self._accumulated, None
+        return accumulated or {}
+
+
+class _MeanMerger(_Merger):
+    """对消息（含嵌套字典与数据类）中的数组与嵌套数值列表求平均，其余字段取最新值。
+
+    数据类载荷可声明合并约定：类属性 ``COALESCE_FIELDS`` 限定参与平均的字段；
+    ``COALESCE_GROUP`` 为分组字段名，只有该字段取值相同的消息才相互平均（例如左右脚帧），
+    其他分组的累计保留到该分组下一次投递；方法 ``coalesced(**means)`` 以平均后的字段
+    重建实例并更新派生字段，未定义时使用 ``dataclasses.replace``。
+    """
+
+    def __init__(self) -> None:
+        self._latest: Dict[str, Any] = {}
+        self._sums: Dict[Tuple[Tuple[Any, ...], Tuple[str, ...]], Tuple[np.ndarray, int]] = {}
+
+    def add(self, message: Dict[str, Any]) -> None:
+        self._latest = message
+        for group, path, array in _iter_arrays(message, (), ()):
+            key = (group, path)
+            entry = self._sums.get(key)
+            if entry is None or entry[0].shape != array.shape:
+                # 形状变化时从当前消息重新累计
+                self._sums[key] = (array.astype(np.float64, copy=True), 1)
+            else:
+                total, count = entry
+                total += array
+                self._sums[key] = (total, count + 1)
+
+    def pop(self) -> Dict[str, Any]:
+        message, self._latest = self._latest, {}
+        for group, path, _ in list(_iter_arrays(message, (), ())):
+            entry = self._sums.pop((group, path), None)
+            if entry is not None and entry[1] > 1:
+                total, count = entry
+                message = _replace_path(message, path, total / count)
+        return message
+
+
+def _iter_arrays(value: Any, path: Tuple[str, ...], group: Tuple[Any, ...]):
+    """遍历消息（含嵌套字典与数据类字段）中的 ndarray 与嵌套数值列表，产出 (分组, 键路径, 数组)。"""
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _iter_arrays(item, path + (key,), group)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        names = getattr(value, "COALESCE_FIELDS", None)
+        group_field = getattr(value, "COALESCE_GROUP", None)
+        if group_field is not None:
+            group = group + (path, getattr(value, group_field))
+        for item in dataclasses.fields(value):
+            if item.init and (names is None or item.name in names):
+                yield from _iter_arrays(getattr(value, item.name), path + (item.name,), group)
+    elif isinstance(value, np.ndarray):
+        if value.dtype.kind in "biuf":
+            yield group, path, value
+    elif isinstance(value, list) and value and isinstance(value[0], list):
+        array = np.asarray(value, dtype=np.float64)
+        if array.dtype.kind == "f":
+            yield group, path, array
+
+
+def _replace_path(message: Any, path: Tuple[str, ...], mean: np.ndarray) -> Any:
+    """返回替换了指定路径取值的浅拷贝消息，保持原字段的类型（数组或列表，整数数组四舍五入）；
+    数据类通过其 coalesced 方法或 replace 重建。"""
+
+    head, rest = path[0], path[1:]
+    is_record = dataclasses.is_dataclass(message)
+    original = getattr(message, head) if is_record else message[head]
+    if rest:
+        replaced = _replace_path(original, rest, mean)
+    elif isinstance(original, np.ndarray):
+        if original.dtype.kind in "biu":
+            mean = np.rint(mean)
+        replaced = mean.astype(original.dtype, copy=False)
+    else:
+        replaced = mean.tolist()
+    if is_record:
+        coalesced = getattr(message, "coalesced", None)
+        if coalesced is not None:
+            return coalesced(**{head: replaced})
+        return dataclasses.replace(message, **{head: replaced})
+    updated = dict(message)
+    updated[head] = replaced
+    return updated
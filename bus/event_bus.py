@@ -3,13 +3,50 @@
 from __future__ import annotations
 
 import inspect
+import threading
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Set
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from pubsub import pub
 
+from .delivery import AsyncDelivery, Merger, RateLimiter
+from .metrics import SLOW_LISTENER_EVENT, BusMetrics
+from .topics import Topics
+
 Listener = Callable[..., None]
 
+ENGINES = ("pubsub", "native")
+
+# monitor 订阅登记在该主题名下，与 pypubsub 的根主题同名
+ALL_TOPICS = pub.ALL_TOPICS
+
+# 主题模式中的通配段：* 匹配恰好一段，# 匹配零或多段
+WILDCARD_ONE = "*"
+WILDCARD_ANY = "#"
+
+
+def is_pattern(topic: str) -> bool:
+    """判断订阅主题是否含通配段。"""
+
+    return any(part in (WILDCARD_ONE, WILDCARD_ANY) for part in topic.split("."))
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """按点分段匹配主题，例如 `hardware.*.status`、`hardware.#`。"""
+
+    return _match_parts(tuple(pattern.split(".")), tuple(topic.split(".")))
+
+
+def _match_parts(pattern: Tuple[str, ...], topic: Tuple[str, ...]) -> bool:
+    if not pattern:
+        return not topic
+    head, rest = pattern[0], pattern[1:]
+    if head == WILDCARD_ANY:
+        return any(_match_parts(rest, topic[skip:]) for skip in range(len(topic) + 1))
+    if not topic:
+        return False
+    return (head == WILDCARD_ONE or head == topic[0]) and _match_parts(rest, topic[1:])
+
 
 @dataclass
 class Subscription:
@@ -18,47 +55,312 @@ class Subscription:
     topic: str
     listener: Listener
     _bus: "EventBus"
+    delivery: Optional[AsyncDelivery] = None
+    limiter: Optional[RateLimiter] = None
 
     def unsubscribe(self) -> None:
         """从总线取消当前监听器。"""
 
         self._bus.unsubscribe(self)
 
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """返回限速与异步投递的计数（普通同步订阅返回 None）。"""
+
+        if self.delivery is None and self.limiter is None:
+            return None
+        stats: Dict[str, Any] = {}
+        if self.limiter is not None:
+            stats.update(self.limiter.stats())
+        if self.delivery is not None:
+            stats.update(self.delivery.stats())
+        return stats
+
 
 class EventBus:
-    """对 pypubsub 的轻量封装，统一入口便于依赖注入与调试。"""
+    """对 pypubsub 的轻量封装，统一入口便于依赖注入与调试。
+
+    engine="native" 时不再经过 pypubsub：每个主题维护一个按订阅顺序排列的监听器元组，
+    仅在订阅/退订时重建，发布时直接逐个调用。该模式跳过 pypubsub 的消息参数校验与
+    父主题传播，且监听器只在本实例内可见。
+
+    订阅时指定 delivery（keep_all/keep_latest/sample）即改为异步投递：该订阅者拥有独立的
+    有界队列与工作线程，发布线程只负责入队，慢速订阅者不会拖慢采集线程。
+    指定 max_rate 则在发布线程中限速，间隔内的消息被丢弃或按 coalesce 合并。
+
+    主题可写作模式（`hardware.*.status`、`hardware.#`）。模式在订阅时、以及某个主题首次
+    出现（首次订阅或发布）时解析进该主题的分发元组，发布路径只做一次字典查找，不做匹配。
+    pubsub 引擎下模式订阅经由挂在根主题上的单个分发函数查表调用。
+
+    metrics=True 时统计各主题的发布次数，并为之后订阅的监听器计时（次数、耗时、异常）；
+    再给定 slow_listener_ms，单次调用超出该预算的监听器会以 `event="slow_listener"`
+    发布到 `Topics.System.BUS`（同一监听器每秒最多一次），用于定位拖慢发布线程的订阅者。
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        engine: str = "pubsub",
+        metrics: bool = False,
+        slow_listener_ms: Optional[float] = None,
+    ) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"未知的总线引擎: {engine}，可选 {ENGINES}")
+        if slow_listener_ms is not None and not metrics:
+            raise ValueError("slow_listener_ms 需要与 metrics=True 一同使用")
+        self.engine = engine
+        self._metrics: Optional[BusMetrics] = None
+        if metrics:
+            self._metrics = BusMetrics(
+                slow_budget=None if slow_listener_ms is None else slow_listener_ms / 1000.0,
+                report=self._report_slow_listener,
+            )
+        self._lock = threading.RLock()
         self._listener_map: Dict[str, Set[Listener]] = {}
+        # 按订阅顺序记录每个主题（或模式、ALL_TOPICS）下的监听器
+        self._subscribed: Dict[str, Tuple[Listener, ...]] = {}
+        # 模式 -> 按订阅顺序的首次登记，用于确定模式监听器的调用顺序
+        self._patterns: Dict[str, None] = {}
+        # 已出现过的具体主题 -> 匹配到的模式监听器
+        self._pattern_routes: Dict[str, Tuple[Listener, ...]] = {}
+        # native 引擎的分发表：具体主题 -> 精确订阅 + 模式订阅
+        self._routes: Dict[str, Tuple[Listener, ...]] = {}
+        self._pattern_snoop: Optional[Listener] = None
+        self._managed: Dict[Tuple[str, Listener], Subscription] = {}
 
-    def subscribe(self, topic: str, listener: Listener) -> Subscription:
-        """订阅指定主题并记录监听器，返回可供释放的句柄。"""
+    def subscribe(
+        self,
+        topic: str,
+        listener: Listener,
+        *,
+        delivery: Optional[str] = None,
+        queue_size: int = 256,
+        sample_every: int = 1,
+        max_rate: Optional[float] = None,
+        coalesce: Union[str, Merger, None] = None,
+    ) -> Subscription:
+        """订阅指定主题并记录监听器，返回可供释放的句柄。
 
-        pub.subscribe(listener, topic)
-        self._listener_map.setdefault(topic, set()).add(listener)
-        return Subscription(topic=topic, listener=listener, _bus=self)
+        delivery 为 None 时在发布线程中同步调用；否则按所选策略异步投递，
+        queue_size 为队列上限，sample_every 仅用于 sample 策略（每 N 条取一条）。
+        max_rate 限制每秒投递次数（先限速再入队），coalesce="mean" 或合并函数决定
+        间隔内被跳过的消息如何并入下一次投递，缺省直接丢弃。
+        """
+
+        original = listener
+        worker: Optional[AsyncDelivery] = None
+        limiter: Optional[RateLimiter] = None
+        if delivery is not None:
+            worker = AsyncDelivery(listener, policy=delivery, queue_size=queue_size, sample_every=sample_every, name=topic)
+            listener = worker.as_listener()
+        if max_rate is not None:
+            limiter = RateLimiter(listener, max_rate=max_rate, coalesce=coalesce)
+            listener = limiter.as_listener(original)
+        elif coalesce is not None:
+            raise ValueError("coalesce 需要与 max_rate 一同使用")
+        if self._metrics is not None:
+            # 异步订阅计的是发布线程中的入队耗时，处理耗时见 delivery_stats 的 lag
+            listener = self._metrics.instrument(topic, listener, self._render_listener(original))
+        subscription = Subscription(topic=topic, listener=listener, _bus=self, delivery=worker, limiter=limiter)
+        pattern = is_pattern(topic)
+        with self._lock:
+            if self.engine == "pubsub" and not pattern:
+                pub.subscribe(listener, topic)
+            self._register(topic, listener)
+            if pattern:
+                self._patterns.setdefault(topic, None)
+                self._ensure_pattern_snoop()
+                self._refresh_topics(known for known in self._pattern_routes if topic_matches(topic, known))
+            else:
+                self._refresh_topics((topic,))
+            if worker is not None or limiter is not None:
+                self._managed[(topic, listener)] = subscription
+        return subscription
+
+    def monitor(self, listener: Callable[[str, Dict[str, Any]], None]) -> Subscription:
+        """监听全部主题：每次发布后以 listener(topic, message) 调用，用于桥接等需要主题名的场景。"""
+
+        registered: Listener = listener
+        if self.engine == "pubsub":
+            # 挂在 pypubsub 根主题上，避免以 **kwargs 监听器首个订阅具体主题时推断出空的消息参数规格
+            def _snoop(topic_obj: Any = pub.AUTO_TOPIC, **message: Any) -> None:
+                listener(topic_obj.getName(), message)
+
+            _snoop.__qualname__ = getattr(listener, "__qualname__", _snoop.__qualname__)
+            registered = _snoop
+        if self._metrics is not None:
+            registered = self._metrics.instrument(ALL_TOPICS, registered, self._render_listener(listener))
+        with self._lock:
+            if self.engine == "pubsub":
+                pub.subscribe(registered, ALL_TOPICS)
+            self._register(ALL_TOPICS, registered)
+            self._routes[ALL_TOPICS] = self._subscribed[ALL_TOPICS]
+        return Subscription(topic=ALL_TOPICS, listener=registered, _bus=self)
 
     def unsubscribe(self, subscription: Subscription) -> None:
         """取消之前的订阅，常用于模块卸载。"""
 
-        pub.unsubscribe(subscription.listener, subscription.topic)
-        listeners = self._listener_map.get(subscription.topic)
-        if listeners is not None:
-            listeners.discard(subscription.listener)
-            if not listeners:
-                self._listener_map.pop(subscription.topic, None)
+        topic, listener = subscription.topic, subscription.listener
+        pattern = is_pattern(topic)
+        with self._lock:
+            if self.engine == "pubsub" and not pattern:
+                pub.unsubscribe(listener, topic)
+            listeners = self._listener_map.get(topic)
+            if listeners is not None:
+                listeners.discard(listener)
+                if not listeners:
+                    self._listener_map.pop(topic, None)
+            remaining = tuple(item for item in self._subscribed.get(topic, ()) if item is not listener)
+            if remaining:
+                self._subscribed[topic] = remaining
+            else:
+                self._subscribed.pop(topic, None)
+            if topic == ALL_TOPICS:
+                self._routes[ALL_TOPICS] = remaining
+            elif pattern:
+                if not remaining:
+                    self._patterns.pop(topic, None)
+                self._refresh_topics(known for known in self._pattern_routes if topic_matches(topic, known))
+                self._ensure_pattern_snoop()
+            else:
+                self._refresh_topics((topic,))
+            managed = self._managed.pop((subscription.topic, subscription.listener), None)
+            if self._metrics is not None:
+                self._metrics.discard(listener)
+        if managed is not None and managed.delivery is not None:
+            managed.delivery.close()
+
+    def close(self) -> None:
+        """撤销全部限速与异步订阅并停止其投递线程，通常在进程退出前调用。"""
+
+        with self._lock:
+            subscriptions = list(self._managed.values())
+        for subscription in subscriptions:
+            self.unsubscribe(subscription)
+
+    def delivery_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """按主题与监听器名称汇总限速与异步订阅者的节流、积压、延迟与丢弃计数。"""
+
+        with self._lock:
+            items = list(self._managed.items())
+        snapshot: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (topic, listener), subscription in items:
+            snapshot.setdefault(topic, {})[self._render_listener(listener)] = subscription.stats() or {}
+        return snapshot
+
+    def metrics_snapshot(self, *, reset: bool = False) -> Optional[Dict[str, Any]]:
+        """返回发布与监听器耗时统计（未开启 metrics 时返回 None），reset=True 时读取后清零。
+
+        topics 下为各主题的 `published` 与 `rate_hz`；listeners 按订阅键（主题、模式或
+        ALL_TOPICS）与监听器名称给出 `calls`、`errors`、`slow` 与 `total_ms`/`mean_ms`/`max_ms`。
+        """
+
+        if self._metrics is None:
+            return None
+        return self._metrics.snapshot(reset=reset)
 
     def publish(self, topic: str, **message: Any) -> None:
         """向主题广播事件，消息内容使用关键字参数传递。"""
 
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.count_publish(topic)
+        if self.engine == "native":
+            # 元组在订阅/退订时整体替换，发布路径无需加锁
+            routes = self._routes
+            listeners = routes.get(topic)
+            if listeners is None:
+                listeners = self._learn_topic(topic)
+            for listener in listeners:
+                listener(**message)
+            monitors = routes.get(ALL_TOPICS)
+            if monitors:
+                for monitor in monitors:
+                    monitor(topic, message)
+            return
         pub.sendMessage(topic, **message)
 
+    def _report_slow_listener(self, payload: Dict[str, Any]) -> None:
+        self.publish(Topics.System.BUS, event=SLOW_LISTENER_EVENT, payload=payload)
+
+    def _register(self, key: str, listener: Listener) -> None:
+        """在主题（或模式）下登记监听器并保持订阅顺序，重复订阅忽略；调用方需持有锁。"""
+
+        listeners = self._listener_map.setdefault(key, set())
+        if listener not in listeners:
+            listeners.add(listener)
+            self._subscribed[key] = self._subscribed.get(key, ()) + (listener,)
+
+    def _learn_topic(self, topic: str) -> Tuple[Listener, ...]:
+        """主题首次发布时解析其模式监听器，此后发布直接查表。"""
+
+        with self._lock:
+            self._refresh_topics((topic,))
+            return self._routes[topic]
+
+    def _refresh_topics(self, topics: Iterable[str]) -> None:
+        """重建给定具体主题的模式监听器与 native 分发元组；调用方需持有锁。"""
+
+        for topic in list(topics):
+            exact = self._subscribed.get(topic, ())
+            matched = self._match_patterns(topic, exclude=exact)
+            self._pattern_routes[topic] = matched
+            self._routes[topic] = exact + matched
+
+    def _match_patterns(self, topic: str, exclude: Tuple[Listener, ...] = ()) -> Tuple[Listener, ...]:
+        """按模式订阅顺序收集匹配主题的监听器，去除 exclude 中已有的。
+
+        开启 metrics 时同一监听器在各订阅键下有各自的计时函数，按被包装的监听器去重。
+        """
+
+        metrics = self._metrics
+        seen: List[Listener] = list(exclude) if metrics is None else [metrics.unwrap(item) for item in exclude]
+        matched: List[Listener] = []
+        for pattern in self._patterns:
+            if topic_matches(pattern, topic):
+                for listener in self._subscribed.get(pattern, ()):
+                    identity = listener if metrics is None else metrics.unwrap(listener)
+                    if identity not in seen:
+                        seen.append(identity)
+                        matched.append(listener)
+        return tuple(matched)
+
+    def _ensure_pattern_snoop(self) -> None:
+        """pubsub 引擎下按需挂载/卸下在根主题上分发模式订阅的函数；调用方需持有锁。"""
+
+        if self.engine != "pubsub":
+            return
+        if self._patterns and self._pattern_snoop is None:
+            pattern_routes = self._pattern_routes
+
+            def _dispatch_patterns(topic_obj: Any = pub.AUTO_TOPIC, **message: Any) -> None:
+                name = topic_obj.getName()
+                listeners = pattern_routes.get(name)
+                if listeners is None:
+                    listeners = self._learn_pattern_topic(name)
+                for listener in listeners:
+                    listener(**message)
+
+            self._pattern_snoop = _dispatch_patterns
+            pub.subscribe(_dispatch_patterns, ALL_TOPICS)
+        elif not self._patterns and self._pattern_snoop is not None:
+            pub.unsubscribe(self._pattern_snoop, ALL_TOPICS)
+            self._pattern_snoop = None
+
+    def _learn_pattern_topic(self, topic: str) -> Tuple[Listener, ...]:
+        with self._lock:
+            self._refresh_topics((topic,))
+            return self._pattern_routes[topic]
+
     def has_listeners(self, topic: str) -> bool:
         """检测是否存在监听者，便于调试或延迟初始化。"""
 
         listeners = self._listener_map.get(topic)
         if listeners:
             return True
+        if not is_pattern(topic) and self._match_patterns(topic):
+            return True
+        if self.engine == "native":
+            return False
         # 回退至 pubsub 内部状态，兼容直接使用 pub.subscribe 的情况
         topic_obj = pub.getDefaultTopicMgr().getTopic(topic, okIfNone=True)
         if topic_obj is None:
@@ -68,10 +370,14 @@ class EventBus:
         return False
 
     def listener_count(self, topic: str) -> int:
-        """返回当前已记录的监听器数量，用于监控订阅情况。"""
+        """返回当前已记录的监听器数量（具体主题含匹配的模式订阅），用于监控订阅情况。"""
 
-        if topic in self._listener_map:
-            return len(self._listener_map[topic])
+        exact = self._subscribed.get(topic, ())
+        pattern_count = 0 if is_pattern(topic) else len(self._match_patterns(topic, exclude=exact))
+        if exact or pattern_count:
+            return len(exact) + pattern_count
+        if self.engine == "native":
+            return 0
         topic_obj = pub.getDefaultTopicMgr().getTopic(topic, okIfNone=True)
         if topic_obj is None:
             return 0
@@ -0,0 +1,186 @@
+"""总线运行指标：按主题统计发布次数与频率，按监听器统计调用次数、耗时与异常，并标记超出时间预算的慢监听器。"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+LOG = logging.getLogger(__name__)
+
+Listener = Callable[..., None]
+SlowReporter = Callable[[Dict[str, Any]], None]
+
+# 慢监听器报告在系统主题上使用的事件名
+SLOW_LISTENER_EVENT = "slow_listener"
+
+
+class ListenerMetrics:
+    """单个监听器的调用次数、累计/最大耗时、异常数与超预算次数。
+
+    计数在监听器所在线程中直接累加、不加锁：同一监听器被多个线程并发调用时个别计数可能丢失，
+    换取每次调用不足 0.5 微秒的统计开销。
+    """
+
+    __slots__ = ("key", "name", "budget", "calls", "errors", "slow", "total", "max", "_next_report")
+
+    def __init__(self, key: str, name: str, *, budget: Optional[float]) -> None:
+        self.key = key
+        self.name = name
+        self.budget = float("inf") if budget is None else budget
+        self.calls = 0
+        self.errors = 0
+        self.slow = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._next_report = 0.0
+
+    def stats(self, *, reset: bool = False) -> Dict[str, Any]:
+        """返回调用次数、累计/平均/最大耗时（毫秒）、异常数与超预算次数。"""
+
+        calls, total = self.calls, self.total
+        stats = {
+            "calls": calls,
+            "errors": self.errors,
+            "slow": self.slow,
+            "total_ms": total * 1000.0,
+            "mean_ms": total / calls * 1000.0 if calls else 0.0,
+            "max_ms": self.max * 1000.0,
+        }
+        if reset:
+            self.calls = self.errors = self.slow = 0
+            self.total = self.max = 0.0
+        return stats
+
+
+class BusMetrics:
+    """为总线上的监听器计时并统计各主题的发布次数。
+
+    监听器在订阅时被包一层计时函数（签名复制自原监听器），发布路径只多两次
+    perf_counter 与几次属性累加。slow_budget（秒）给定时，单次调用超出预算即计为慢调用，
+    并经 report 回调报告，同一监听器每 report_interval 秒最多报告一次。
+    """
+
+    def __init__(
+        self,
+        *,
+        slow_budget: Optional[float] = None,
+        report: Optional[SlowReporter] = None,
+        report_interval: float = 1.0,
+    ) -> None:
+        self.slow_budget = slow_budget
+        self.report_interval = report_interval
+        self._report = report
+        self._lock = threading.Lock()
+        self._published: Dict[str, int] = {}
+        self._since = time.monotonic()
+        # 计时函数 -> (订阅键, 原监听器, 统计)；同一键下同一监听器只包装一次，保持总线的去重语义
+        self._records: Dict[Listener, Tuple[str, Listener, ListenerMetrics]] = {}
+        self._wrappers: Dict[Tuple[str, Listener], Listener] = {}
+
+    def count_publish(self, topic: str) -> None:
+        """登记一次发布（不加锁，与监听器计数相同）。"""
+
+        published = self._published
+        published[topic] = published.get(topic, 0) + 1
+
+    def instrument(self, key: str, listener: Listener, name: str) -> Listener:
+        """返回登记在订阅键（主题、模式或 ALL_TOPICS）下的计时监听器。"""
+
+        with self._lock:
+            wrapper = self._wrappers.get((key, listener))
+            if wrapper is not None:
+                return wrapper
+            record = ListenerMetrics(key, name, budget=self.slow_budget)
+            perf_counter = time.perf_counter
+
+            def _timed(*args: Any, **kwargs: Any) -> None:
+                start = perf_counter()
+                try:
+                    listener(*args, **kwargs)
+                except Exception:
+                    record.errors += 1
+                    raise
+                finally:
+                    elapsed = perf_counter() - start
+                    record.calls += 1
+                    record.total += elapsed
+                    if elapsed > record.max:
+                        record.max = elapsed
+                if elapsed > record.budget:
+                    self._on_slow(record, elapsed)
+
+            functools.update_wrapper(_timed, listener)
+            self._wrappers[(key, listener)] = _timed
+            self._records[_timed] = (key, listener, record)
+            return _timed
+
+    def unwrap(self, listener: Listener) -> Listener:
+        """返回计时函数包装的监听器，其余对象原样返回；总线按它去重，保证开启统计不改变投递。"""
+
+        entry = self._records.get(listener)
+        return listener if entry is None else entry[1]
+
+    def discard(self, wrapper: Listener) -> None:
+        """退订后移除计时函数及其统计。"""
+
+        with self._lock:
+            entry = self._records.pop(wrapper, None)
+            if entry is not None:
+                self._wrappers.pop((entry[0], entry[1]), None)
+
+    def snapshot(self, *, reset: bool = False) -> Dict[str, Any]:
+        """返回统计窗口内各主题的发布次数与频率，以及按订阅键、监听器名称分组的调用统计。"""
+
+        with self._lock:
+            now = time.monotonic()
+            window = now - self._since
+            published = self._published
+            records = [entry[2] for entry in self._records.values()]
+            if reset:
+                self._published = {}
+                self._since = now
+        listeners: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for record in records:
+            group = listeners.setdefault(record.key, {})
+            name = record.name
+            suffix = 2
+            while name in group:
+                name = f"{record.name}#{suffix}"
+                suffix += 1
+            group[name] = record.stats(reset=reset)
+        return {
+            "window_s": window,
+            "slow_budget_ms": None if self.slow_budget is None else self.slow_budget * 1000.0,
+            "topics": {
+                topic: {"published": count, "rate_hz": count / window if window > 0 else 0.0}
+                for topic, count in sorted(published.items())
+            },
+            "listeners": {key: listeners[key] for key in sorted(listeners)},
+        }
+
+    def _on_slow(self, record: ListenerMetrics, elapsed: float) -> None:
+        """计入一次慢调用，同一监听器每 report_interval 秒最多报告一次；报告回调的异常不影响发布线程。"""
+
+        record.slow += 1
+        now = time.monotonic()
+        if now < record._next_report:
+            return
+        # 先推迟下次报告时刻，报告主题上的慢监听器不会递归触发报告
+        record._next_report = now + self.report_interval
+        payload = {
+            "topic": record.key,
+            "listener": record.name,
+            "elapsed_ms": elapsed * 1000.0,
+            "budget_ms": record.budget * 1000.0,
+            "slow": record.slow,
+        }
+        LOG.warning("总线监听器 %s（%s）耗时 %.2f ms，超出预算 %.2f ms", record.name, record.key, payload["elapsed_ms"], payload["budget_ms"])
+        if self._report is None:
+            return
+        try:
+            self._report(payload)
+        except Exception:
+            LOG.exception("慢监听器报告发布失败")
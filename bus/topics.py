@@ -31,6 +31,7 @@ class Topics:
     class System:
         CONTROL = "system.control"
         SHUTDOWN = "system.shutdown"
+        BUS = "system.bus"
 
 
 TOPIC_REGISTRY: Dict[str, ModuleTopicProfile] = {}
@@ -1,9 +1,12 @@
 """鞋垫硬件模块的对外接口，封装总线适配与配置载入。"""
 
 from .config import EndpointConfig, InsoleConfig
-from .core.processor import InsoleProcessor, ProcessedFrame
+from .core.frame import InsoleFrame
+from .core.processor import InsoleProcessor, ProcessedBatch, ProcessedFrame
 from .io.logger import DataLogger
 from .insole import InsoleModule
+from .replay import ReplayStats, SessionReplay
+from .shared_ring import SharedFrame, SharedFrameBatch, SharedFrameExporter, SharedFrameReader
 
 __all__ = [
 	"EndpointConfig",
@@ -11,5 +14,13 @@ __all__ = [
 	"InsoleModule",
 	"InsoleProcessor",
 	"ProcessedFrame",
+	"ProcessedBatch",
+	"InsoleFrame",
 	"DataLogger",
+	"SessionReplay",
+	"ReplayStats",
+	"SharedFrameExporter",
+	"SharedFrameReader",
+	"SharedFrame",
+	"SharedFrameBatch",
 ]
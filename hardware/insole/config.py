@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any, Iterable, Optional
 
@@ -47,14 +47,42 @@ class InsoleConfig:
     """鞋垫模块的总配置，包含左右脚、超时与数据路径信息。"""
 
     bind_ip: str = DEFAULT_BIND_IP
-    left: EndpointConfig = EndpointConfig(LEFT_PORT, LEFT_REMOTE_PORT, LEFT_IP)
-    right: EndpointConfig = EndpointConfig(RIGHT_PORT, RIGHT_REMOTE_PORT, RIGHT_IP)
+    left: EndpointConfig = field(default_factory=lambda: EndpointConfig(LEFT_PORT, LEFT_REMOTE_PORT, LEFT_IP))
+    right: EndpointConfig = field(default_factory=lambda: EndpointConfig(RIGHT_PORT, RIGHT_REMOTE_PORT, RIGHT_IP))
     left_csv: Optional[Path] = None
     right_csv: Optional[Path] = None
     ad_threshold: int = MIN_VALID_AD
     connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
     auto_stop_seconds: Optional[float] = None
     record_dir: Path = Path("hardware/insole/records")
+    session_format: str = "jsonl"
+    logger_policy: str = "spill"
+    logger_queue_size: int = 512
+    # 溢出缓冲按帧计：JSONL 每帧约 15 KB、二进制约 1.6 KB，缺省上限约 30 MB
+    logger_spill_size: int = 2048
+    record_mode: str = "continuous"
+    trigger_pre_seconds: float = 5.0
+    trigger_post_seconds: float = 10.0
+    trigger_threshold: Optional[float] = None
+    trigger_max_rate: float = 400.0
+    raw_capture: bool = False
+    capture_only: bool = False
+    calibration_cache_dir: Optional[Path] = None
+    strict_frames: bool = False
+    socket_rcvbuf: Optional[int] = None
+    kernel_timestamps: bool = False
+    track_socket_drops: bool = False
+    metrics_enabled: bool = False
+    metrics_interval: float = 5.0
+    replay_path: Optional[Path] = None
+    replay_speed: float = 1.0
+
+    @property
+    def calibration_cache_path(self) -> Path:
+        """返回校准缓存目录，未配置时默认放在记录目录下的 .calibration_cache。"""
+        if self.calibration_cache_dir is not None:
+            return self.calibration_cache_dir
+        return self.record_dir / ".calibration_cache"
 
     @classmethod
     def from_dict(cls, payload: dict[str, Any], *, base_dir: Path | None = None) -> "InsoleConfig":
@@ -66,6 +94,7 @@ class InsoleConfig:
         record_dir_path = _resolve_search_path(base_dir, payload.get("record_dir", defaults.record_dir))
         left_csv = _resolve_path(base_dir, payload.get("left_csv"))
         right_csv = _resolve_path(base_dir, payload.get("right_csv"))
+        cache_dir = payload.get("calibration_cache_dir")
         return cls(
             bind_ip=str(payload.get("bind_ip", defaults.bind_ip)),
             left=left_cfg,
@@ -76,6 +105,26 @@ class InsoleConfig:
             connect_timeout=float(payload.get("connect_timeout", defaults.connect_timeout)),
             auto_stop_seconds=_to_optional_float(payload.get("auto_stop_seconds", defaults.auto_stop_seconds)),
             record_dir=record_dir_path,
+            session_format=str(payload.get("session_format", defaults.session_format)).lower(),
+            logger_policy=str(payload.get("logger_policy", defaults.logger_policy)).lower(),
+            logger_queue_size=int(payload.get("logger_queue_size", defaults.logger_queue_size)),
+            logger_spill_size=int(payload.get("logger_spill_size", defaults.logger_spill_size)),
+            record_mode=str(payload.get("record_mode", defaults.record_mode)).lower(),
+            trigger_pre_seconds=float(payload.get("trigger_pre_seconds", defaults.trigger_pre_seconds)),
+            trigger_post_seconds=float(payload.get("trigger_post_seconds", defaults.trigger_post_seconds)),
+            trigger_threshold=_to_optional_float(payload.get("trigger_threshold", defaults.trigger_threshold)),
+            trigger_max_rate=float(payload.get("trigger_max_rate", defaults.trigger_max_rate)),
+            raw_capture=bool(payload.get("raw_capture", defaults.raw_capture)),
+            capture_only=bool(payload.get("capture_only", defaults.capture_only)),
+            calibration_cache_dir=_resolve_search_path(base_dir, cache_dir) if cache_dir else None,
+            strict_frames=bool(payload.get("strict_frames", defaults.strict_frames)),
+            socket_rcvbuf=_to_optional_int(payload.get("socket_rcvbuf", defaults.socket_rcvbuf)),
+            kernel_timestamps=bool(payload.get("kernel_timestamps", defaults.kernel_timestamps)),
+            track_socket_drops=bool(payload.get("track_socket_drops", defaults.track_socket_drops)),
+            metrics_enabled=bool(payload.get("metrics_enabled", defaults.metrics_enabled)),
+            metrics_interval=float(payload.get("metrics_interval", defaults.metrics_interval)),
+            replay_path=_resolve_path(base_dir, payload.get("replay_path")),
+            replay_speed=float(payload.get("replay_speed", defaults.replay_speed)),
         )
 
     @classmethod
@@ -101,10 +150,51 @@ class InsoleConfig:
             config.connect_timeout = float(overrides["connect_timeout"])
         if "auto_stop_seconds" in overrides:
             config.auto_stop_seconds = _to_optional_float(overrides["auto_stop_seconds"])
+        if "strict_frames" in overrides:
+            config.strict_frames = bool(overrides["strict_frames"])
+        if "socket_rcvbuf" in overrides:
+            config.socket_rcvbuf = _to_optional_int(overrides["socket_rcvbuf"])
+        if "kernel_timestamps" in overrides:
+            config.kernel_timestamps = bool(overrides["kernel_timestamps"])
+        if "track_socket_drops" in overrides:
+            config.track_socket_drops = bool(overrides["track_socket_drops"])
+        if "metrics_enabled" in overrides:
+            config.metrics_enabled = bool(overrides["metrics_enabled"])
+        if "metrics_interval" in overrides:
+            config.metrics_interval = float(overrides["metrics_interval"])
+        if "session_format" in overrides:
+            config.session_format = str(overrides["session_format"]).lower()
+        if "logger_policy" in overrides:
+            config.logger_policy = str(overrides["logger_policy"]).lower()
+        if "logger_queue_size" in overrides:
+            config.logger_queue_size = int(overrides["logger_queue_size"])
+        if "logger_spill_size" in overrides:
+            config.logger_spill_size = int(overrides["logger_spill_size"])
+        if "record_mode" in overrides:
+            config.record_mode = str(overrides["record_mode"]).lower()
+        if "trigger_pre_seconds" in overrides:
+            config.trigger_pre_seconds = float(overrides["trigger_pre_seconds"])
+        if "trigger_post_seconds" in overrides:
+            config.trigger_post_seconds = float(overrides["trigger_post_seconds"])
+        if "trigger_threshold" in overrides:
+            config.trigger_threshold = _to_optional_float(overrides["trigger_threshold"])
+        if "trigger_max_rate" in overrides:
+            config.trigger_max_rate = float(overrides["trigger_max_rate"])
+        if "raw_capture" in overrides:
+            config.raw_capture = bool(overrides["raw_capture"])
+        if "capture_only" in overrides:
+            config.capture_only = bool(overrides["capture_only"])
+        if "replay_path" in overrides:
+            config.replay_path = _resolve_path(base_dir, overrides["replay_path"])
+        if "replay_speed" in overrides:
+            config.replay_speed = float(overrides["replay_speed"])
         if "record_dir" in overrides:
             record_dir = _resolve_search_path(base_dir, overrides["record_dir"])
             if record_dir is not None:
                 config.record_dir = record_dir
+        if "calibration_cache_dir" in overrides:
+            cache_dir = overrides["calibration_cache_dir"]
+            config.calibration_cache_dir = _resolve_search_path(base_dir, cache_dir) if cache_dir else None
         if "left_csv" in overrides:
             config.left_csv = _resolve_path(base_dir, overrides["left_csv"])
         if "right_csv" in overrides:
@@ -180,3 +270,13 @@ def _to_optional_float(value: Any) -> Optional[float]:
         return float(value)
     except (TypeError, ValueError):
         return None
+
+
+def _to_optional_int(value: Any) -> Optional[int]:
+    """尝试将值转换为整数，失败或空值时返回 None。"""
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -3,6 +3,7 @@
 ROWS = 34  # 鞋垫传感器矩阵的行数
 COLS = 10  # 鞋垫传感器矩阵的列数
 MIN_VALID_AD = 120  # 低于该阈值的 AD 视为噪声
+MAX_VALID_AD = 65535  # AD 采样不超过 16 位，绝对值更大的数值视为非法 token
 LEFT_PORT = 6060  # 左脚默认监听端口
 RIGHT_PORT = 7070  # 右脚默认监听端口
 LEFT_REMOTE_PORT = 8080  # 向左脚下行控制指令的端口
@@ -1,17 +1,35 @@
 """鞋垫模块的核心算法组件。"""
 
-from .calibration import Params, fit_calibration_from_csv, try_get_params
-from .parser import parse_frame_to_matrix
-from .pressure import compute_pressure_matrix, matrix_info
-from .processor import InsoleProcessor, ProcessedFrame
+from .calibration import CALIBRATION_MODEL_VERSION, Params, fit_calibration_from_csv, try_get_params
+from .calibration_cache import CalibrationCache
+from .frame import InsoleFrame
+from .parser import ParseStats, parse_frame, parse_frame_to_matrix
+from .pressure import (
+    CalibrationGrid,
+    apply_calibration_grid,
+    compile_calibration_grid,
+    compute_pressure_matrix,
+    matrix_info,
+)
+from .processor import InsoleProcessor, ProcessedBatch, ProcessedFrame, frame_stats
 
 __all__ = [
+    "CALIBRATION_MODEL_VERSION",
     "Params",
     "fit_calibration_from_csv",
     "try_get_params",
+    "CalibrationCache",
+    "ParseStats",
+    "parse_frame",
     "parse_frame_to_matrix",
+    "CalibrationGrid",
+    "compile_calibration_grid",
+    "apply_calibration_grid",
     "compute_pressure_matrix",
     "matrix_info",
     "InsoleProcessor",
     "ProcessedFrame",
+    "ProcessedBatch",
+    "frame_stats",
+    "InsoleFrame",
 ]
@@ -10,6 +10,9 @@ from ..constants import COLS, ROWS
 
 Params = Dict[str, Tuple[float, float]]
 
+# 拟合模型或网格编译逻辑变化时递增，使旧的校准缓存自动失效
+CALIBRATION_MODEL_VERSION = 1
+
 
 def _fit_linear(xs: List[float], ys: List[float]) -> Tuple[float, float]:
     """使用最小二乘法拟合 y = a * x + b 的线性模型，返回 (a, b)。"""
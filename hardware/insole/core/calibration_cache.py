@@ -0,0 +1,118 @@
+"""校准结果的磁盘缓存：按 CSV 内容哈希保存拟合系数与预编译网格，避免重复解析与拟合。"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..constants import COLS, ROWS
+from .calibration import CALIBRATION_MODEL_VERSION, Params, fit_calibration_from_csv
+from .pressure import CalibrationGrid, compile_calibration_grid
+
+LOG = logging.getLogger(__name__)
+
+_GRID_FIELDS = (
+    "slope",
+    "intercept",
+    "direct",
+    "neighbor_slope",
+    "neighbor_intercept",
+    "neighbor_weight",
+    "neighbor_denominator",
+)
+_NEIGHBOR_FIELDS = {"neighbor_slope", "neighbor_intercept", "neighbor_weight"}
+
+
+def file_digest(path: Path) -> str:
+    """计算文件内容的 SHA-256 摘要，作为缓存键的一部分。"""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CalibrationCache:
+    """以目录为单位管理校准缓存文件，命中时直接返回参数与网格。"""
+
+    def __init__(self, cache_dir: Path | str) -> None:
+        self.cache_dir = Path(cache_dir)
+
+    def load_or_fit(self, csv_path: Path, is_left: bool) -> Tuple[Params, CalibrationGrid]:
+        """读取缓存；未命中、过期或损坏时重新拟合并回写缓存。"""
+        digest = file_digest(csv_path)
+        cache_path = self._cache_path(digest, is_left)
+        cached = self._load(cache_path, digest, is_left)
+        if cached is not None:
+            LOG.debug("命中校准缓存 %s", cache_path)
+            return cached
+        params = fit_calibration_from_csv(csv_path)
+        grid = _compile_side(params, is_left)
+        self._store(cache_path, digest, params, grid)
+        return params, grid
+
+    def _cache_path(self, digest: str, is_left: bool) -> Path:
+        side = "left" if is_left else "right"
+        return self.cache_dir / f"{side}_{digest[:24]}_v{CALIBRATION_MODEL_VERSION}.npz"
+
+    def _load(self, cache_path: Path, digest: str, is_left: bool) -> Optional[Tuple[Params, CalibrationGrid]]:
+        """载入并校验缓存文件，任何不一致都视为未命中。"""
+        if not cache_path.exists():
+            return None
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                if str(data["digest"]) != digest:
+                    raise ValueError("摘要不匹配")
+                if int(data["version"]) != CALIBRATION_MODEL_VERSION:
+                    raise ValueError("模型版本不匹配")
+                if bool(data["is_left"]) != is_left:
+                    raise ValueError("左右脚标记不匹配")
+                keys = [str(key) for key in data["keys"]]
+                values = np.asarray(data["values"], dtype=np.float64).reshape(-1, 2)
+                if len(keys) != values.shape[0]:
+                    raise ValueError("系数数量不匹配")
+                arrays = {name: np.array(data[name]) for name in _GRID_FIELDS}
+        except Exception as exc:
+            LOG.warning("校准缓存 %s 无效，将重新生成: %s", cache_path, exc)
+            return None
+        k = arrays["neighbor_weight"].shape[-1]
+        for name, array in arrays.items():
+            expected = (ROWS, COLS, k) if name in _NEIGHBOR_FIELDS else (ROWS, COLS)
+            if array.shape != expected:
+                LOG.warning("校准缓存 %s 网格形状异常，将重新生成", cache_path)
+                return None
+        params: Params = {key: (float(a), float(b)) for key, (a, b) in zip(keys, values)}
+        arrays["direct"] = arrays["direct"].astype(bool)
+        return params, CalibrationGrid(is_left=is_left, **arrays)
+
+    def _store(self, cache_path: Path, digest: str, params: Params, grid: CalibrationGrid) -> None:
+        """原子化写入缓存文件，写入失败仅记录警告。"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as handle:
+                np.savez(
+                    handle,
+                    digest=np.array(digest),
+                    version=np.array(CALIBRATION_MODEL_VERSION),
+                    is_left=np.array(grid.is_left),
+                    keys=np.array(list(params.keys()), dtype=str),
+                    values=np.array(list(params.values()), dtype=np.float64).reshape(-1, 2),
+                    **{name: getattr(grid, name) for name in _GRID_FIELDS},
+                )
+            os.replace(tmp_path, cache_path)
+        except OSError as exc:
+            LOG.warning("写入校准缓存 %s 失败: %s", cache_path, exc)
+            tmp_path.unlink(missing_ok=True)
+
+
+def _compile_side(params: Params, is_left: bool) -> CalibrationGrid:
+    """仅依据单侧系数编译网格，另一侧参数不参与计算。"""
+    if is_left:
+        return compile_calibration_grid(True, params, {})
+    return compile_calibration_grid(False, {}, params)
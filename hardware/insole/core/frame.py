@@ -0,0 +1,129 @@
+"""数据主题上广播的不可变压力帧：进程内订阅者直接读取只读 NumPy 视图，列表/JSON 形式按需生成并缓存。"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, ClassVar, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .processor import ProcessedFrame, frame_stats
+
+# 兼容旧版字典载荷的键，`frame["pressure"]` 等写法仍可使用
+FRAME_KEYS = ("frame_index", "timestamp", "side", "port", "stats", "pressure")
+
+# 仅在缓存未命中时加锁，保证并发订阅者下每帧最多序列化一次
+_CACHE_LOCK = threading.RLock()
+
+
+def _readonly(matrix: np.ndarray) -> np.ndarray:
+    """返回共享内存的只读视图，订阅者无法改写处理链路中的矩阵。"""
+    view = np.asarray(matrix).view()
+    view.flags.writeable = False
+    return view
+
+
+@dataclass(frozen=True, eq=False)
+class InsoleFrame(Mapping):
+    """`hardware.insole.data` 的 frame 载荷。
+
+    pressure/ad 为只读 NumPy 视图，stats 为只读映射。同时实现只读 Mapping 接口，
+    按旧版字典的键访问；其中 `frame["pressure"]`、`to_dict()` 与 `to_json()` 在首次调用时
+    才转换为 Python 列表/JSON 字符串并缓存，多个订阅者共享同一份结果。
+
+    限速订阅使用 coalesce="mean" 时只对同一只脚的 pressure 求平均，stats 随平均矩阵重算。
+    """
+
+    COALESCE_FIELDS: ClassVar[Tuple[str, ...]] = ("pressure",)
+    COALESCE_GROUP: ClassVar[str] = "side"
+
+    frame_index: int
+    timestamp: float
+    side: str
+    port: int
+    stats: Mapping[str, Any]
+    pressure: np.ndarray
+    ad: Optional[np.ndarray] = None
+    _cache: Dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        _set = object.__setattr__
+        _set(self, "pressure", _readonly(self.pressure))
+        if self.ad is not None:
+            _set(self, "ad", _readonly(self.ad))
+        if not isinstance(self.stats, MappingProxyType):
+            _set(self, "stats", MappingProxyType(self.stats))
+
+    @classmethod
+    def from_processed(cls, result: ProcessedFrame, frame_index: int) -> "InsoleFrame":
+        """由处理结果构造帧载荷，矩阵不复制。"""
+        return cls(
+            frame_index=frame_index,
+            timestamp=result.timestamp,
+            side="left" if result.is_left else "right",
+            port=result.port,
+            stats=result.stats,
+            pressure=result.pressure_matrix,
+            ad=result.ad_matrix,
+        )
+
+    def coalesced(self, *, pressure: np.ndarray) -> "InsoleFrame":
+        """以平均后的压力矩阵重建帧：stats 按该矩阵重算，ad 没有对应的单帧原始值而置为 None。"""
+        return dataclasses.replace(self, pressure=pressure, stats=frame_stats(pressure), ad=None)
+
+    @property
+    def is_left(self) -> bool:
+        """是否为左脚帧。"""
+        return self.side == "left"
+
+    def pressure_list(self) -> List[List[float]]:
+        """压力矩阵的嵌套列表形式，首次调用时生成并缓存。"""
+        return self._cached("pressure", self.pressure.tolist)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """旧版字典载荷（压力为嵌套列表），首次调用时生成并缓存；不含 AD 矩阵。"""
+        return self._cached(
+            "dict",
+            lambda: {
+                "frame_index": self.frame_index,
+                "timestamp": self.timestamp,
+                "side": self.side,
+                "port": self.port,
+                "stats": dict(self.stats),
+                "pressure": self.pressure_list(),
+            },
+        )
+
+    def to_json(self) -> str:
+        """`to_dict()` 的 JSON 字符串，首次调用时生成并缓存。"""
+        return self._cached("json", lambda: json.dumps(self.to_dict(), ensure_ascii=False))
+
+    def _cached(self, key: str, build: Callable[[], Any]) -> Any:
+        cached = self._cache.get(key)
+        if cached is None:
+            with _CACHE_LOCK:
+                cached = self._cache.get(key)
+                if cached is None:
+                    cached = self._cache[key] = build()
+        return cached
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "pressure":
+            return self.pressure_list()
+        if key in FRAME_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in FRAME_KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FRAME_KEYS)
+
+    def __len__(self) -> int:
+        return len(FRAME_KEYS)
@@ -2,35 +2,152 @@
 
 from __future__ import annotations
 
-from typing import List
+import threading
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
-from ..constants import COLS, MIN_VALID_AD, ROWS
+from ..constants import COLS, MAX_VALID_AD, MIN_VALID_AD, ROWS
 
+FrameData = Union[str, bytes, bytearray, memoryview]
 
-def parse_frame_to_matrix(frame: str) -> np.ndarray:
+_FRAME_SIZE = ROWS * COLS
+_FAST_CHARS = b"0123456789,"
+_PAYLOAD_STRIP = b", \t\r\n"
+
+
+class ParseStats:
+    """线程安全的帧解析计数器，区分缺少帧头尾、非法数值与长度不符等异常。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.malformed = 0
+        self.missing_markers = 0
+        self.bad_tokens = 0
+        self.length_mismatch = 0
+
+    def record(self, error: Optional[str] = None) -> None:
+        """登记一帧解析结果，error 为异常类别名称，None 表示正常帧。"""
+        with self._lock:
+            self.frames += 1
+            if error is not None:
+                self.malformed += 1
+                setattr(self, error, getattr(self, error) + 1)
+
+    def reset(self) -> None:
+        """清零全部计数，通常在新会话开始时调用。"""
+        with self._lock:
+            self.frames = 0
+            self.malformed = 0
+            self.missing_markers = 0
+            self.bad_tokens = 0
+            self.length_mismatch = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """返回当前计数的字典副本，便于广播或记录。"""
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "malformed": self.malformed,
+                "missing_markers": self.missing_markers,
+                "bad_tokens": self.bad_tokens,
+                "length_mismatch": self.length_mismatch,
+            }
+
+
+def parse_frame(
+    data: FrameData,
+    *,
+    strict: bool = False,
+    stats: Optional[ParseStats] = None,
+) -> Optional[np.ndarray]:
+    """直接在字节数据上解析 AA..BB 段，整段一次性转换为 34x10 的 int64 AD 数组。
+
+    strict=True 时要求恰好 340 个整数，否则返回 None；宽松模式下保持历史行为
+    （跳过非法数值、不足补零、超出截断），两种模式下异常帧都会计入 stats。
+    """
+    if isinstance(data, str):
+        raw = data.encode("utf-8", errors="ignore")
+    elif isinstance(data, bytes):
+        raw = data
+    else:
+        raw = bytes(data)
+    start = raw.find(b"AA")
+    end = raw.find(b"BB")
+    if start == -1 or end == -1 or end <= start:
+        return _reject("missing_markers", strict, stats)
+    payload = raw[start + 2 : end].strip(_PAYLOAD_STRIP)
+    error: Optional[str] = None
+    values = _convert_bulk(payload)
+    if values is None:
+        values, skipped = _convert_tokens(payload)
+        if skipped:
+            error = "bad_tokens"
+            if strict:
+                return _reject(error, strict, stats)
+    if values.size != _FRAME_SIZE:
+        error = error or "length_mismatch"
+        if strict:
+            return _reject(error, strict, stats)
+        padded = np.zeros(_FRAME_SIZE, dtype=np.int64)
+        count = min(values.size, _FRAME_SIZE)
+        padded[:count] = values[:count]
+        values = padded
+    if stats is not None:
+        stats.record(error)
+    matrix = values.reshape(ROWS, COLS)
+    matrix[matrix < MIN_VALID_AD] = 0
+    return matrix
+
+
+def parse_frame_to_matrix(frame: FrameData) -> np.ndarray:
     """解析一帧字符串数据，提取 AA..BB 段中的 34x10 AD 数组。"""
-    if not frame:
-        return np.zeros((ROWS, COLS), dtype=int)
+    matrix = parse_frame(frame)
+    assert matrix is not None
+    return matrix
+
+
+def _reject(error: str, strict: bool, stats: Optional[ParseStats]) -> Optional[np.ndarray]:
+    """记录异常帧；严格模式返回 None，宽松模式沿用全零矩阵。"""
+    if stats is not None:
+        stats.record(error)
+    if strict:
+        return None
+    return np.zeros((ROWS, COLS), dtype=np.int64)
+
+
+def _convert_bulk(payload: bytes) -> Optional[np.ndarray]:
+    """快速路径：仅含数字与单个逗号分隔时由 NumPy 一次性转换，其余情况（含超出量程的数值）返回 None。"""
+    if not payload:
+        return np.zeros(0, dtype=np.int64)
+    if payload.translate(None, _FAST_CHARS) or b",," in payload:
+        return None
     try:
-        start = frame.find("AA")
-        end = frame.find("BB")
-        if start == -1 or end == -1 or end <= start:
-            return np.zeros((ROWS, COLS), dtype=int)
-        payload = frame[start + 2 : end]
-        numbers: List[int] = []
-        for token in payload.split(","):
-            token = token.strip()
-            if token and token.lstrip("-").isdigit():
-                try:
-                    numbers.append(int(token))
-                except ValueError:
-                    continue
-        if len(numbers) < ROWS * COLS:
-            numbers.extend([0] * (ROWS * COLS - len(numbers)))
-        matrix = np.array(numbers[: ROWS * COLS], dtype=int).reshape(ROWS, COLS)
-        matrix[matrix < MIN_VALID_AD] = 0
-        return matrix
-    except Exception:
-        return np.zeros((ROWS, COLS), dtype=int)
+        values = np.fromstring(payload, dtype=np.int64, sep=",")
+    except ValueError:
+        return None
+    if values.size != payload.count(b",") + 1:
+        return None
+    # 溢出的 token 会被饱和为 int64 上限，交给兼容路径逐个剔除并计数
+    if values.max() > MAX_VALID_AD:
+        return None
+    return values
+
+
+def _convert_tokens(payload: bytes) -> Tuple[np.ndarray, int]:
+    """兼容路径：逐个 token 校验，丢弃无法解析或超出量程的数值并返回丢弃数量。"""
+    numbers: List[int] = []
+    skipped = 0
+    for token in payload.split(b","):
+        token = token.strip()
+        if token and token.lstrip(b"-").isdigit():
+            try:
+                value = int(token)
+            except ValueError:
+                value = None
+            if value is not None and -MAX_VALID_AD <= value <= MAX_VALID_AD:
+                numbers.append(value)
+                continue
+        skipped += 1
+    return np.array(numbers, dtype=np.int64), skipped
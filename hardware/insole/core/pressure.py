@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import math
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
@@ -10,6 +11,9 @@ import numpy as np
 from .calibration import try_get_params
 from ..constants import COLS, ROWS
 
+IDW_NEIGHBORS = 4  # 缺失标定点位参与插值的邻居数量
+IDW_POWER = 2.0  # 反距离加权的幂次
+
 
 def matrix_info(ad_matrix: Optional[np.ndarray]) -> tuple[int, float]:
     """统计矩阵有效点数量与最大值，便于监控硬件数据质量。"""
@@ -55,64 +59,107 @@ def _build_point_param_map(calib: Dict[str, Tuple[float, float]]) -> Dict[Tuple[
     return result
 
 
-def _predict_by_neighbors(
-    row: int,
-    col: int,
-    ad_value: float,
-    point_params: Dict[Tuple[int, int], Tuple[float, float]],
-    k: int = 4,
-    power: float = 2.0,
-) -> float:
-    """利用空间距离加权方式，推测缺少标定点的压力值。"""
-    if ad_value <= 0 or not point_params:
-        return 0.0
-    neighbors: List[Tuple[float, float, float]] = []
-    for (rr, cc), (a, b) in point_params.items():
-        distance = math.hypot(rr - row, cc - col)
-        neighbors.append((distance, a, b))
-    if not neighbors:
-        return 0.0
-    neighbors.sort(key=lambda item: item[0])
-    selected = neighbors[: max(1, min(k, len(neighbors)))]
-    eps = 1e-6
-    numerator = 0.0
-    denominator = 0.0
-    for distance, a, b in selected:
-        weight = 1.0 / (pow(distance, power) + eps)
-        estimate = a * ad_value + b
-        numerator += weight * estimate
-        denominator += weight
-    if denominator <= 0:
-        return 0.0
-    value = numerator / denominator
-    return float(value) if value > 0 else 0.0
+@dataclass(frozen=True)
+class CalibrationGrid:
+    """单侧鞋垫预编译的校准网格，将逐点查表与邻域插值折算为稠密数组。"""
 
+    is_left: bool
+    slope: np.ndarray
+    intercept: np.ndarray
+    direct: np.ndarray
+    neighbor_slope: np.ndarray
+    neighbor_intercept: np.ndarray
+    neighbor_weight: np.ndarray
+    neighbor_denominator: np.ndarray
 
-def compute_pressure_matrix(
-    ad_matrix: np.ndarray,
+    @property
+    def direct_points(self) -> int:
+        """返回拥有直接标定系数的点位数量。"""
+        return int(self.direct.sum())
+
+
+def compile_calibration_grid(
     is_left: bool,
     left_params: Dict[str, Tuple[float, float]],
     right_params: Dict[str, Tuple[float, float]],
-) -> np.ndarray:
-    """根据左右脚校准系数，将 AD 数据映射为压力矩阵。"""
-    if ad_matrix is None or getattr(ad_matrix, "shape", None) != (ROWS, COLS):
-        return np.zeros((ROWS, COLS), dtype=float)
-    output = np.zeros((ROWS, COLS), dtype=float)
+    *,
+    k: int = IDW_NEIGHBORS,
+    power: float = IDW_POWER,
+) -> CalibrationGrid:
+    """将校准系数编译为逐点斜率/截距网格，并预计算缺失点位的 IDW 邻居权重。"""
     calib = left_params if is_left else right_params
     point_params = _build_point_param_map(calib)
+    slope = np.zeros((ROWS, COLS), dtype=np.float64)
+    intercept = np.zeros((ROWS, COLS), dtype=np.float64)
+    direct = np.zeros((ROWS, COLS), dtype=bool)
+    neighbor_slope = np.zeros((ROWS, COLS, k), dtype=np.float64)
+    neighbor_intercept = np.zeros((ROWS, COLS, k), dtype=np.float64)
+    neighbor_weight = np.zeros((ROWS, COLS, k), dtype=np.float64)
+    neighbor_denominator = np.ones((ROWS, COLS), dtype=np.float64)
+    eps = 1e-6
     for row in range(ROWS):
         for col in range(COLS):
-            ad = int(ad_matrix[row, col])
-            if ad <= 0:
-                continue
             params = try_get_params(is_left, row, col, left_params, right_params)
-            if params is None:
-                predicted = _predict_by_neighbors(row, col, float(ad), point_params, k=4, power=2.0)
-                if predicted > 0:
-                    output[row, col] = predicted
+            if params is not None:
+                slope[row, col], intercept[row, col] = params
+                direct[row, col] = True
+                continue
+            if not point_params:
                 continue
-            a, b = params
-            value = a * ad + b
-            if value > 0:
-                output[row, col] = value
-    return output
+            # 与逐点实现保持相同的排序与累加顺序，保证结果逐位一致
+            neighbors: List[Tuple[float, float, float]] = []
+            for (rr, cc), (a, b) in point_params.items():
+                neighbors.append((math.hypot(rr - row, cc - col), a, b))
+            neighbors.sort(key=lambda item: item[0])
+            denominator = 0.0
+            for idx, (distance, a, b) in enumerate(neighbors[: max(1, min(k, len(neighbors)))]):
+                weight = 1.0 / (pow(distance, power) + eps)
+                neighbor_slope[row, col, idx] = a
+                neighbor_intercept[row, col, idx] = b
+                neighbor_weight[row, col, idx] = weight
+                denominator += weight
+            if denominator > 0:
+                neighbor_denominator[row, col] = denominator
+    return CalibrationGrid(
+        is_left=is_left,
+        slope=slope,
+        intercept=intercept,
+        direct=direct,
+        neighbor_slope=neighbor_slope,
+        neighbor_intercept=neighbor_intercept,
+        neighbor_weight=neighbor_weight,
+        neighbor_denominator=neighbor_denominator,
+    )
+
+
+def apply_calibration_grid(ad_matrix: np.ndarray, grid: CalibrationGrid) -> np.ndarray:
+    """使用预编译网格将 AD 数据批量映射为压力矩阵，支持 (..., ROWS, COLS) 形状。"""
+    ad = np.asarray(ad_matrix)
+    if ad.shape[-2:] != (ROWS, COLS):
+        raise ValueError(f"AD 矩阵形状应为 (..., {ROWS}, {COLS})，实际为 {ad.shape}")
+    ad_values = ad.astype(np.int64).astype(np.float64)
+    direct = grid.slope * ad_values + grid.intercept
+    numerator = np.zeros_like(ad_values)
+    for idx in range(grid.neighbor_weight.shape[-1]):
+        estimate = grid.neighbor_slope[..., idx] * ad_values + grid.neighbor_intercept[..., idx]
+        numerator = numerator + grid.neighbor_weight[..., idx] * estimate
+    output = np.where(grid.direct, direct, numerator / grid.neighbor_denominator)
+    keep = (ad_values > 0) & (output > 0)
+    return np.where(keep, output, 0.0)
+
+
+def compute_pressure_matrix(
+    ad_matrix: np.ndarray,
+    is_left: bool,
+    left_params: Dict[str, Tuple[float, float]],
+    right_params: Dict[str, Tuple[float, float]],
+) -> np.ndarray:
+    """根据左右脚校准系数，将 AD 数据映射为压力矩阵。
+
+    每次调用都会重新编译校准网格；高频场景应预先调用 `compile_calibration_grid`
+    并使用 `apply_calibration_grid`。
+    """
+    if ad_matrix is None or getattr(ad_matrix, "shape", None) != (ROWS, COLS):
+        return np.zeros((ROWS, COLS), dtype=float)
+    grid = compile_calibration_grid(is_left, left_params, right_params)
+    return apply_calibration_grid(ad_matrix, grid)
@@ -5,19 +5,24 @@ from __future__ import annotations
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
 from .calibration import Params, fit_calibration_from_csv
-from .parser import parse_frame_to_matrix
-from .pressure import compute_pressure_matrix, matrix_info
+from .calibration_cache import CalibrationCache
+from .parser import FrameData, ParseStats, parse_frame
+from .pressure import CalibrationGrid, apply_calibration_grid, compile_calibration_grid, matrix_info
 from ..constants import COLS, MIN_VALID_AD, ROWS
 
 
 @dataclass
 class ProcessedFrame:
-    """封装处理后的单帧数据，方便在总线上广播。"""
+    """封装处理后的单帧数据，方便在总线上广播。
+
+    timestamp 为接收时刻（启用内核时间戳时来自 SO_TIMESTAMPNS），
+    processed_at 为处理完成时刻，两者之差即为本地处理延迟。
+    """
 
     timestamp: float
     port: int
@@ -25,6 +30,39 @@ class ProcessedFrame:
     ad_matrix: np.ndarray
     pressure_matrix: np.ndarray
     stats: Dict[str, float | int]
+    processed_at: float = 0.0
+
+
+@dataclass
+class ProcessedBatch:
+    """批量处理结果：逐帧字段按列堆叠为 NumPy 数组，矩阵形状为 (N, ROWS, COLS)。"""
+
+    timestamps: np.ndarray
+    ports: np.ndarray
+    is_left: np.ndarray
+    ad_matrices: np.ndarray
+    pressure_matrices: np.ndarray
+    nonzero: np.ndarray
+    max: np.ndarray
+    total_pressure: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    def frame(self, index: int) -> ProcessedFrame:
+        """取出第 index 帧，转换为与 `InsoleProcessor.process` 一致的单帧结构。"""
+        return ProcessedFrame(
+            timestamp=float(self.timestamps[index]),
+            port=int(self.ports[index]),
+            is_left=bool(self.is_left[index]),
+            ad_matrix=self.ad_matrices[index],
+            pressure_matrix=self.pressure_matrices[index],
+            stats={
+                "nonzero": int(self.nonzero[index]),
+                "max": float(self.max[index]),
+                "total_pressure": float(self.total_pressure[index]),
+            },
+        )
 
 
 class InsoleProcessor:
@@ -38,9 +76,16 @@ class InsoleProcessor:
         ad_threshold: int = MIN_VALID_AD,
         left_port: int = 0,
         right_port: int = 0,
+        cache_dir: Optional[Path] = None,
+        strict_frames: bool = False,
     ) -> None:
+        self.cache_dir = cache_dir
+        self.strict_frames = bool(strict_frames)
+        self.parse_stats = ParseStats()
         self.left_params: Params = {}
         self.right_params: Params = {}
+        self._left_grid: Optional[CalibrationGrid] = None
+        self._right_grid: Optional[CalibrationGrid] = None
         self.ad_threshold = int(ad_threshold)
         self._left_port = int(left_port) if left_port else 0
         self._right_port = int(right_port) if right_port else 0
@@ -52,42 +97,68 @@ class InsoleProcessor:
         left_csv: Optional[Path] = None,
         right_csv: Optional[Path] = None,
     ) -> None:
-        """重新加载校准文件，当 GUI 或配置更新时调用。"""
-        self.left_params = {}
-        self.right_params = {}
-        if left_csv and left_csv.exists():
-            self.left_params = fit_calibration_from_csv(left_csv)
-        if right_csv and right_csv.exists():
-            self.right_params = fit_calibration_from_csv(right_csv)
+        """重新加载校准文件，当 GUI 或配置更新时调用；设置 cache_dir 时优先读取磁盘缓存。"""
+        left_params, left_grid = self._load_side(left_csv, is_left=True)
+        right_params, right_grid = self._load_side(right_csv, is_left=False)
+        self.left_params = left_params
+        self.right_params = right_params
+        self._left_grid = left_grid
+        self._right_grid = right_grid
+
+    def _load_side(self, csv_path: Optional[Path], *, is_left: bool) -> Tuple[Params, CalibrationGrid]:
+        """加载单侧校准系数并编译为稠密网格，供逐帧计算直接复用。"""
+        if not csv_path or not csv_path.exists():
+            params: Params = {}
+        elif self.cache_dir is not None:
+            return CalibrationCache(self.cache_dir).load_or_fit(csv_path, is_left)
+        else:
+            params = fit_calibration_from_csv(csv_path)
+        if is_left:
+            return params, compile_calibration_grid(True, params, {})
+        return params, compile_calibration_grid(False, {}, params)
 
     def set_ports(self, left_port: int, right_port: int) -> None:
         """记录 UDP 监听端口，用于判断当前帧来自左脚还是右脚。"""
         self._left_port = int(left_port)
         self._right_port = int(right_port)
 
-    def process(self, frame: str, port: int) -> Optional[ProcessedFrame]:
-        """将原始字符串帧转换为结构化数据；异常时返回 None。"""
-        timestamp = time.time()
-        ad_matrix = parse_frame_to_matrix(frame)
-        if ad_matrix.shape != (ROWS, COLS):
+    def process(
+        self,
+        frame: FrameData,
+        port: int,
+        timestamp: Optional[float] = None,
+        *,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> Optional[ProcessedFrame]:
+        """将原始帧（文本或字节）转换为结构化数据；异常时返回 None。
+
+        timestamp 为接收时刻，缺省时使用当前时间。传入 timings 字典时，
+        会写入 parse/threshold/calibrate/stats 各阶段耗时（秒）。
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if timings is not None:
+            mark = time.perf_counter()
+        ad_matrix = parse_frame(frame, strict=self.strict_frames, stats=self.parse_stats)
+        if timings is not None:
+            mark = _lap(timings, "parse", mark)
+        if ad_matrix is None:
             return None
         filtered = ad_matrix.copy()
         threshold = self.ad_threshold
         if threshold > 0:
             filtered[filtered < threshold] = 0
+        if timings is not None:
+            mark = _lap(timings, "threshold", mark)
         is_left = port == self._left_port
-        pressure = compute_pressure_matrix(
-            filtered,
-            is_left=is_left,
-            left_params=self.left_params,
-            right_params=self.right_params,
-        )
-        nonzero, max_val = matrix_info(pressure)
-        payload: Dict[str, float | int] = {
-            "nonzero": int(nonzero),
-            "max": float(max_val),
-            "total_pressure": float(pressure.sum()),
-        }
+        grid = self._left_grid if is_left else self._right_grid
+        assert grid is not None
+        pressure = apply_calibration_grid(filtered, grid)
+        if timings is not None:
+            mark = _lap(timings, "calibrate", mark)
+        payload = frame_stats(pressure)
+        if timings is not None:
+            _lap(timings, "stats", mark)
         return ProcessedFrame(
             timestamp=timestamp,
             port=port,
@@ -95,4 +166,107 @@ class InsoleProcessor:
             ad_matrix=filtered,
             pressure_matrix=pressure,
             stats=payload,
+            processed_at=time.time(),
+        )
+
+    def wrap_pressure(self, pressure: np.ndarray, port: int, timestamp: Optional[float] = None) -> ProcessedFrame:
+        """将已校准的压力矩阵（例如回放的录制数据）封装为处理结果，跳过解析与校准。
+
+        录制文件不含原始 AD 值，因此 ad_matrix 为全零矩阵。
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        matrix = np.asarray(pressure, dtype=np.float64)
+        if matrix.shape != (ROWS, COLS):
+            raise ValueError(f"压力矩阵形状应为 ({ROWS}, {COLS})，实际为 {matrix.shape}")
+        return ProcessedFrame(
+            timestamp=timestamp,
+            port=port,
+            is_left=port == self._left_port,
+            ad_matrix=np.zeros((ROWS, COLS), dtype=np.int64),
+            pressure_matrix=matrix,
+            stats=frame_stats(matrix),
+            processed_at=time.time(),
         )
+
+    def process_batch(
+        self,
+        frames: Sequence[FrameData],
+        ports: Union[int, Sequence[int], np.ndarray],
+        timestamps: Optional[Union[Sequence[float], np.ndarray]] = None,
+    ) -> ProcessedBatch:
+        """批量处理多帧原始数据，适用于回放录制、离线重标定与接收突发后的追赶。
+
+        严格模式下解析失败的帧会连同其端口与时间戳一起被剔除。
+        """
+        count = len(frames)
+        ad_matrices = np.zeros((count, ROWS, COLS), dtype=np.int64)
+        valid = np.ones(count, dtype=bool)
+        for index, frame in enumerate(frames):
+            matrix = parse_frame(frame, strict=self.strict_frames, stats=self.parse_stats)
+            if matrix is None:
+                valid[index] = False
+            else:
+                ad_matrices[index] = matrix
+        port_array = np.broadcast_to(np.asarray(ports, dtype=np.int64), (count,))
+        if timestamps is None:
+            timestamps = np.full(count, time.time(), dtype=np.float64)
+        ts_array = np.asarray(timestamps, dtype=np.float64).reshape(count)
+        if not valid.all():
+            ad_matrices, port_array, ts_array = ad_matrices[valid], port_array[valid], ts_array[valid]
+        return self.process_ad_batch(ad_matrices, port_array, ts_array)
+
+    def process_ad_batch(
+        self,
+        ad_matrices: np.ndarray,
+        ports: Union[int, Sequence[int], np.ndarray],
+        timestamps: Optional[Union[Sequence[float], np.ndarray]] = None,
+    ) -> ProcessedBatch:
+        """对已解析的 (N, ROWS, COLS) AD 堆栈执行阈值过滤、校准与统计。"""
+        ad = np.array(ad_matrices, dtype=np.int64)
+        if ad.ndim != 3 or ad.shape[1:] != (ROWS, COLS):
+            raise ValueError(f"AD 堆栈形状应为 (N, {ROWS}, {COLS})，实际为 {ad.shape}")
+        count = ad.shape[0]
+        port_array = np.broadcast_to(np.asarray(ports, dtype=np.int64), (count,)).copy()
+        if timestamps is None:
+            ts_array = np.full(count, time.time(), dtype=np.float64)
+        else:
+            ts_array = np.asarray(timestamps, dtype=np.float64).reshape(count)
+        threshold = self.ad_threshold
+        if threshold > 0:
+            ad[ad < threshold] = 0
+        is_left = port_array == self._left_port
+        pressure = np.zeros(ad.shape, dtype=np.float64)
+        if is_left.any():
+            pressure[is_left] = apply_calibration_grid(ad[is_left], self._left_grid)
+        if not is_left.all():
+            pressure[~is_left] = apply_calibration_grid(ad[~is_left], self._right_grid)
+        nonzero = (pressure > 0).sum(axis=(1, 2))
+        max_values = pressure.max(axis=(1, 2), initial=0.0)
+        return ProcessedBatch(
+            timestamps=ts_array,
+            ports=port_array,
+            is_left=is_left,
+            ad_matrices=ad,
+            pressure_matrices=pressure,
+            nonzero=nonzero,
+            max=np.where(nonzero > 0, max_values, 0.0),
+            total_pressure=pressure.sum(axis=(1, 2)),
+        )
+
+
+def frame_stats(pressure: np.ndarray) -> Dict[str, float | int]:
+    """计算单帧压力矩阵的非零点数、峰值与总压力。"""
+    nonzero, max_val = matrix_info(pressure)
+    return {
+        "nonzero": int(nonzero),
+        "max": float(max_val),
+        "total_pressure": float(pressure.sum()),
+    }
+
+
+def _lap(timings: Dict[str, float], stage: str, mark: float) -> float:
+    """记录自 mark 起的阶段耗时，并返回新的起点。"""
+    now = time.perf_counter()
+    timings[stage] = now - mark
+    return now
@@ -4,22 +4,36 @@ from __future__ import annotations
 
 import logging
 import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from bus.event_bus import EventBus, Subscription
 from bus.topics import Topics, register_module_topics
 from hardware.iHardware import IHardware
-from utils.communication.udp import UdpReceiver, UdpSender
+from utils.communication.udp import ReceiveOptions, UdpReceiverGroup, UdpSender
+from utils.metrics import StageMetrics
 
 from .config import InsoleConfig
+from .core.parser import FrameData
+from .core.frame import InsoleFrame
 from .core.processor import InsoleProcessor, ProcessedFrame
+from .io.capture import RawCaptureWriter
 from .io.logger import DataLogger
+from .io.trigger import TriggeredRecorder
+from .replay import ReplayStats, SessionReplay
 
 InsoleTopics = Topics.Hardware.Insole
 
 LOG = logging.getLogger(__name__)
 
+# 单帧处理链路的计时阶段：接收排队 → 解析 → 阈值 → 校准 → 统计 → 日志入队 → 总线分发，total 为端到端
+PIPELINE_STAGES = ("receive", "parse", "threshold", "calibrate", "stats", "logger", "dispatch", "total")
+RECORD_MODES = ("continuous", "triggered")
+
+# 处理链路中接收压力帧的记录对象：连续记录直接使用 DataLogger，触发式记录使用其包装
+FrameSink = Union[DataLogger, TriggeredRecorder]
+
 
 class InsoleModule(IHardware):
     """实现 IHardware 接口的鞋垫模块，实现启动、停止与数据广播。"""
@@ -37,7 +51,8 @@ class InsoleModule(IHardware):
         self._config_root = config_root or Path.cwd()
         self._lock = threading.RLock()
         self._subscriptions: list[Subscription] = []
-        self._receivers: list[UdpReceiver] = []
+        self._receiver: Optional[UdpReceiverGroup] = None
+        self._replay: Optional[SessionReplay] = None
         self._senders: list[UdpSender] = []
         self._connection_timer: Optional[threading.Timer] = None
         self._auto_stop_timer: Optional[threading.Timer] = None
@@ -47,11 +62,20 @@ class InsoleModule(IHardware):
             ad_threshold=config.ad_threshold,
             left_port=config.left.listen_port,
             right_port=config.right.listen_port,
+            cache_dir=config.calibration_cache_path,
+            strict_frames=config.strict_frames,
         )
         self._logger: Optional[DataLogger] = None
+        self._recorder: Optional[TriggeredRecorder] = None
+        self._capture: Optional[RawCaptureWriter] = None
+        self._capture_only = False
         self._running = False
         self._frame_counter = 0
         self._active_config: Optional[InsoleConfig] = None
+        self._metrics = StageMetrics(PIPELINE_STAGES)
+        self._metrics_enabled = config.metrics_enabled
+        self._metrics_interval = config.metrics_interval
+        self._metrics_published_at = 0.0
 
     def attach(self) -> None:
         """在应用启动阶段调用，注册指令监听并广播就绪状态。"""
@@ -77,6 +101,10 @@ class InsoleModule(IHardware):
             self.stop()
         elif action == "reload_calibration":
             self.reload_calibration(payload)
+        elif action == "trigger":
+            self.trigger(str(payload.get("reason", "command")))
+        elif action == "metrics":
+            self.publish(InsoleTopics.STATUS, event="metrics", payload=self.metrics_snapshot())
         else:
             LOG.warning("Unknown insole command: %s", action)
 
@@ -85,13 +113,15 @@ class InsoleModule(IHardware):
         self.detach()
 
     def start(self, overrides: Dict[str, Any] | None = None) -> None:
-        """启动硬件，会读取配置、打开 UDP、发送 start 指令。"""
+        """启动硬件，会读取配置、打开 UDP、发送 start 指令；配置 replay_path 时改为回放会话。"""
         overrides = overrides or {}
         with self._lock:
             if self._running:
                 LOG.info("Insole module already running; ignoring start command")
                 return
         effective_config = self.config.merged(overrides, base_dir=self._config_root)
+        if effective_config.record_mode not in RECORD_MODES:
+            raise ValueError(f"未知的记录模式: {effective_config.record_mode}，可选 {RECORD_MODES}")
         LOG.info(
             "Starting insole module: bind_ip=%s left_port=%s right_port=%s",
             effective_config.bind_ip,
@@ -99,26 +129,69 @@ class InsoleModule(IHardware):
             effective_config.right.listen_port,
         )
         self._processor.ad_threshold = int(effective_config.ad_threshold)
+        self._processor.strict_frames = effective_config.strict_frames
+        self._processor.parse_stats.reset()
+        self._metrics.reset()
+        self._metrics_enabled = effective_config.metrics_enabled
+        self._metrics_interval = effective_config.metrics_interval
+        self._metrics_published_at = time.time()
         self._processor.set_ports(effective_config.left.listen_port, effective_config.right.listen_port)
+        self._processor.cache_dir = effective_config.calibration_cache_path
         self._processor.reload_calibration(
             left_csv=effective_config.left_csv,
             right_csv=effective_config.right_csv,
         )
         self._report_calibration_usage(effective_config)
-        self._build_receivers(effective_config)
-        self._build_senders(effective_config)
-        logger = DataLogger(out_dir=effective_config.record_dir)
-        logger.start_session(meta=self._session_meta(effective_config))
+        replay = effective_config.replay_path is not None
+        capture_only = effective_config.capture_only and not replay
+        if replay:
+            self._build_replay(effective_config)
+        else:
+            self._build_receivers(effective_config)
+            self._build_senders(effective_config)
+        capture: Optional[RawCaptureWriter] = None
+        if not replay and (effective_config.raw_capture or capture_only):
+            capture = RawCaptureWriter(effective_config.record_dir)
+            capture.start_session(meta=self._session_meta(effective_config))
+        self._capture_only = capture_only
+        self._capture = capture
+        logger: Optional[DataLogger] = None
+        if not capture_only:
+            logger = DataLogger(
+                out_dir=effective_config.record_dir,
+                session_format=effective_config.session_format,
+                queue_size=effective_config.logger_queue_size,
+                policy=effective_config.logger_policy,
+                spill_size=effective_config.logger_spill_size,
+                on_backpressure=self._on_logger_backpressure,
+            )
+            logger.start_session(meta=self._session_meta(effective_config))
+        recorder: Optional[TriggeredRecorder] = None
+        if logger is not None and effective_config.record_mode == "triggered":
+            recorder = TriggeredRecorder(
+                logger,
+                pre_seconds=effective_config.trigger_pre_seconds,
+                post_seconds=effective_config.trigger_post_seconds,
+                threshold=effective_config.trigger_threshold,
+                max_rate=effective_config.trigger_max_rate,
+                on_trigger=self._on_recording_triggered,
+            )
         with self._lock:
             self._logger = logger
+            self._recorder = recorder
             self._running = True
             self.connected = False
             self._frame_counter = 0
             self._active_config = effective_config
-            self._schedule_connection_check(effective_config.connect_timeout)
+            if not replay:
+                self._schedule_connection_check(effective_config.connect_timeout)
             self._schedule_auto_stop(effective_config.auto_stop_seconds)
         self.publish(InsoleTopics.STATUS, event="starting", payload=self._session_meta(effective_config))
-        self._send_command("start")
+        if replay:
+            assert self._replay is not None
+            self._replay.start()
+        else:
+            self._send_command("start")
 
     def stop(self) -> None:
         """停止硬件采集，关闭 UDP 并结束日志写入。"""
@@ -129,16 +202,34 @@ class InsoleModule(IHardware):
         LOG.info("Stopping insole module")
         self._cancel_timer("_connection_timer")
         self._cancel_timer("_auto_stop_timer")
-        self._send_command("stop")
-        for receiver in self._receivers:
-            receiver.stop()
-        self._receivers.clear()
+        if self._replay is not None:
+            self._replay.stop()
+            self._replay = None
+        else:
+            self._send_command("stop")
+        socket_drops: Dict[int, int] = {}
+        if self._receiver is not None:
+            socket_drops = self._receiver.drop_counts()
+            self._receiver.stop()
+            self._receiver = None
         for sender in self._senders:
             sender.close()
         self._senders.clear()
+        capture_info: Optional[Dict[str, Any]] = None
+        capture = self._capture
+        if capture is not None:
+            path = capture.stop_session()
+            capture_info = {"path": str(path), "datagrams": capture.datagrams, "bytes": capture.bytes_written}
+            LOG.info("Raw capture saved to %s", path)
+            self._capture = None
+        recorder = self._recorder
+        trigger_stats = recorder.stats() if recorder is not None else None
+        self._recorder = None
         logger = self._logger
+        logger_stats: Optional[Dict[str, Any]] = None
         if logger:
             try:
+                logger_stats = logger.backpressure_stats()
                 saved_path = logger.stop_session(save=True)
                 if saved_path:
                     LOG.info("Session saved to %s", saved_path)
@@ -147,7 +238,17 @@ class InsoleModule(IHardware):
         with self._lock:
             self._active_config = None
         self.connected = False
-        self.publish(InsoleTopics.STATUS, event="stopped", payload=None)
+        self.publish(
+            InsoleTopics.STATUS,
+            event="stopped",
+            payload={
+                "parse": self._processor.parse_stats.snapshot(),
+                "socket_drops": socket_drops,
+                "capture": capture_info,
+                "logger": logger_stats,
+                "trigger": trigger_stats,
+            },
+        )
 
     def reload_calibration(self, payload: Dict[str, Any]) -> None:
         """重新加载校准文件，可在运行时动态更新参数。"""
@@ -155,6 +256,7 @@ class InsoleModule(IHardware):
             config = self._active_config or self.config
         new_config = config.merged(payload, base_dir=self._config_root)
         LOG.info("Reloading calibration for insole module")
+        self._processor.cache_dir = new_config.calibration_cache_path
         self._processor.reload_calibration(
             left_csv=new_config.left_csv,
             right_csv=new_config.right_csv,
@@ -164,6 +266,19 @@ class InsoleModule(IHardware):
             if self._running:
                 self._active_config = new_config
 
+    def trigger(self, reason: str = "manual") -> Optional[Dict[str, Any]]:
+        """触发式记录模式下写出触发前缓冲并打开记录窗口，可由总线指令或外部事件调用。"""
+        recorder = self._recorder
+        if recorder is None:
+            LOG.warning("Insole trigger ignored: record_mode is not 'triggered' or module is stopped")
+            return None
+        return recorder.trigger(reason)
+
+    def socket_drops(self) -> Dict[int, int]:
+        """返回各监听端口的内核丢包计数，需在配置中启用 track_socket_drops。"""
+        receiver = self._receiver
+        return receiver.drop_counts() if receiver is not None else {}
+
     def _on_bus_command(
         self,
         action: str,
@@ -180,22 +295,38 @@ class InsoleModule(IHardware):
         self.handle_command(action, merged)
 
     def _build_receivers(self, config: InsoleConfig) -> None:
-        """基于配置创建并启动左右脚的 UDP 监听器。"""
-        for receiver in self._receivers:
-            receiver.stop()
-        self._receivers.clear()
-        left = UdpReceiver(config.left.listen_port, self._on_udp_frame, config.bind_ip)
-        right = UdpReceiver(config.right.listen_port, self._on_udp_frame, config.bind_ip)
+        """基于配置创建监听组，由单个 I/O 线程服务左右脚端口。"""
+        if self._receiver is not None:
+            self._receiver.stop()
+            self._receiver = None
+        options = ReceiveOptions(
+            rcvbuf=config.socket_rcvbuf,
+            kernel_timestamps=config.kernel_timestamps,
+            track_drops=config.track_socket_drops,
+        )
+        receiver = UdpReceiverGroup(self._on_udp_datagram, config.bind_ip, binary=True, options=options)
         try:
-            left.start()
-            right.start()
+            receiver.set_ports([config.left.listen_port, config.right.listen_port])
+            receiver.start()
         except Exception as exc:
             LOG.exception("Failed to start UDP receivers: %s", exc)
-            left.stop()
-            right.stop()
+            receiver.stop()
             self.publish(InsoleTopics.STATUS, event="receiver_error", payload={"message": str(exc)})
             raise
-        self._receivers.extend([left, right])
+        self._receiver = receiver
+
+    def _build_replay(self, config: InsoleConfig) -> None:
+        """创建会话回放源并立即打开文件，代替 UDP 接收；文件无法读取时在日志会话开始前抛出。"""
+        assert config.replay_path is not None
+        replay = SessionReplay(
+            config.replay_path,
+            self._on_replay_frame,
+            speed=config.replay_speed,
+            on_finished=self._on_replay_finished,
+            on_datagram=self._on_udp_frame,
+        )
+        replay.open()
+        self._replay = replay
 
     def _build_senders(self, config: InsoleConfig) -> None:
         """创建用于发送 start/stop 指令的 UDP 发送器。"""
@@ -245,15 +376,109 @@ class InsoleModule(IHardware):
         LOG.warning("Insole hardware did not respond within timeout")
         self.publish(InsoleTopics.STATUS, event="connection_timeout", payload=None)
 
-    def _on_udp_frame(self, frame: str, port: int) -> None:
+    def _on_udp_datagram(self, view: memoryview, length: int, port: int, recv_ts: float) -> None:
+        """二进制 UDP 回调：直接处理接收缓冲区中的数据，时间戳取接收时刻。
+
+        启用原始捕获时先在接收线程中追加数据报；仅捕获模式下不再解析与广播。
+        """
+        frame = view[:length]
+        capture = self._capture
+        if capture is not None:
+            capture.append(frame, port, recv_ts)
+            if self._capture_only:
+                if self._running:
+                    self._next_frame_index(port)
+                return
+        self._on_udp_frame(frame, port, recv_ts)
+
+    def _on_udp_frame(self, frame: FrameData, port: int, recv_ts: Optional[float] = None) -> None:
         """UDP 回调：处理数据帧并广播解析结果。"""
         with self._lock:
             if not self._running:
                 return
-            logger = self._logger
-        result = self._processor.process(frame, port)
+            logger = self._recorder or self._logger
+        if self._metrics_enabled:
+            self._on_udp_frame_timed(frame, port, recv_ts, logger)
+            return
+        result = self._processor.process(frame, port, timestamp=recv_ts)
         if result is None:
             return
+        self._dispatch(result, logger)
+
+    def _on_replay_frame(self, pressure: Any, is_left: bool, timestamp: float) -> None:
+        """回放回调：录制数据已是压力矩阵，跳过解析与校准，其余流程与实时采集一致。"""
+        with self._lock:
+            if not self._running:
+                return
+            logger = self._recorder or self._logger
+            config = self._active_config or self.config
+        port = config.left.listen_port if is_left else config.right.listen_port
+        self._dispatch(self._processor.wrap_pressure(pressure, port, timestamp), logger)
+
+    def _on_replay_finished(self, stats: ReplayStats) -> None:
+        """回放结束（完成、失败或被停止）时广播统计并收尾会话；失败原因见 payload 的 error。"""
+        self.publish(InsoleTopics.STATUS, event="replay_finished", payload=stats.as_dict())
+        replay = self._replay
+        if replay is not None and replay.stats is stats:
+            self.stop()
+
+    def _dispatch(
+        self,
+        result: ProcessedFrame,
+        logger: Optional[FrameSink],
+        timings: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """分配帧序号、写入日志并在总线上广播；传入 timings 时写入 logger/dispatch 阶段耗时（秒）。"""
+        frame_index = self._next_frame_index(result.port)
+        if timings is not None:
+            mark = time.perf_counter()
+        if logger and logger.active:
+            logger.append(result.is_left, result.pressure_matrix, ts=result.timestamp)
+        if timings is not None:
+            dispatch_start = time.perf_counter()
+            timings["logger"] = dispatch_start - mark
+        payload = self._frame_payload(result, frame_index)
+        self.publish(InsoleTopics.DATA, frame=payload)
+        if timings is not None:
+            timings["dispatch"] = time.perf_counter() - dispatch_start
+
+    def _on_udp_frame_timed(
+        self,
+        frame: FrameData,
+        port: int,
+        recv_ts: Optional[float],
+        logger: Optional[FrameSink],
+    ) -> None:
+        """在 `_on_udp_frame` 的处理流程外记录各阶段耗时并按周期上报。"""
+        started = time.time()
+        timings: Dict[str, float] = {}
+        if recv_ts is not None:
+            timings["receive"] = started - recv_ts
+        result = self._processor.process(frame, port, timestamp=recv_ts, timings=timings)
+        if result is None:
+            self._metrics.record(timings)
+            return
+        self._dispatch(result, logger, timings)
+        finished = time.time()
+        timings["total"] = finished - (recv_ts if recv_ts is not None else started)
+        self._metrics.record(timings)
+        interval = self._metrics_interval
+        if interval > 0 and finished - self._metrics_published_at >= interval:
+            self._metrics_published_at = finished
+            self.publish(InsoleTopics.STATUS, event="metrics", payload=self.metrics_snapshot(reset=True))
+
+    def _on_recording_triggered(self, event: Dict[str, Any]) -> None:
+        """触发记录时广播触发原因与写出的触发前帧数。"""
+        LOG.info("Insole recording triggered: %s", event)
+        self.publish(InsoleTopics.STATUS, event="triggered", payload=event)
+
+    def _on_logger_backpressure(self, stats: Dict[str, Any]) -> None:
+        """日志写入跟不上时广播背压计数，DataLogger 已按间隔节流。"""
+        LOG.warning("Insole logger backpressure: %s", stats)
+        self.publish(InsoleTopics.STATUS, event="logger_backpressure", payload=stats)
+
+    def _next_frame_index(self, port: int) -> int:
+        """分配帧序号，并在首次收到数据时广播连接事件。"""
         with self._lock:
             if not self.connected:
                 self.connected = True
@@ -261,16 +486,26 @@ class InsoleModule(IHardware):
                 self._cancel_timer("_connection_timer")
             frame_index = self._frame_counter
             self._frame_counter += 1
-        if logger and logger.active:
-            logger.append(result.is_left, result.pressure_matrix, ts=result.timestamp)
-        payload = self._frame_payload(result, frame_index)
-        self.publish(InsoleTopics.DATA, frame=payload)
+        return frame_index
+
+    def metrics_snapshot(self, *, reset: bool = False) -> Dict[str, Any]:
+        """返回各处理阶段的延迟分布（毫秒）及解析、丢包、日志背压计数，reset=True 时清零阶段统计。"""
+        logger = self._logger
+        return {
+            "stages": self._metrics.snapshot(reset=reset),
+            "parse": self._processor.parse_stats.snapshot(),
+            "socket_drops": self.socket_drops(),
+            "logger": logger.backpressure_stats() if logger is not None else None,
+        }
 
     def _session_meta(self, config: InsoleConfig) -> Dict[str, Any]:
         """构建会话元信息，便于记录与 UI 展示配置详情。"""
         return {
             "bind_ip": config.bind_ip,
             "ad_threshold": config.ad_threshold,
+            "strict_frames": config.strict_frames,
+            "socket_rcvbuf": config.socket_rcvbuf,
+            "kernel_timestamps": config.kernel_timestamps,
             "connect_timeout": config.connect_timeout,
             "auto_stop_seconds": config.auto_stop_seconds,
             "left": {
@@ -286,22 +521,22 @@ class InsoleModule(IHardware):
             "left_csv": str(config.left_csv) if config.left_csv else None,
             "right_csv": str(config.right_csv) if config.right_csv else None,
             "record_dir": str(config.record_dir),
+            "session_format": config.session_format,
+            "logger_policy": config.logger_policy,
+            "record_mode": config.record_mode,
+            "raw_capture": config.raw_capture,
+            "capture_only": config.capture_only,
+            "replay_path": str(config.replay_path) if config.replay_path else None,
+            "replay_speed": config.replay_speed,
             "calibration_points": {
                 "left": len(self._processor.left_params),
                 "right": len(self._processor.right_params),
             },
         }
 
-    def _frame_payload(self, result: ProcessedFrame, frame_index: int) -> Dict[str, Any]:
-        """将处理结果组织成标准化结构，供总线广播使用。"""
-        return {
-            "frame_index": frame_index,
-            "timestamp": result.timestamp,
-            "side": "left" if result.is_left else "right",
-            "port": result.port,
-            "stats": result.stats,
-            "pressure": result.pressure_matrix.tolist(),
-        }
+    def _frame_payload(self, result: ProcessedFrame, frame_index: int) -> InsoleFrame:
+        """将处理结果包装为不可变帧供总线广播；矩阵不复制，列表形式由订阅者按需生成。"""
+        return InsoleFrame.from_processed(result, frame_index)
 
     def _report_calibration_usage(self, config: InsoleConfig) -> None:
         """校准文件加载后输出统计，便于排查配置路径问题。"""
@@ -1,5 +1,27 @@
 """鞋垫模块的输入输出组件。"""
 
-from .logger import DataLogger
+from .capture import CaptureHeader, RawCaptureReader, RawCaptureWriter, RawDatagram, is_capture_file
+from .logger import SESSION_FORMATS, DataLogger
+from .reader import SessionFrame, SessionReader, SessionSlice
+from .session_format import RECORD_DTYPE, BinarySessionHeader, read_header
+from .trigger import PretriggerRing, TriggeredRecorder
+from .writer import SessionWriter
 
-__all__ = ["DataLogger"]
+__all__ = [
+    "DataLogger",
+    "SESSION_FORMATS",
+    "RECORD_DTYPE",
+    "BinarySessionHeader",
+    "read_header",
+    "SessionReader",
+    "SessionFrame",
+    "SessionSlice",
+    "RawCaptureWriter",
+    "RawCaptureReader",
+    "RawDatagram",
+    "CaptureHeader",
+    "is_capture_file",
+    "SessionWriter",
+    "PretriggerRing",
+    "TriggeredRecorder",
+]
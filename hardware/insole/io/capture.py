@@ -0,0 +1,190 @@
+"""原始数据报捕获：在接收线程中以长度前缀格式追加未解析的 UDP 帧，供离线解析与重标定。
+
+文件布局（小端序）::
+
+    [0, 16)      文件标识 `INSRAW01`、版本号、元数据 JSON 长度
+    [16, ...)    UTF-8 编码的会话元数据 JSON
+    之后         连续记录：recv_ts(float64) + port(uint16) + length(uint32) + length 字节原始数据
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+CAPTURE_MAGIC = b"INSRAW01"
+CAPTURE_VERSION = 1
+CAPTURE_SUFFIX = ".insraw"
+_HEADER = struct.Struct("<8sII")
+_RECORD = struct.Struct("<dHI")
+
+
+@dataclass
+class RawDatagram:
+    """一条捕获记录。"""
+
+    recv_ts: float
+    port: int
+    data: bytes
+
+
+@dataclass
+class CaptureHeader:
+    """捕获文件头。"""
+
+    session_id: str
+    session_start: float
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+class RawCaptureWriter:
+    """将原始数据报直接写入带缓冲的文件，写入开销仅为一次打包与内存拷贝。
+
+    `append` 可在接收线程中直接调用；数据先进入进程内缓冲区，超过 flush_interval
+    秒或缓冲区写满时才落盘，异常退出最多丢失一个缓冲区的数据。
+    """
+
+    def __init__(
+        self,
+        out_dir: Path | str = "records",
+        *,
+        buffer_size: int = 1 << 20,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.out_dir = Path(out_dir)
+        self._buffer_size = max(1 << 12, int(buffer_size))
+        self._flush_interval = max(0.05, float(flush_interval))
+        self._lock = threading.Lock()
+        self._handle: Optional[BinaryIO] = None
+        self._file_path: Optional[Path] = None
+        self._last_flush = 0.0
+        self.datagrams = 0
+        self.bytes_written = 0
+
+    @property
+    def active(self) -> bool:
+        """指示当前是否正在捕获。"""
+        return self._handle is not None
+
+    @property
+    def file_path(self) -> Optional[Path]:
+        """返回当前（或最近一次）捕获文件路径。"""
+        return self._file_path
+
+    def start_session(self, meta: Optional[Dict[str, Any]] = None) -> Path:
+        """创建捕获文件并写入文件头。"""
+        with self._lock:
+            if self._handle is not None:
+                raise RuntimeError("已有捕获会话正在运行，无法重复开启")
+            start = time.time()
+            session_id = time.strftime("session_%Y%m%d-%H%M%S", time.localtime(start))
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"{session_id}{CAPTURE_SUFFIX}"
+            document = json.dumps(
+                {"session_id": session_id, "session_start": start, "meta": dict(meta or {})},
+                ensure_ascii=False,
+            ).encode("utf-8")
+            handle = path.open("wb", buffering=self._buffer_size)
+            handle.write(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, len(document)))
+            handle.write(document)
+            self._handle = handle
+            self._file_path = path
+            self._last_flush = time.monotonic()
+            self.datagrams = 0
+            self.bytes_written = 0
+            return path
+
+    def append(self, data: bytes | bytearray | memoryview, port: int, recv_ts: float) -> None:
+        """追加一条原始数据报；会话未开启时忽略。"""
+        with self._lock:
+            handle = self._handle
+            if handle is None:
+                return
+            length = len(data)
+            handle.write(_RECORD.pack(recv_ts, port, length))
+            handle.write(data)
+            self.datagrams += 1
+            self.bytes_written += _RECORD.size + length
+            now = time.monotonic()
+            if now - self._last_flush >= self._flush_interval:
+                handle.flush()
+                self._last_flush = now
+
+    def stop_session(self) -> Optional[Path]:
+        """刷新并关闭文件，返回文件路径。"""
+        with self._lock:
+            handle = self._handle
+            self._handle = None
+        if handle is not None:
+            handle.close()
+        return self._file_path
+
+
+class RawCaptureReader:
+    """顺序读取捕获文件，末尾不完整的记录（例如写入中断）会被忽略。"""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self.header, self._data_offset = _read_header(handle)
+
+    def __iter__(self) -> Iterator[RawDatagram]:
+        with self.path.open("rb") as handle:
+            handle.seek(self._data_offset)
+            while True:
+                prefix = handle.read(_RECORD.size)
+                if len(prefix) < _RECORD.size:
+                    return
+                recv_ts, port, length = _RECORD.unpack(prefix)
+                data = handle.read(length)
+                if len(data) < length:
+                    return
+                yield RawDatagram(recv_ts=recv_ts, port=port, data=data)
+
+    def batches(self, size: int = 1024) -> Iterator[Tuple[List[bytes], np.ndarray, np.ndarray]]:
+        """按 size 条一批产出 (帧列表, 端口数组, 时间戳数组)，可直接交给 `InsoleProcessor.process_batch`。"""
+        size = max(1, int(size))
+        frames: List[bytes] = []
+        ports: List[int] = []
+        timestamps: List[float] = []
+        for datagram in self:
+            frames.append(datagram.data)
+            ports.append(datagram.port)
+            timestamps.append(datagram.recv_ts)
+            if len(frames) >= size:
+                yield frames, np.array(ports, dtype=np.int64), np.array(timestamps, dtype=np.float64)
+                frames, ports, timestamps = [], [], []
+        if frames:
+            yield frames, np.array(ports, dtype=np.int64), np.array(timestamps, dtype=np.float64)
+
+
+def is_capture_file(path: Path | str) -> bool:
+    """根据文件标识判断是否为原始捕获文件。"""
+    with Path(path).open("rb") as handle:
+        return handle.read(len(CAPTURE_MAGIC)) == CAPTURE_MAGIC
+
+
+def _read_header(handle: BinaryIO) -> Tuple[CaptureHeader, int]:
+    """解析文件头，返回头信息与首条记录偏移。"""
+    fixed = handle.read(_HEADER.size)
+    if len(fixed) < _HEADER.size:
+        raise ValueError("文件过短，不是有效的原始捕获文件")
+    magic, version, doc_len = _HEADER.unpack(fixed)
+    if magic != CAPTURE_MAGIC:
+        raise ValueError("文件标识不匹配，不是原始捕获文件")
+    if version != CAPTURE_VERSION:
+        raise ValueError(f"不支持的捕获文件版本: {version}")
+    document = json.loads(handle.read(doc_len).decode("utf-8")) if doc_len else {}
+    header = CaptureHeader(
+        session_id=str(document.get("session_id", "")),
+        session_start=float(document.get("session_start", 0.0)),
+        meta=dict(document.get("meta") or {}),
+    )
+    return header, _HEADER.size + doc_len
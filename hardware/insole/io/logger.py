@@ -1,4 +1,4 @@
-"""异步 JSONL 记录器：负责在后台线程中落盘鞋垫的压力数据。"""
+"""异步会话记录器：负责在后台线程中以 JSONL 或定长二进制格式落盘鞋垫的压力数据。"""
 
 from __future__ import annotations
 
@@ -7,16 +7,32 @@ import os
 import queue
 import threading
 import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional
 
 import numpy as np
 
 from ..constants import COLS, ROWS
+from .session_format import BINARY_SUFFIX, RECORD_DTYPE, finalize_header, write_header
+
+SESSION_FORMATS = ("jsonl", "binary")
+BACKPRESSURE_POLICIES = ("block", "drop_newest", "drop_oldest", "spill")
 
 
 class DataLogger:
-    """管理一次传感器采集会话的文件写入逻辑。"""
+    """管理一次传感器采集会话的文件写入逻辑。
+
+    写入队列满时按 policy 处理新帧：
+    - ``block``：最多阻塞 block_timeout 秒等待空位，超时丢弃该帧；
+    - ``drop_newest``：立即丢弃新帧；
+    - ``drop_oldest``：移除队列中最早的一帧后放入新帧；
+    - ``spill``：转入内存溢出缓冲（最多 spill_size 帧），写线程清空主队列后按序写出，溢出缓冲也满时丢弃新帧。
+      缓冲中的 JSONL 帧约 15 KB/帧、二进制帧约 1.6 KB/帧，spill_size 即决定额外内存上限。
+    除 block 外调用方都不会等待；会话头尾等控制记录不受策略影响，始终保证写入。
+    缺省 block 与旧版行为一致（等待 flush_interval），区别是超时后丢弃并计数而不再抛出 queue.Full；
+    `InsoleModule` 按配置 `logger_policy`（缺省 spill）创建记录器，不会阻塞接收线程。
+    """
 
     def __init__(
         self,
@@ -25,7 +41,19 @@ class DataLogger:
         flush_every: int = 32,
         queue_size: int = 512,
         flush_interval: float = 0.5,
+        session_format: str = "jsonl",
+        policy: str = "block",
+        spill_size: int = 2048,
+        block_timeout: Optional[float] = None,
+        on_backpressure: Optional[Callable[[Dict[str, Any]], None]] = None,
+        report_interval: float = 1.0,
     ) -> None:
+        if session_format not in SESSION_FORMATS:
+            raise ValueError(f"未知的会话格式: {session_format}，可选 {SESSION_FORMATS}")
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"未知的背压策略: {policy}，可选 {BACKPRESSURE_POLICIES}")
+        self.session_format = session_format
+        self.policy = policy
         self.out_dir = Path(out_dir)
         self.out_dir.mkdir(parents=True, exist_ok=True)
         self._lock = threading.Lock()
@@ -45,7 +73,21 @@ class DataLogger:
         self._sentinel = object()
         self._frame_count = 0
         self._last_frame_ts = 0.0
+        # 写线程实际写出的帧数与末帧时间戳，背压丢弃的帧不计入
+        self._written_frames = 0
+        self._written_ts = 0.0
         self._end_recorded = False
+        self._spill: Deque[Any] = deque()
+        self._spill_size = max(0, int(spill_size))
+        self._spill_lock = threading.Lock()
+        self._block_timeout = self._flush_interval if block_timeout is None else max(0.0, float(block_timeout))
+        self._on_backpressure = on_backpressure
+        self._report_interval = max(0.0, float(report_interval))
+        self._last_report = 0.0
+        self._dropped = 0
+        self._delayed = 0
+        self._spilled = 0
+        self._spill_peak = 0
 
     @property
     def active(self) -> bool:
@@ -63,10 +105,14 @@ class DataLogger:
             self._stop_time = 0.0
             self._meta = dict(meta or {})
             self._session_id = time.strftime("session_%Y%m%d-%H%M%S", time.localtime(self._start_time))
-            self._file_path = self.out_dir / f"{self._session_id}.jsonl"
+            suffix = BINARY_SUFFIX if self.session_format == "binary" else ".jsonl"
+            self._file_path = self.out_dir / f"{self._session_id}{suffix}"
             self._frame_count = 0
             self._last_frame_ts = 0.0
+            self._written_frames = 0
+            self._written_ts = 0.0
             self._end_recorded = False
+            self._reset_backpressure()
             self._queue = queue.Queue(maxsize=self._queue_size)
             queue_ref = self._queue
             writer_thread = threading.Thread(
@@ -110,6 +156,10 @@ class DataLogger:
             session_id = self._session_id
             self._last_frame_ts = float(ts)
 
+        if self.session_format == "binary":
+            # 二进制格式只排队必要字段，编码推迟到写线程按批完成
+            self._submit_frame((float(ts), frame_idx, 1 if side_is_left else 0, payload_matrix))
+            return
         payload = {
             "type": "frame",
             "session_id": session_id,
@@ -121,7 +171,7 @@ class DataLogger:
             "cols": COLS,
             "pressure": payload_matrix.tolist(),
         }
-        self._submit_queue(payload)
+        self._submit_frame(payload)
 
     def stop_session(self, save: bool = True) -> Optional[Path]:
         """结束当前会话，可选择保留文件或清理文件。"""
@@ -165,13 +215,12 @@ class DataLogger:
             if file_path is None or queue_ref is None:
                 return file_path or Path()
             if not self._end_recorded:
+                # frames/last_frame_ts/dropped 由写线程写出该记录时按实际落盘情况填写
                 payload = {
                     "type": "session_end",
                     "session_id": self._session_id,
                     "session_start": self._start_time,
                     "session_stop": self._stop_time or self._last_frame_ts,
-                    "frames": self._frame_count,
-                    "last_frame_ts": self._last_frame_ts,
                 }
                 self._end_recorded = True
             else:
@@ -196,31 +245,123 @@ class DataLogger:
         if self._writer_exception is not None:
             raise RuntimeError("数据写线程发生异常") from self._writer_exception
 
+    def backpressure_stats(self) -> Dict[str, Any]:
+        """返回本次会话的背压计数：丢弃帧数、延迟帧数（等待或进入溢出缓冲）及队列深度。"""
+        queue_ref = self._queue
+        with self._spill_lock:
+            return {
+                "policy": self.policy,
+                "dropped": self._dropped,
+                "delayed": self._delayed,
+                "spilled": self._spilled,
+                "spill_depth": len(self._spill),
+                "spill_peak": self._spill_peak,
+                "queue_depth": queue_ref.qsize() if queue_ref is not None else 0,
+            }
+
+    def _reset_backpressure(self) -> None:
+        with self._spill_lock:
+            self._spill.clear()
+            self._dropped = 0
+            self._delayed = 0
+            self._spilled = 0
+            self._spill_peak = 0
+            self._last_report = 0.0
+
     def _submit_queue(self, item: Any) -> None:
-        """将任务放入写入队列，必要时阻塞等待。"""
+        """提交会话头尾等控制记录：不受背压策略影响，队列满时持续等待写线程。"""
         queue_ref = self._queue
         if queue_ref is None:
             raise RuntimeError("写入队列尚未就绪")
         self._ensure_writer_ok()
-        try:
-            queue_ref.put(item, block=False)
+        if self.policy == "spill":
+            with self._spill_lock:
+                # 溢出缓冲非空时必须排在其后以保持先后顺序；控制记录不计入溢出容量
+                if self._spill or not _try_put(queue_ref, item):
+                    self._spill.append(item)
+            return
+        while True:
+            try:
+                queue_ref.put(item, timeout=self._flush_interval)
+                return
+            except queue.Full:
+                self._ensure_writer_ok()
+
+    def _submit_frame(self, item: Any) -> None:
+        """按背压策略提交一帧，除 block 策略外从不等待。"""
+        queue_ref = self._queue
+        if queue_ref is None:
+            return
+        self._ensure_writer_ok()
+        policy = self.policy
+        if policy == "spill":
+            with self._spill_lock:
+                if not self._spill and _try_put(queue_ref, item):
+                    return
+                self._delayed += 1
+                if len(self._spill) >= self._spill_size:
+                    self._dropped += 1
+                else:
+                    self._spill.append(item)
+                    self._spilled += 1
+                    self._spill_peak = max(self._spill_peak, len(self._spill))
+        elif _try_put(queue_ref, item):
+            return
+        elif policy == "block":
+            with self._spill_lock:
+                self._delayed += 1
+            try:
+                queue_ref.put(item, timeout=self._block_timeout)
+            except queue.Full:
+                with self._spill_lock:
+                    self._dropped += 1
+        else:
+            lost = 1
+            if policy == "drop_oldest" and _evict_oldest_frame(queue_ref) and not _try_put(queue_ref, item):
+                lost = 2  # 腾出的空位被其他线程抢占，新帧同样丢弃
+            with self._spill_lock:
+                self._dropped += lost
+        self._maybe_report()
+
+    def _maybe_report(self) -> None:
+        """发生背压时按 report_interval 节流回调一次统计。"""
+        callback = self._on_backpressure
+        if callback is None:
             return
-        except queue.Full:
+        now = time.monotonic()
+        if now - self._last_report < self._report_interval:
+            return
+        self._last_report = now
+        callback(self.backpressure_stats())
+
+    def _next_item(self, queue_ref: queue.Queue, timeout: float) -> Any:
+        """写线程取下一条记录：主队列优先，主队列为空时取溢出缓冲，两者皆空时等待 timeout。"""
+        try:
+            return queue_ref.get_nowait()
+        except queue.Empty:
             pass
-        queue_ref.put(item, timeout=self._flush_interval)
+        if self._spill:
+            with self._spill_lock:
+                if self._spill:
+                    return self._spill.popleft()
+        try:
+            return queue_ref.get(timeout=timeout)
+        except queue.Empty:
+            return None
 
     def _writer_loop(self, file_path: Path, queue_ref: queue.Queue) -> None:
         """后台线程：批量取出数据并刷新到磁盘。"""
-        buffer: list[dict[str, Any]] = []
+        buffer: list[Any] = []
         last_flush = time.monotonic()
         try:
-            with file_path.open("w", encoding="utf-8") as handle:
+            if self.session_format == "binary":
+                opened = file_path.open("wb")
+            else:
+                opened = file_path.open("w", encoding="utf-8")
+            with opened as handle:
                 while True:
                     timeout = max(0.0, self._flush_interval - (time.monotonic() - last_flush))
-                    try:
-                        item = queue_ref.get(timeout=timeout)
-                    except queue.Empty:
-                        item = None
+                    item = self._next_item(queue_ref, timeout)
                     if item is self._sentinel:
                         break
                     if item is not None:
@@ -237,8 +378,85 @@ class DataLogger:
             self._writer_done.set()
 
     def _write_batch(self, handle: Any, batch: list) -> None:
-        """将一组 JSON 记录写入文件并立即刷新。"""
+        """将一组记录写入文件并立即刷新。"""
+        if self.session_format == "binary":
+            self._write_binary_batch(handle, batch)
+            return
         for payload in batch:
+            if payload.get("type") == "frame":
+                self._written_frames += 1
+                self._written_ts = payload["frame_ts"]
+            elif payload.get("type") == "session_end":
+                payload = self._session_end(payload)
             handle.write(json.dumps(payload, ensure_ascii=False))
             handle.write("\n")
         handle.flush()
+
+    def _session_end(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """补全会话尾记录：写出的帧数、末帧时间戳与背压丢弃帧数。"""
+        with self._spill_lock:
+            dropped = self._dropped
+        return {**payload, "frames": self._written_frames, "last_frame_ts": self._written_ts, "dropped": dropped}
+
+    def _write_binary_batch(self, handle: Any, batch: list) -> None:
+        """二进制格式：会话头/尾为字典，帧为元组，连续帧打包为一次写入。"""
+        frames: list = []
+        for item in batch:
+            if isinstance(item, tuple):
+                frames.append(item)
+                self._written_frames += 1
+                self._written_ts = item[0]
+                continue
+            self._flush_binary_frames(handle, frames)
+            if item.get("type") == "session_meta":
+                write_header(handle, session_id=item["session_id"], session_start=item["session_start"], meta=item["meta"])
+            elif item.get("type") == "session_end":
+                item = self._session_end(item)
+                finalize_header(
+                    handle,
+                    frames=item["frames"],
+                    session_stop=item["session_stop"],
+                    last_frame_ts=item["last_frame_ts"],
+                    dropped=item["dropped"],
+                )
+        self._flush_binary_frames(handle, frames)
+        handle.flush()
+
+    @staticmethod
+    def _flush_binary_frames(handle: Any, frames: list) -> None:
+        """将累积的帧元组编码为定长记录数组并写出。"""
+        if not frames:
+            return
+        timestamps, indices, sides, matrices = zip(*frames)
+        records = np.zeros(len(frames), dtype=RECORD_DTYPE)
+        records["frame_ts"] = timestamps
+        records["frame_index"] = indices
+        records["side"] = sides
+        records["pressure"] = np.stack(matrices)
+        handle.write(records.tobytes())
+        frames.clear()
+
+
+def _try_put(queue_ref: queue.Queue, item: Any) -> bool:
+    """非阻塞放入队列，成功返回 True。"""
+    try:
+        queue_ref.put_nowait(item)
+        return True
+    except queue.Full:
+        return False
+
+
+def _is_frame(item: Any) -> bool:
+    """判断队列中的记录是否为帧（二进制格式为元组，JSONL 为 type=frame 的字典）。"""
+    return isinstance(item, tuple) or (isinstance(item, dict) and item.get("type") == "frame")
+
+
+def _evict_oldest_frame(queue_ref: queue.Queue) -> bool:
+    """在队列锁内移除最早的一帧，跳过控制记录。"""
+    with queue_ref.mutex:
+        for index, item in enumerate(queue_ref.queue):
+            if _is_frame(item):
+                del queue_ref.queue[index]
+                queue_ref.not_full.notify()
+                return True
+    return False
@@ -0,0 +1,304 @@
+"""会话回读：随机访问 `DataLogger` 产出的 JSONL 或二进制会话，按帧号、时间段与左右脚筛选。"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+from ..constants import COLS, ROWS
+from .session_format import BINARY_MAGIC, RECORD_DTYPE, read_header
+
+LOG = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx.npz"
+INDEX_VERSION = 1
+_INDEX_FIELDS = {
+    "binary": ("frame_indices", "timestamps", "is_left"),
+    "jsonl": ("frame_indices", "timestamps", "is_left", "offsets", "lengths", "meta_offset"),
+}
+
+_FRAME_MARK = b'"type": "frame"'
+_FRAME_TS = re.compile(rb'"frame_ts":\s*([-+0-9.eE]+)')
+_FRAME_INDEX = re.compile(rb'"frame_index":\s*(\d+)')
+_SIDE = re.compile(rb'"side":\s*(\d)')
+
+
+@dataclass
+class SessionFrame:
+    """单帧回读结果。"""
+
+    frame_index: int
+    timestamp: float
+    is_left: bool
+    pressure: np.ndarray
+
+
+@dataclass
+class SessionSlice:
+    """一段连续帧的回读结果，压力矩阵堆叠为 (N, ROWS, COLS) 的 float32 数组。"""
+
+    frame_indices: np.ndarray
+    timestamps: np.ndarray
+    is_left: np.ndarray
+    pressure: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+
+class SessionReader:
+    """打开一次会话文件并提供随机访问。
+
+    首次打开时扫描一遍生成旁路索引 `<文件名>.idx.npz`（逐帧时间戳、帧号与左右脚，
+    JSONL 另含每行的字节偏移），之后的时间定位只查索引。二进制会话直接内存映射，
+    按需读取被选中的记录；JSONL 会话只解析被选中的行。源文件大小或修改时间变化时
+    索引自动重建。
+    """
+
+    def __init__(self, path: Path | str, *, write_index: bool = True) -> None:
+        self.path = Path(path)
+        self.meta: Dict[str, Any] = {}
+        self.session_id = ""
+        self.session_start = 0.0
+        self._handle = self.path.open("rb")
+        self._records: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._lengths: Optional[np.ndarray] = None
+        if self._handle.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            self.format = "binary"
+            self._open_binary(write_index)
+        else:
+            self.format = "jsonl"
+            self._open_jsonl(write_index)
+        # 时间戳通常单调，单调时用二分查找，否则退化为布尔掩码
+        self._monotonic = bool(np.all(np.diff(self.timestamps) >= 0)) if len(self) > 1 else True
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    def __enter__(self) -> "SessionReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """释放文件句柄与内存映射。"""
+        self._records = None
+        if not self._handle.closed:
+            self._handle.close()
+
+    def frame(self, index: int) -> SessionFrame:
+        """按文件内顺序读取第 index 帧，支持负数下标。"""
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(f"帧序号 {index} 超出范围 [0, {count})")
+        if self._records is not None:
+            record = self._records[index]
+            pressure = np.array(record["pressure"], dtype=np.float32)
+        else:
+            pressure = self._read_jsonl_pressure(index)
+        return SessionFrame(
+            frame_index=int(self.frame_indices[index]),
+            timestamp=float(self.timestamps[index]),
+            is_left=bool(self.is_left[index]),
+            pressure=pressure,
+        )
+
+    def slice(
+        self,
+        t0: Optional[float] = None,
+        t1: Optional[float] = None,
+        *,
+        side: Optional[str] = None,
+    ) -> SessionSlice:
+        """读取 t0 <= frame_ts < t1 的全部帧，side 可取 'left'/'right' 进行筛选。"""
+        return self._gather(self._select(t0, t1, side))
+
+    def chunks(
+        self,
+        size: int = 1024,
+        *,
+        t0: Optional[float] = None,
+        t1: Optional[float] = None,
+        side: Optional[str] = None,
+    ) -> Iterator[SessionSlice]:
+        """按 size 帧一块依次产出 `SessionSlice`，适合离线批处理而不一次性载入整段会话。"""
+        size = max(1, int(size))
+        indices = self._select(t0, t1, side)
+        for start in range(0, indices.size, size):
+            yield self._gather(indices[start : start + size])
+
+    def _select(self, t0: Optional[float], t1: Optional[float], side: Optional[str]) -> np.ndarray:
+        """将时间范围与左右脚条件转换为帧下标数组。"""
+        count = len(self)
+        if self._monotonic:
+            lo = 0 if t0 is None else int(np.searchsorted(self.timestamps, t0, side="left"))
+            hi = count if t1 is None else int(np.searchsorted(self.timestamps, t1, side="left"))
+            indices = np.arange(lo, max(lo, hi), dtype=np.int64)
+        else:
+            mask = np.ones(count, dtype=bool)
+            if t0 is not None:
+                mask &= self.timestamps >= t0
+            if t1 is not None:
+                mask &= self.timestamps < t1
+            indices = np.flatnonzero(mask)
+        if side is not None:
+            if side not in {"left", "right"}:
+                raise ValueError(f"side 只能为 'left' 或 'right'，实际为 {side!r}")
+            indices = indices[self.is_left[indices] == (side == "left")]
+        return indices
+
+    def _gather(self, indices: np.ndarray) -> SessionSlice:
+        """读取给定下标的帧并堆叠。"""
+        if self._records is not None:
+            records = self._records[indices]
+            pressure = np.ascontiguousarray(records["pressure"], dtype=np.float32)
+        else:
+            pressure = np.zeros((indices.size, ROWS, COLS), dtype=np.float32)
+            for row, index in enumerate(indices):
+                pressure[row] = self._read_jsonl_pressure(int(index))
+        return SessionSlice(
+            frame_indices=self.frame_indices[indices],
+            timestamps=self.timestamps[indices],
+            is_left=self.is_left[indices],
+            pressure=pressure,
+        )
+
+    def _open_binary(self, write_index: bool) -> None:
+        """解析文件头并内存映射记录区，记录数以实际文件长度为准。"""
+        self._handle.seek(0)
+        header = read_header(self._handle)
+        self.session_id = header.session_id
+        self.session_start = header.session_start
+        self.meta = header.meta
+        count = max(0, (self.path.stat().st_size - header.header_size) // header.record_size)
+        if count:
+            records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=header.header_size, shape=(count,))
+        else:
+            records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._records = records
+        # 逐帧字段分散在整条记录中，直接读取会触及全部页面，因此同样缓存到索引
+        loaded = self._load_or_build_index(
+            write_index,
+            lambda: {
+                "frame_indices": np.asarray(records["frame_index"], dtype=np.int64),
+                "timestamps": np.asarray(records["frame_ts"], dtype=np.float64),
+                "is_left": np.asarray(records["side"]) == 1,
+            },
+        )
+        self.frame_indices = loaded["frame_indices"]
+        self.timestamps = loaded["timestamps"]
+        self.is_left = loaded["is_left"]
+
+    def _open_jsonl(self, write_index: bool) -> None:
+        """载入或重建 JSONL 旁路索引，并解析会话头。"""
+        loaded = self._load_or_build_index(write_index, self._scan_jsonl)
+        self._offsets = loaded["offsets"]
+        self._lengths = loaded["lengths"]
+        self.frame_indices = loaded["frame_indices"]
+        self.timestamps = loaded["timestamps"]
+        self.is_left = loaded["is_left"]
+        meta_offset = int(loaded["meta_offset"])
+        if meta_offset >= 0:
+            self._handle.seek(meta_offset)
+            header = json.loads(self._handle.readline())
+            self.session_id = str(header.get("session_id", ""))
+            self.session_start = float(header.get("session_start", 0.0))
+            self.meta = dict(header.get("meta") or {})
+
+    def _scan_jsonl(self) -> Dict[str, np.ndarray]:
+        """逐行扫描一次，仅用正则提取帧字段而不解析压力数组。"""
+        offsets = []
+        lengths = []
+        frame_indices = []
+        timestamps = []
+        sides = []
+        meta_offset = -1
+        self._handle.seek(0)
+        offset = 0
+        for line in self._handle:
+            if _FRAME_MARK in line:
+                ts_match = _FRAME_TS.search(line)
+                side_match = _SIDE.search(line)
+                index_match = _FRAME_INDEX.search(line)
+                if ts_match and side_match and line.endswith(b"\n"):
+                    offsets.append(offset)
+                    lengths.append(len(line))
+                    timestamps.append(float(ts_match.group(1)))
+                    sides.append(side_match.group(1) == b"1")
+                    frame_indices.append(int(index_match.group(1)) if index_match else len(frame_indices))
+            elif meta_offset < 0 and b'"session_meta"' in line:
+                meta_offset = offset
+            offset += len(line)
+        return {
+            "offsets": np.array(offsets, dtype=np.int64),
+            "lengths": np.array(lengths, dtype=np.int64),
+            "frame_indices": np.array(frame_indices, dtype=np.int64),
+            "timestamps": np.array(timestamps, dtype=np.float64),
+            "is_left": np.array(sides, dtype=bool),
+            "meta_offset": np.array(meta_offset, dtype=np.int64),
+        }
+
+    def _load_or_build_index(
+        self,
+        write_index: bool,
+        scan: Callable[[], Dict[str, np.ndarray]],
+    ) -> Dict[str, np.ndarray]:
+        """优先读取旁路索引，缺失或过期时调用 scan 重建并按需回写。"""
+        index_path = self.path.with_name(self.path.name + INDEX_SUFFIX)
+        stat = self.path.stat()
+        loaded = self._load_index(index_path, stat)
+        if loaded is None:
+            loaded = scan()
+            if write_index:
+                self._store_index(index_path, stat, loaded)
+        return loaded
+
+    def _load_index(self, index_path: Path, stat: os.stat_result) -> Optional[Dict[str, np.ndarray]]:
+        """读取旁路索引，源文件变化或索引损坏时返回 None。"""
+        if not index_path.exists():
+            return None
+        try:
+            with np.load(index_path, allow_pickle=False) as data:
+                if int(data["version"]) != INDEX_VERSION:
+                    return None
+                if int(data["source_size"]) != stat.st_size or int(data["source_mtime_ns"]) != stat.st_mtime_ns:
+                    return None
+                return {name: np.array(data[name]) for name in _INDEX_FIELDS[self.format]}
+        except Exception as exc:
+            LOG.warning("会话索引 %s 无效，将重新生成: %s", index_path, exc)
+            return None
+
+    def _store_index(self, index_path: Path, stat: os.stat_result, index: Dict[str, np.ndarray]) -> None:
+        """原子化写入旁路索引，失败时仅记录警告（例如只读目录）。"""
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        try:
+            with tmp_path.open("wb") as handle:
+                np.savez(
+                    handle,
+                    version=np.array(INDEX_VERSION),
+                    source_size=np.array(stat.st_size),
+                    source_mtime_ns=np.array(stat.st_mtime_ns),
+                    **index,
+                )
+            os.replace(tmp_path, index_path)
+        except OSError as exc:
+            LOG.warning("写入会话索引 %s 失败: %s", index_path, exc)
+            tmp_path.unlink(missing_ok=True)
+
+    def _read_jsonl_pressure(self, index: int) -> np.ndarray:
+        """定位并解析单行 JSONL 帧的压力矩阵。"""
+        assert self._offsets is not None and self._lengths is not None
+        self._handle.seek(int(self._offsets[index]))
+        payload = json.loads(self._handle.read(int(self._lengths[index])))
+        return np.asarray(payload["pressure"], dtype=np.float32).reshape(ROWS, COLS)
@@ -0,0 +1,131 @@
+"""二进制会话文件格式：定长文件头 + 元数据 JSON + 定长帧记录，可直接内存映射读取。
+
+文件布局（小端序）::
+
+    [0, 64)              定长文件头，见 `HEADER_STRUCT`
+    [64, header_size)    UTF-8 编码的会话元数据 JSON，按 64 字节对齐补零
+    [header_size, ...)   连续的 `RECORD_DTYPE` 记录
+
+frames/session_stop/last_frame_ts 与背压丢弃帧数 dropped 在会话结束时回写；
+写入中途异常退出的文件可依据文件长度推算记录数。
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict
+
+import numpy as np
+
+from ..constants import COLS, ROWS
+
+BINARY_MAGIC = b"INSOLEB1"
+BINARY_VERSION = 1
+BINARY_SUFFIX = ".insb"
+HEADER_STRUCT = struct.Struct("<8sIIIHHQdddII")
+HEADER_SIZE = 64
+_ALIGNMENT = 64
+_FINAL_FIELDS_OFFSET = 24  # frames/session_stop/last_frame_ts 连续存放于此偏移
+_FINAL_FIELDS = struct.Struct("<Qdd")
+_DROPPED_OFFSET = 60  # 早期文件此处为补零，读出即 0
+_DROPPED = struct.Struct("<I")
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("frame_ts", "<f8"),
+        ("frame_index", "<u4"),
+        ("side", "u1"),
+        ("reserved", "u1", (3,)),
+        ("pressure", "<f4", (ROWS, COLS)),
+    ]
+)
+
+
+@dataclass
+class BinarySessionHeader:
+    """二进制会话文件头的解析结果。"""
+
+    session_id: str
+    session_start: float
+    header_size: int
+    record_size: int
+    rows: int = ROWS
+    cols: int = COLS
+    frames: int = 0
+    session_stop: float = 0.0
+    last_frame_ts: float = 0.0
+    dropped: int = 0
+    meta: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = 0.0
+
+
+def write_header(handle: BinaryIO, *, session_id: str, session_start: float, meta: Dict[str, Any]) -> int:
+    """写入文件头与元数据块，返回首条记录的偏移。"""
+    document = json.dumps(
+        {"session_id": session_id, "session_start": session_start, "meta": meta, "created_at": session_start},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    header_size = HEADER_SIZE + len(document)
+    header_size += -header_size % _ALIGNMENT
+    fixed = HEADER_STRUCT.pack(
+        BINARY_MAGIC,
+        BINARY_VERSION,
+        header_size,
+        RECORD_DTYPE.itemsize,
+        ROWS,
+        COLS,
+        0,
+        0.0,
+        0.0,
+        session_start,
+        len(document),
+        0,
+    )
+    handle.write(fixed.ljust(HEADER_SIZE, b"\0"))
+    handle.write(document.ljust(header_size - HEADER_SIZE, b"\0"))
+    return header_size
+
+
+def finalize_header(
+    handle: BinaryIO, *, frames: int, session_stop: float, last_frame_ts: float, dropped: int = 0
+) -> None:
+    """回写帧数、结束时间与丢弃帧数，写入位置恢复到文件末尾。"""
+    position = handle.tell()
+    handle.seek(_FINAL_FIELDS_OFFSET)
+    handle.write(_FINAL_FIELDS.pack(int(frames), float(session_stop), float(last_frame_ts)))
+    handle.seek(_DROPPED_OFFSET)
+    handle.write(_DROPPED.pack(int(dropped)))
+    handle.seek(position)
+
+
+def read_header(handle: BinaryIO) -> BinarySessionHeader:
+    """从文件起始处解析文件头，格式不符时抛出 ValueError。"""
+    fixed = handle.read(HEADER_SIZE)
+    if len(fixed) < HEADER_SIZE:
+        raise ValueError("文件过短，不是有效的二进制会话")
+    (magic, version, header_size, record_size, rows, cols, frames, stop, last_ts, start, doc_len, dropped) = (
+        HEADER_STRUCT.unpack_from(fixed)
+    )
+    if magic != BINARY_MAGIC:
+        raise ValueError("文件标识不匹配，不是二进制会话文件")
+    if version != BINARY_VERSION:
+        raise ValueError(f"不支持的二进制会话版本: {version}")
+    if record_size != RECORD_DTYPE.itemsize or (rows, cols) != (ROWS, COLS):
+        raise ValueError("记录尺寸与当前矩阵规格不一致")
+    document = json.loads(handle.read(doc_len).decode("utf-8")) if doc_len else {}
+    return BinarySessionHeader(
+        session_id=str(document.get("session_id", "")),
+        session_start=start,
+        header_size=header_size,
+        record_size=record_size,
+        rows=rows,
+        cols=cols,
+        frames=frames,
+        session_stop=stop,
+        last_frame_ts=last_ts,
+        dropped=dropped,
+        meta=dict(document.get("meta") or {}),
+        created_at=float(document.get("created_at", start)),
+    )
@@ -0,0 +1,161 @@
+"""触发式记录：预分配环形缓冲保存最近若干秒的帧，触发后连同触发前窗口一并写入日志。"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..constants import COLS, ROWS
+from .logger import DataLogger
+
+
+class PretriggerRing:
+    """固定容量的帧环形缓冲，写满后覆盖最旧的帧；存储在构造时一次性分配。"""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.is_left = np.zeros(self.capacity, dtype=bool)
+        self.pressure = np.zeros((self.capacity, ROWS, COLS), dtype=np.float32)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, ts: float, is_left: bool, pressure: np.ndarray) -> bool:
+        """写入一帧，返回是否覆盖了尚未取出的旧帧。"""
+        slot = self._head
+        self.timestamps[slot] = ts
+        self.is_left[slot] = is_left
+        self.pressure[slot] = pressure
+        self._head = (slot + 1) % self.capacity
+        overwritten = self._size == self.capacity
+        if not overwritten:
+            self._size += 1
+        return overwritten
+
+    def drain(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """按时间先后取出全部帧（可只保留 ts >= since 的部分）并清空缓冲，返回的数组为拷贝。"""
+        order = (np.arange(self._size) + self._head - self._size) % self.capacity
+        if since is not None:
+            order = order[self.timestamps[order] >= since]
+        result = (self.timestamps[order], self.is_left[order], self.pressure[order])
+        self.clear()
+        return result
+
+    def clear(self) -> None:
+        """丢弃全部缓存帧。"""
+        self._head = 0
+        self._size = 0
+
+
+class TriggeredRecorder:
+    """包装 `DataLogger`，平时只把帧写入环形缓冲，触发后写出触发前 pre_seconds 与之后 post_seconds 的帧。
+
+    触发来源：调用 `trigger`（总线指令或外部事件），或某只脚的单帧总压力向上越过 threshold。
+    记录窗口内再次触发会顺延窗口结束时间。接口与 `DataLogger.append`/`active` 保持一致，
+    可直接替换处理链路中的日志对象。
+    """
+
+    def __init__(
+        self,
+        logger: DataLogger,
+        *,
+        pre_seconds: float = 5.0,
+        post_seconds: float = 10.0,
+        threshold: Optional[float] = None,
+        max_rate: float = 400.0,
+        on_trigger: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        self.logger = logger
+        self.pre_seconds = max(0.0, float(pre_seconds))
+        self.post_seconds = max(0.0, float(post_seconds))
+        self.threshold = threshold
+        # max_rate 为左右脚合计的最大帧率，多留一帧使窗口两端都能完整覆盖
+        self._ring = PretriggerRing(math.ceil(self.pre_seconds * max(1.0, float(max_rate))) + 1)
+        self._on_trigger = on_trigger
+        self._lock = threading.Lock()
+        self._record_until = -math.inf
+        self._last_ts: Optional[float] = None
+        # 左右脚帧交替到达，上升沿按脚分别判断
+        self._above = {True: False, False: False}
+        self.events = 0
+        self.recorded = 0
+        self.discarded = 0
+
+    @property
+    def active(self) -> bool:
+        """与 `DataLogger.active` 一致，指示底层会话是否仍在写入。"""
+        return self.logger.active
+
+    @property
+    def recording(self) -> bool:
+        """指示当前是否处于触发后的记录窗口内。"""
+        with self._lock:
+            return self._last_ts is not None and self._last_ts <= self._record_until
+
+    def append(self, side_is_left: bool, pmatrix: np.ndarray, ts: Optional[float] = None) -> None:
+        """记录窗口内直接写日志，否则存入环形缓冲；达到压力阈值时自动触发。"""
+        if ts is None:
+            ts = time.time()
+        above: Optional[bool] = None
+        if self.threshold is not None:
+            above = float(np.sum(pmatrix)) >= self.threshold
+        rising = False
+        with self._lock:
+            if above is not None:
+                rising = above and not self._above[side_is_left]
+                self._above[side_is_left] = above
+            self._last_ts = ts
+            if ts <= self._record_until:
+                self.recorded += 1
+                self.logger.append(side_is_left, pmatrix, ts=ts)
+            elif self._ring.push(ts, side_is_left, pmatrix):
+                self.discarded += 1
+        if rising:
+            # 仅在某只脚越过阈值的上升沿触发，持续高压不会反复广播触发事件
+            self.trigger("threshold", ts=ts)
+
+    def trigger(self, reason: str = "manual", *, ts: Optional[float] = None) -> Dict[str, Any]:
+        """触发一次记录：写出缓冲中触发前窗口内的帧，并打开（或顺延）记录窗口。"""
+        with self._lock:
+            if ts is None:
+                ts = self._last_ts if self._last_ts is not None else time.time()
+            already = ts <= self._record_until
+            flushed = 0
+            if not already:
+                buffered = len(self._ring)
+                timestamps, sides, stack = self._ring.drain(since=ts - self.pre_seconds)
+                flushed = int(timestamps.shape[0])
+                self.discarded += buffered - flushed
+                for index in range(flushed):
+                    self.logger.append(bool(sides[index]), stack[index], ts=float(timestamps[index]))
+                self.recorded += flushed
+            self._record_until = max(self._record_until, ts + self.post_seconds)
+            self.events += 1
+            event = {
+                "reason": reason,
+                "ts": ts,
+                "pre_frames": flushed,
+                "extended": already,
+                "record_until": self._record_until,
+                "events": self.events,
+            }
+        if self._on_trigger is not None:
+            self._on_trigger(event)
+        return event
+
+    def stats(self) -> Dict[str, Any]:
+        """返回触发次数、已记录帧数、未触发而被覆盖的帧数与当前缓冲帧数。"""
+        with self._lock:
+            return {
+                "events": self.events,
+                "recorded": self.recorded,
+                "discarded": self.discarded,
+                "buffered": len(self._ring),
+            }
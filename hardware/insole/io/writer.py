@@ -0,0 +1,117 @@
+"""同步会话写入器：供离线工具按批写出与 `DataLogger` 相同格式的压力会话。"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..constants import COLS, ROWS
+from .logger import SESSION_FORMATS
+from .session_format import RECORD_DTYPE, finalize_header, write_header
+
+
+class SessionWriter:
+    """在调用线程中直接写文件，按批接收 (N, ROWS, COLS) 压力堆栈，不经过后台队列。"""
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        session_format: str = "binary",
+        session_id: Optional[str] = None,
+        session_start: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if session_format not in SESSION_FORMATS:
+            raise ValueError(f"未知的会话格式: {session_format}，可选 {SESSION_FORMATS}")
+        self.path = Path(path)
+        self.session_format = session_format
+        self.session_id = session_id or self.path.stem
+        self.session_start = time.time() if session_start is None else float(session_start)
+        self.frames = 0
+        self.last_frame_ts = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta = dict(meta or {})
+        if session_format == "binary":
+            self._handle = self.path.open("wb")
+            write_header(self._handle, session_id=self.session_id, session_start=self.session_start, meta=meta)
+        else:
+            self._handle = self.path.open("w", encoding="utf-8")
+            self._write_json(
+                {
+                    "type": "session_meta",
+                    "session_id": self.session_id,
+                    "session_start": self.session_start,
+                    "rows": ROWS,
+                    "cols": COLS,
+                    "meta": meta,
+                    "created_at": time.time(),
+                }
+            )
+
+    def __enter__(self) -> "SessionWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def append_batch(self, timestamps: np.ndarray, is_left: np.ndarray, pressure: np.ndarray) -> None:
+        """追加一批帧，帧序号在写入器内部连续分配。"""
+        count = int(np.asarray(timestamps).shape[0])
+        if count == 0:
+            return
+        indices = np.arange(self.frames, self.frames + count, dtype=np.int64)
+        sides = np.asarray(is_left, dtype=bool)
+        stack = np.asarray(pressure, dtype=np.float32).reshape(count, ROWS, COLS)
+        if self.session_format == "binary":
+            records = np.zeros(count, dtype=RECORD_DTYPE)
+            records["frame_ts"] = timestamps
+            records["frame_index"] = indices
+            records["side"] = sides
+            records["pressure"] = stack
+            self._handle.write(records.tobytes())
+        else:
+            for index in range(count):
+                self._write_json(
+                    {
+                        "type": "frame",
+                        "session_id": self.session_id,
+                        "session_start": self.session_start,
+                        "frame_index": int(indices[index]),
+                        "frame_ts": float(timestamps[index]),
+                        "side": 1 if sides[index] else 0,
+                        "rows": ROWS,
+                        "cols": COLS,
+                        "pressure": stack[index].tolist(),
+                    }
+                )
+        self.frames += count
+        self.last_frame_ts = float(timestamps[-1])
+
+    def close(self) -> None:
+        """写入会话结束信息并关闭文件。"""
+        if self._handle.closed:
+            return
+        stop = time.time()
+        if self.session_format == "binary":
+            finalize_header(self._handle, frames=self.frames, session_stop=stop, last_frame_ts=self.last_frame_ts)
+        else:
+            self._write_json(
+                {
+                    "type": "session_end",
+                    "session_id": self.session_id,
+                    "session_start": self.session_start,
+                    "session_stop": stop,
+                    "frames": self.frames,
+                    "last_frame_ts": self.last_frame_ts,
+                }
+            )
+        self._handle.close()
+
+    def _write_json(self, payload: Dict[str, Any]) -> None:
+        self._handle.write(json.dumps(payload, ensure_ascii=False))
+        self._handle.write("\n")
@@ -0,0 +1,161 @@
+"""离线批量重标定：用新的校准 CSV 重新计算原始捕获文件（.insraw）中的全部帧，输出新的压力会话。
+
+按块流式处理，内存占用只与块大小有关；多个文件可通过进程池并行。命令行用法::
+
+    python -m hardware.insole.recalibrate records/*.insraw --left-csv L.csv --right-csv R.csv --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.runtime import setup_basic_logging
+
+from .constants import LEFT_PORT, MIN_VALID_AD, RIGHT_PORT
+from .core.calibration import CALIBRATION_MODEL_VERSION
+from .core.processor import InsoleProcessor
+from .io.capture import RawCaptureReader
+from .io.session_format import BINARY_SUFFIX
+from .io.writer import SessionWriter
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass
+class RecalibrationJob:
+    """单个文件的重标定参数，需可被进程池序列化。"""
+
+    source: Path
+    output: Path
+    left_csv: Optional[Path] = None
+    right_csv: Optional[Path] = None
+    ad_threshold: int = MIN_VALID_AD
+    strict_frames: bool = False
+    chunk_size: int = 2048
+    session_format: str = "binary"
+    cache_dir: Optional[Path] = None
+
+
+@dataclass
+class RecalibrationResult:
+    """单个文件的重标定结果。"""
+
+    source: Path
+    output: Path
+    datagrams: int
+    frames: int
+    elapsed: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        """转为字典，便于打印或写入报告。"""
+        return {
+            "source": str(self.source),
+            "output": str(self.output),
+            "datagrams": self.datagrams,
+            "frames": self.frames,
+            "elapsed": self.elapsed,
+            "fps": self.frames / self.elapsed if self.elapsed > 0 else 0.0,
+        }
+
+
+def recalibrate_capture(job: RecalibrationJob) -> RecalibrationResult:
+    """按块读取捕获文件，批量解析、扣阈值与校准后写出压力会话。"""
+    started = time.perf_counter()
+    reader = RawCaptureReader(job.source)
+    meta = reader.header.meta
+    left_port = int(meta.get("left", {}).get("listen_port", LEFT_PORT))
+    right_port = int(meta.get("right", {}).get("listen_port", RIGHT_PORT))
+    processor = InsoleProcessor(
+        left_csv=job.left_csv,
+        right_csv=job.right_csv,
+        ad_threshold=job.ad_threshold,
+        left_port=left_port,
+        right_port=right_port,
+        cache_dir=job.cache_dir,
+        strict_frames=job.strict_frames,
+    )
+    out_meta = dict(meta)
+    out_meta.update(
+        {
+            "recalibrated_from": str(job.source),
+            "left_csv": str(job.left_csv) if job.left_csv else None,
+            "right_csv": str(job.right_csv) if job.right_csv else None,
+            "ad_threshold": job.ad_threshold,
+            "calibration_model_version": CALIBRATION_MODEL_VERSION,
+            "calibration_points": {"left": len(processor.left_params), "right": len(processor.right_params)},
+        }
+    )
+    datagrams = 0
+    with SessionWriter(
+        job.output,
+        session_format=job.session_format,
+        session_id=reader.header.session_id or job.source.stem,
+        session_start=reader.header.session_start,
+        meta=out_meta,
+    ) as writer:
+        for frames, ports, timestamps in reader.batches(job.chunk_size):
+            datagrams += len(frames)
+            batch = processor.process_batch(frames, ports, timestamps)
+            writer.append_batch(batch.timestamps, batch.is_left, batch.pressure_matrices)
+        written = writer.frames
+    elapsed = time.perf_counter() - started
+    LOG.info("重标定完成 %s -> %s (%d 帧, %.2fs)", job.source, job.output, written, elapsed)
+    return RecalibrationResult(job.source, job.output, datagrams, written, elapsed)
+
+
+def recalibrate_files(jobs: Sequence[RecalibrationJob], *, workers: int = 1) -> List[RecalibrationResult]:
+    """依次或以进程池并行处理多个文件，结果顺序与 jobs 一致。"""
+    if workers <= 1 or len(jobs) <= 1:
+        return [recalibrate_capture(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(recalibrate_capture, jobs))
+
+
+def output_path_for(source: Path, out_dir: Optional[Path], session_format: str) -> Path:
+    """输出文件与源文件同名，追加 `_recal` 后缀并按会话格式选择扩展名。"""
+    suffix = BINARY_SUFFIX if session_format == "binary" else ".jsonl"
+    return (out_dir or source.parent) / f"{source.stem}_recal{suffix}"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="使用新的校准文件批量重算原始捕获会话")
+    parser.add_argument("sources", nargs="+", type=Path, help="原始捕获文件（.insraw）")
+    parser.add_argument("--left-csv", type=Path, help="左脚校准 CSV")
+    parser.add_argument("--right-csv", type=Path, help="右脚校准 CSV")
+    parser.add_argument("--out-dir", type=Path, help="输出目录，缺省与源文件同目录")
+    parser.add_argument("--format", choices=("binary", "jsonl"), default="binary", help="输出会话格式")
+    parser.add_argument("--ad-threshold", type=int, default=MIN_VALID_AD, help="AD 噪声阈值")
+    parser.add_argument("--strict-frames", action="store_true", help="丢弃格式异常的帧")
+    parser.add_argument("--chunk-size", type=int, default=2048, help="每批处理的帧数")
+    parser.add_argument("--workers", type=int, default=1, help="并行进程数")
+    parser.add_argument("--cache-dir", type=Path, help="校准缓存目录")
+    args = parser.parse_args(argv)
+
+    setup_basic_logging()
+    jobs = [
+        RecalibrationJob(
+            source=source,
+            output=output_path_for(source, args.out_dir, args.format),
+            left_csv=args.left_csv,
+            right_csv=args.right_csv,
+            ad_threshold=args.ad_threshold,
+            strict_frames=args.strict_frames,
+            chunk_size=args.chunk_size,
+            session_format=args.format,
+            cache_dir=args.cache_dir,
+        )
+        for source in args.sources
+    ]
+    for result in recalibrate_files(jobs, workers=args.workers):
+        LOG.info("%s", result.as_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""会话回放源：按录制时间节奏（或倍速、或不限速）将会话帧或原始捕获数据报依次交给回调。"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, Optional, Tuple
+
+import numpy as np
+
+from .io.capture import RawCaptureReader, is_capture_file
+from .io.reader import SessionReader
+
+LOG = logging.getLogger(__name__)
+
+ReplayCallback = Callable[[np.ndarray, bool, float], None]
+DatagramCallback = Callable[[bytes, int, float], None]
+ReplaySource = Generator[Tuple[float, Callable[[], Any]], None, None]
+
+
+@dataclass
+class ReplayStats:
+    """一次回放的统计结果。"""
+
+    frames: int = 0
+    elapsed: float = 0.0
+    completed: bool = False
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, float | int | bool | str | None]:
+        """转为字典，便于在状态事件中广播；回放中途失败时 error 为异常描述。"""
+        fps = self.frames / self.elapsed if self.elapsed > 0 else 0.0
+        return {
+            "frames": self.frames,
+            "elapsed": self.elapsed,
+            "fps": fps,
+            "completed": self.completed,
+            "error": self.error,
+        }
+
+
+class SessionReplay:
+    """在后台线程中回放一个会话文件或原始捕获文件。
+
+    speed=1 按录制节奏回放，speed=N 为 N 倍速，speed<=0 表示不限速（用于吞吐压测）。
+    会话帧交给 ``on_frame(pressure, is_left, timestamp)``；原始捕获文件的数据报交给
+    ``on_datagram(data, port, recv_ts)``，以便重新走解析与校准。时间戳保持录制值以保证结果可复现。
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        on_frame: ReplayCallback,
+        *,
+        speed: float = 1.0,
+        side: Optional[str] = None,
+        chunk_size: int = 512,
+        on_finished: Optional[Callable[[ReplayStats], None]] = None,
+        on_datagram: Optional[DatagramCallback] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.speed = float(speed)
+        self.side = side
+        self.chunk_size = max(1, int(chunk_size))
+        self.stats = ReplayStats()
+        self._on_frame = on_frame
+        self._on_finished = on_finished
+        self._on_datagram = on_datagram
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._source: Optional[ReplaySource] = None
+        self._reader: Optional[SessionReader] = None
+
+    @property
+    def running(self) -> bool:
+        """指示回放线程是否仍在运行。"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def open(self) -> None:
+        """打开会话文件但不启动线程，文件无法读取时直接抛出异常；重复调用无副作用。"""
+        if self._source is not None:
+            return
+        if is_capture_file(self.path):
+            if self._on_datagram is None:
+                raise ValueError(f"{self.path} 为原始捕获文件，需提供 on_datagram 回调")
+            self._source = self._capture_items(RawCaptureReader(self.path), self._on_datagram)
+        else:
+            self._reader = SessionReader(self.path)
+            self._source = self._session_items(self._reader, self._on_frame)
+
+    def close(self) -> None:
+        """释放已打开但尚未开始回放的会话文件。"""
+        self._source = None
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.close()
+
+    def start(self) -> None:
+        """打开会话（若尚未打开）并启动回放线程，文件无法读取时直接抛出异常。"""
+        if self.running:
+            return
+        self.open()
+        source, self._source, self._reader = self._source, None, None
+        assert source is not None
+        self._stop.clear()
+        self.stats = ReplayStats()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(source,),
+            name=f"SessionReplay-{self.path.stem}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """请求停止并等待线程退出；在回放线程内部调用时不等待。"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """等待回放自然结束。"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+
+    def _session_items(self, reader: SessionReader, emit: ReplayCallback) -> ReplaySource:
+        """逐块读取会话帧，产出 (录制时间戳, 发送动作)。"""
+        try:
+            for chunk in reader.chunks(self.chunk_size, side=self.side):
+                for index in range(len(chunk)):
+                    ts = float(chunk.timestamps[index])
+                    pressure, is_left = chunk.pressure[index], bool(chunk.is_left[index])
+                    yield ts, lambda: emit(pressure, is_left, ts)
+        finally:
+            reader.close()
+
+    @staticmethod
+    def _capture_items(reader: RawCaptureReader, emit: DatagramCallback) -> ReplaySource:
+        """顺序读取原始数据报，产出 (接收时间戳, 发送动作)。"""
+        for datagram in reader:
+            yield datagram.recv_ts, lambda: emit(datagram.data, datagram.port, datagram.recv_ts)
+
+    def _run(self, source: ReplaySource) -> None:
+        """依据录制时间戳计算每帧的发送时刻并依次发送。"""
+        started = time.perf_counter()
+        first_ts: Optional[float] = None
+        paced = self.speed > 0
+        try:
+            for ts, send in source:
+                if self._stop.is_set():
+                    return
+                if paced:
+                    if first_ts is None:
+                        first_ts = ts
+                    delay = started + (ts - first_ts) / self.speed - time.perf_counter()
+                    if delay > 0 and self._stop.wait(delay):
+                        return
+                send()
+                self.stats.frames += 1
+            self.stats.completed = True
+        except Exception as exc:
+            LOG.exception("回放会话 %s 失败", self.path)
+            self.stats.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            source.close()
+            self.stats.elapsed = time.perf_counter() - started
+            if self._on_finished is not None:
+                self._on_finished(self.stats)
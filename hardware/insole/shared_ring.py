@@ -0,0 +1,382 @@
+"""共享内存帧环：把数据主题上的压力帧镜像到 `multiprocessing.shared_memory`，供其他进程零拷贝轮询。
+
+内存布局（小端序）::
+
+    [0, 64)      头部：标识 `INSSHM01`、版本、槽位数、记录长度、行列数、导出方 PID、已写入帧数
+    [64, ...)    slots 个定长记录（见 `SHARED_RECORD_DTYPE`），第 n 帧写入第 n % slots 个槽位
+
+每个槽位带序列号（seqlock）：写入第 n 帧前置为 2n+1（奇数表示写入中），写完置为 2n+2。
+读取方在拷贝前后各读一次序列号，两次均等于 2n+2 才认为拷贝有效，否则说明该槽位正被覆盖。
+写入方只有一个且从不等待读取方，读取方数量不影响采集线程。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterator, Optional
+
+import numpy as np
+
+from bus.event_bus import EventBus, Subscription
+from bus.topics import Topics
+
+from .constants import COLS, ROWS
+from .core.frame import InsoleFrame
+
+LOG = logging.getLogger(__name__)
+
+SHARED_MAGIC = b"INSSHM01"
+SHARED_VERSION = 1
+SHARED_HEADER_SIZE = 64
+DEFAULT_SHARED_NAME = "insole_frames"
+
+SHARED_HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("header_size", "<u4"),
+        ("slots", "<u4"),
+        ("record_size", "<u4"),
+        ("rows", "<u2"),
+        ("cols", "<u2"),
+        ("owner_pid", "<u4"),
+        ("write_seq", "<u8"),
+        ("created_at", "<f8"),
+    ]
+)
+
+SHARED_RECORD_DTYPE = np.dtype(
+    [
+        ("seq", "<u8"),
+        ("frame_ts", "<f8"),
+        ("frame_index", "<u8"),
+        ("port", "<u2"),
+        ("side", "u1"),
+        ("reserved", "u1", 5),
+        ("nonzero", "<u4"),
+        ("max", "<f4"),
+        ("total_pressure", "<f4"),
+        ("reserved2", "u1", 4),
+        ("pressure", "<f4", (ROWS, COLS)),
+    ]
+)
+
+
+@dataclass
+class SharedFrame:
+    """从共享环中读出的单帧（已拷贝，不受后续覆盖影响）。"""
+
+    seq: int
+    frame_index: int
+    timestamp: float
+    port: int
+    is_left: bool
+    total_pressure: float
+    pressure: np.ndarray
+
+
+@dataclass
+class SharedFrameBatch:
+    """一次批量读取的结果，按帧序排列，压力矩阵堆叠为 (N, ROWS, COLS)。"""
+
+    seqs: np.ndarray
+    frame_indices: np.ndarray
+    timestamps: np.ndarray
+    is_left: np.ndarray
+    pressure: np.ndarray
+    lost: int = 0
+
+    def __len__(self) -> int:
+        return int(self.seqs.shape[0])
+
+
+class SharedFrameExporter:
+    """订阅数据主题并把每帧写入共享内存环，写入一帧只是一次约 1.4KB 的内存拷贝。
+
+    共享内存在 `start` 时创建、`stop` 时销毁；头部记录导出方 PID。同名内存段已存在时，
+    仅当其导出进程已退出（上次异常退出的残留）才清理重建，仍有导出方在运行时抛出 FileExistsError。
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        *,
+        name: str = DEFAULT_SHARED_NAME,
+        slots: int = 1024,
+        topic: str = Topics.Hardware.Insole.DATA,
+    ) -> None:
+        self.bus = bus
+        self.name = name
+        self.slots = max(2, int(slots))
+        self.topic = topic
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._subscription: Optional[Subscription] = None
+
+    @property
+    def active(self) -> bool:
+        """指示共享环是否已创建并正在镜像数据主题。"""
+        return self._shm is not None
+
+    def start(self) -> None:
+        """创建共享内存、写入头部并订阅数据主题。"""
+        if self._shm is not None:
+            return
+        size = SHARED_HEADER_SIZE + self.slots * SHARED_RECORD_DTYPE.itemsize
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            self._reclaim_stale()
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        header = np.ndarray((), dtype=SHARED_HEADER_DTYPE, buffer=shm.buf)
+        header["magic"] = SHARED_MAGIC
+        header["version"] = SHARED_VERSION
+        header["header_size"] = SHARED_HEADER_SIZE
+        header["slots"] = self.slots
+        header["record_size"] = SHARED_RECORD_DTYPE.itemsize
+        header["rows"] = ROWS
+        header["cols"] = COLS
+        header["owner_pid"] = os.getpid()
+        header["write_seq"] = 0
+        header["created_at"] = time.time()
+        records = np.ndarray((self.slots,), dtype=SHARED_RECORD_DTYPE, buffer=shm.buf, offset=SHARED_HEADER_SIZE)
+        records["seq"] = 0
+        self._header = header
+        self._seq = records["seq"]
+        self._frame_ts = records["frame_ts"]
+        self._frame_index = records["frame_index"]
+        self._port = records["port"]
+        self._side = records["side"]
+        self._nonzero = records["nonzero"]
+        self._max = records["max"]
+        self._total = records["total_pressure"]
+        self._pressure = records["pressure"]
+        self.frames = 0
+        self._shm = shm
+        self._subscription = self.bus.subscribe(self.topic, self._on_frame)
+        LOG.info("共享内存帧环 %s 已创建 (%d 槽位, %d 字节)", self.name, self.slots, size)
+
+    def stop(self) -> None:
+        """取消订阅并销毁共享内存；已连接的读取方仍保有原映射，但不会再看到新帧。"""
+        subscription, self._subscription = self._subscription, None
+        if subscription is not None:
+            subscription.unsubscribe()
+        with self._lock:
+            shm, self._shm = self._shm, None
+            if shm is None:
+                return
+            # 释放对共享缓冲区的全部 NumPy 视图后才能关闭
+            self._header = self._seq = self._frame_ts = self._frame_index = None
+            self._port = self._side = self._nonzero = self._max = self._total = self._pressure = None
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            # 内存段已被外部删除；仍需注销资源跟踪，否则进程退出时会再次尝试删除并告警
+            LOG.warning("共享内存 %s 已不存在", self.name)
+            if os.name == "posix":
+                resource_tracker.unregister(_segment_name(self.name), "shared_memory")
+
+    def _reclaim_stale(self) -> None:
+        """清理已退出导出方遗留的同名内存段；段仍在使用或不是压力帧环时抛出 FileExistsError。"""
+        existing = _attach(self.name)
+        try:
+            owner = _segment_owner(existing)
+        finally:
+            existing.close()
+        if owner is None:
+            raise FileExistsError(f"共享内存 {self.name} 已存在且不是压力帧环")
+        if _process_alive(owner):
+            raise FileExistsError(f"共享内存 {self.name} 正由进程 {owner} 导出")
+        LOG.warning("共享内存 %s 为已退出进程 %d 的残留，清理后重建", self.name, owner)
+        stale = shared_memory.SharedMemory(name=self.name)
+        stale.close()
+        stale.unlink()
+
+    def write(self, frame: InsoleFrame) -> None:
+        """按 seqlock 协议写入一帧。"""
+        with self._lock:
+            if self._shm is None:
+                return
+            n = self.frames
+            slot = n % self.slots
+            self._seq[slot] = 2 * n + 1
+            self._frame_ts[slot] = frame.timestamp
+            self._frame_index[slot] = frame.frame_index
+            self._port[slot] = frame.port
+            self._side[slot] = frame.is_left
+            stats = frame.stats
+            self._nonzero[slot] = stats.get("nonzero", 0)
+            self._max[slot] = stats.get("max", 0.0)
+            self._total[slot] = stats.get("total_pressure", 0.0)
+            self._pressure[slot] = frame.pressure
+            self._seq[slot] = 2 * n + 2
+            self.frames = n + 1
+            self._header["write_seq"] = n + 1
+
+    def _on_frame(self, frame: InsoleFrame) -> None:
+        self.write(frame)
+
+
+class SharedFrameReader:
+    """连接到已有的共享内存帧环，可在任意进程中轮询最新帧或依次读取新帧。
+
+    读取方各自维护读游标，互不影响；游标落后超过槽位数时跳到最旧的可用帧并累计 `lost`。
+    """
+
+    def __init__(self, name: str = DEFAULT_SHARED_NAME, *, from_latest: bool = True) -> None:
+        self.name = name
+        self._shm = _attach(name)
+        header = np.ndarray((), dtype=SHARED_HEADER_DTYPE, buffer=self._shm.buf)
+        if bytes(header["magic"]) != SHARED_MAGIC:
+            self._shm.close()
+            raise ValueError(f"共享内存 {name} 不是压力帧环")
+        if int(header["version"]) != SHARED_VERSION:
+            self._shm.close()
+            raise ValueError(f"不支持的共享帧环版本: {int(header['version'])}")
+        if int(header["record_size"]) != SHARED_RECORD_DTYPE.itemsize:
+            self._shm.close()
+            raise ValueError("共享帧环的记录长度与当前版本不一致")
+        self.slots = int(header["slots"])
+        self._header = header
+        self._records = np.ndarray(
+            (self.slots,),
+            dtype=SHARED_RECORD_DTYPE,
+            buffer=self._shm.buf,
+            offset=int(header["header_size"]),
+        )
+        self.cursor = self.write_seq if from_latest else max(0, self.write_seq - self.slots)
+        self.lost = 0
+
+    def __enter__(self) -> "SharedFrameReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def write_seq(self) -> int:
+        """写入方已完成的帧数。"""
+        return int(self._header["write_seq"])
+
+    def latest(self) -> Optional[SharedFrame]:
+        """读取最新写入的一帧；尚无数据或连续被覆盖时返回 None。"""
+        for _ in range(4):
+            n = self.write_seq - 1
+            if n < 0:
+                return None
+            slot = n % self.slots
+            expected = 2 * n + 2
+            if int(self._records["seq"][slot]) != expected:
+                continue
+            record = self._records[slot].copy()
+            if int(self._records["seq"][slot]) == expected:
+                return SharedFrame(
+                    seq=n,
+                    frame_index=int(record["frame_index"]),
+                    timestamp=float(record["frame_ts"]),
+                    port=int(record["port"]),
+                    is_left=bool(record["side"]),
+                    total_pressure=float(record["total_pressure"]),
+                    pressure=record["pressure"],
+                )
+        return None
+
+    def read_new(self, max_frames: Optional[int] = None) -> SharedFrameBatch:
+        """批量读取游标之后的新帧并推进游标；拷贝期间被覆盖的帧计入 lost。"""
+        end = self.write_seq
+        start = self.cursor
+        lost = 0
+        if end - start > self.slots:
+            lost = end - self.slots - start
+            start = end - self.slots
+        if max_frames is not None:
+            end = min(end, start + max(0, int(max_frames)))
+        seqs = np.arange(start, end, dtype=np.uint64)
+        slots = (seqs % self.slots).astype(np.intp)
+        expected = 2 * seqs + 2
+        before = self._records["seq"][slots]
+        records = self._records[slots]
+        after = self._records["seq"][slots]
+        valid = (before == expected) & (after == expected)
+        if not valid.all():
+            lost += int((~valid).sum())
+            seqs, records = seqs[valid], records[valid]
+        self.cursor = end
+        self.lost += lost
+        return SharedFrameBatch(
+            seqs=seqs,
+            frame_indices=records["frame_index"],
+            timestamps=records["frame_ts"],
+            is_left=records["side"].astype(bool),
+            pressure=records["pressure"],
+            lost=lost,
+        )
+
+    def follow(self, poll_interval: float = 0.005, stop: Optional[threading.Event] = None) -> Iterator[SharedFrameBatch]:
+        """持续产出新帧批次，无新帧时按 poll_interval 休眠；stop 被置位时结束。"""
+        while stop is None or not stop.is_set():
+            batch = self.read_new()
+            if len(batch) or batch.lost:
+                yield batch
+            else:
+                time.sleep(poll_interval)
+
+    def close(self) -> None:
+        """断开共享内存连接（不销毁内存段）。"""
+        if self._shm is None:
+            return
+        self._header = self._records = None
+        self._shm.close()
+        self._shm = None
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """以只连接不托管的方式打开共享内存，避免读取进程退出时被资源跟踪器误删。"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.13 之前没有 track 参数，连接时同样会注册到资源跟踪器，需要手动注销
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(_segment_name(name), "shared_memory")
+        return shm
+
+
+def _segment_name(name: str) -> str:
+    """资源跟踪器登记的内存段名称：POSIX 平台为带前导斜杠的 shm_open 名称。"""
+    return "/" + name if os.name == "posix" else name
+
+
+def _segment_owner(shm: shared_memory.SharedMemory) -> Optional[int]:
+    """读取内存段头部记录的导出方 PID；不是压力帧环时返回 None，早期版本未记录 PID 时为 0。"""
+    if shm.size < SHARED_HEADER_SIZE:
+        return None
+    # 拷贝头部再解析，不在内存段上留下视图，调用方随后可以直接关闭
+    header = np.frombuffer(bytes(shm.buf[: SHARED_HEADER_DTYPE.itemsize]), dtype=SHARED_HEADER_DTYPE)[0]
+    if bytes(header["magic"]) != SHARED_MAGIC:
+        return None
+    return int(header["owner_pid"])
+
+
+def _process_alive(pid: int) -> bool:
+    """判断导出进程是否仍在运行。
+
+    非 POSIX 平台的内存段随最后一个句柄关闭而释放，同名段存在即说明仍有进程持有，一律视为在用。
+    """
+    if os.name != "posix":
+        return True
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
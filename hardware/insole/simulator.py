@@ -0,0 +1,302 @@
+"""本地鞋垫设备模拟器：按真实 UDP 协议响应 start/stop 指令并推送 AA..BB 文本帧。
+
+用于在无硬件条件下压测接收/处理/记录链路，可在回环地址上以远高于真实设备的帧率发送，
+并可注入丢包、乱序与畸形帧。命令行用法::
+
+    python -m hardware.insole.simulator --rate 500 --feet 2 --loss 0.01 --reorder 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import random
+import selectors
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.runtime import setup_basic_logging
+
+from .constants import COLS, LEFT_PORT, LEFT_REMOTE_PORT, RIGHT_PORT, RIGHT_REMOTE_PORT, ROWS
+
+LOG = logging.getLogger(__name__)
+
+GAIT_PHASES = 200  # 单个步态周期预生成的帧数
+STANCE_RATIO = 0.6  # 支撑相在步态周期中的占比
+
+
+@dataclass
+class SimulatedFoot:
+    """描述一只模拟鞋垫：向 listen_port 推送数据，在 remote_port 接收控制指令。"""
+
+    is_left: bool
+    listen_port: int
+    remote_port: int
+    streaming: bool = False
+    phase: float = 0.0
+    frames: List[bytes] = field(default_factory=list)
+
+
+@dataclass
+class SimulatorStats:
+    """模拟器发送统计。"""
+
+    sent: int = 0
+    dropped: int = 0
+    reordered: int = 0
+    malformed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """转为字典，便于日志输出。"""
+        return {"sent": self.sent, "dropped": self.dropped, "reordered": self.reordered, "malformed": self.malformed}
+
+
+def gait_cycle_frames(is_left: bool, *, phases: int = GAIT_PHASES, peak_ad: int = 3500, seed: int = 0) -> List[bytes]:
+    """预生成一个步态周期的文本帧：支撑相内压力中心由足跟（高行号）滚动到前掌与足趾。"""
+    rng = np.random.default_rng(seed + (0 if is_left else 1))
+    rows = np.arange(ROWS, dtype=np.float64)[:, None]
+    cols = np.arange(COLS, dtype=np.float64)[None, :]
+    # 足弓内侧压力较低，左右脚镜像
+    arch = np.where(cols < COLS / 2, 0.5, 1.0) if is_left else np.where(cols >= COLS / 2, 0.5, 1.0)
+    frames: List[bytes] = []
+    for index in range(phases):
+        phase = index / phases
+        if phase >= STANCE_RATIO:
+            values = rng.integers(0, 80, size=(ROWS, COLS))  # 摆动相仅有底噪
+        else:
+            progress = phase / STANCE_RATIO
+            load = math.sin(math.pi * progress) ** 0.5
+            center_row = (ROWS - 4) * (1.0 - progress) + 2
+            blob = np.exp(-((rows - center_row) ** 2) / (2 * 5.0**2) - ((cols - (COLS - 1) / 2) ** 2) / (2 * 3.0**2))
+            ad = peak_ad * load * blob * np.where((rows > 10) & (rows < 24), arch, 1.0)
+            values = np.clip(ad + rng.normal(0, 30, size=(ROWS, COLS)), 0, 4095).astype(np.int64)
+        frames.append(("AA," + ",".join(str(int(v)) for v in values.ravel()) + ",BB").encode("ascii"))
+    return frames
+
+
+class InsoleSimulator:
+    """模拟一只或多只鞋垫设备，支持可配置帧率、步态数据与网络异常注入。"""
+
+    def __init__(
+        self,
+        *,
+        feet: int = 2,
+        rate: float = 100.0,
+        target_ip: str = "127.0.0.1",
+        bind_ip: str = "127.0.0.1",
+        left_port: int = LEFT_PORT,
+        right_port: int = RIGHT_PORT,
+        left_remote_port: int = LEFT_REMOTE_PORT,
+        right_remote_port: int = RIGHT_REMOTE_PORT,
+        cadence: float = 1.0,
+        loss: float = 0.0,
+        reorder: float = 0.0,
+        malformed: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.rate = max(0.1, float(rate))
+        self.target_ip = target_ip
+        self.bind_ip = bind_ip
+        self.cadence = max(0.01, float(cadence))
+        self.loss = float(loss)
+        self.reorder = float(reorder)
+        self.malformed = float(malformed)
+        self.stats = SimulatorStats()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._feet: List[SimulatedFoot] = []
+        cycles = {True: gait_cycle_frames(True, seed=seed), False: gait_cycle_frames(False, seed=seed)}
+        for index in range(max(1, int(feet))):
+            is_left = index % 2 == 0
+            foot = SimulatedFoot(
+                is_left=is_left,
+                listen_port=left_port if is_left else right_port,
+                remote_port=left_remote_port if is_left else right_remote_port,
+                frames=cycles[is_left],
+            )
+            # 右脚相位落后半个周期，多设备之间错开相位
+            foot.phase = (GAIT_PHASES / 2 if not is_left else 0.0) + (index // 2) * 7
+            self._feet.append(foot)
+        self._send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._command_socks: Dict[int, socket.socket] = {}
+        self._held: Dict[int, bytes] = {}
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def feet(self) -> List[SimulatedFoot]:
+        """返回模拟设备列表的副本。"""
+        return list(self._feet)
+
+    def start(self, *, autostart: bool = False) -> None:
+        """绑定控制端口并启动指令与发送线程；autostart=True 时无需等待 start 指令。"""
+        self._stop.clear()
+        for port in sorted({foot.remote_port for foot in self._feet}):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.bind_ip, port))
+            sock.settimeout(0.2)
+            self._command_socks[port] = sock
+        if autostart:
+            for foot in self._feet:
+                foot.streaming = True
+        self._threads = [
+            threading.Thread(target=self._command_loop, name="InsoleSimulator.command", daemon=True),
+            threading.Thread(target=self._stream_loop, name="InsoleSimulator.stream", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """停止全部线程并关闭 socket。"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads.clear()
+        for sock in self._command_socks.values():
+            sock.close()
+        self._command_socks.clear()
+        self._send_sock.close()
+
+    def _command_loop(self) -> None:
+        """等待 start/stop 文本指令，按下行端口切换对应设备的推流状态。"""
+        selector = selectors.DefaultSelector()
+        for port, sock in self._command_socks.items():
+            selector.register(sock, selectors.EVENT_READ, port)
+        try:
+            while not self._stop.is_set():
+                for key, _ in selector.select(timeout=0.2):
+                    try:
+                        data = key.fileobj.recv(1024)  # type: ignore[union-attr]
+                    except OSError:
+                        continue
+                    self._handle_command(key.data, data.decode("utf-8", errors="ignore").strip().lower())
+        finally:
+            selector.close()
+
+    def _handle_command(self, remote_port: int, command: str) -> None:
+        """切换下行端口对应设备的推流状态。"""
+        if command not in {"start", "stop"}:
+            LOG.debug("忽略未知指令 %r (端口 %s)", command, remote_port)
+            return
+        with self._lock:
+            for foot in self._feet:
+                if foot.remote_port == remote_port:
+                    foot.streaming = command == "start"
+        LOG.info("端口 %s 收到指令 %s", remote_port, command)
+
+    def _stream_loop(self) -> None:
+        """按帧率推送数据；落后时一次补发所有到期帧，保证高帧率下的总吞吐。"""
+        interval = 1.0 / self.rate
+        phase_step = GAIT_PHASES * self.cadence / self.rate
+        started = time.perf_counter()
+        emitted = 0
+        while not self._stop.is_set():
+            due = int((time.perf_counter() - started) * self.rate)
+            with self._lock:
+                active = [foot for foot in self._feet if foot.streaming]
+            for _ in range(due - emitted):
+                for foot in active:
+                    frame = foot.frames[int(foot.phase) % GAIT_PHASES]
+                    foot.phase = (foot.phase + phase_step) % GAIT_PHASES
+                    self._emit(foot, frame)
+            emitted = max(emitted, due)
+            sleep_for = started + (emitted + 1) * interval - time.perf_counter()
+            if sleep_for > 0:
+                time.sleep(min(sleep_for, 0.05))
+
+    def _emit(self, foot: SimulatedFoot, frame: bytes) -> None:
+        """应用丢包、畸形与乱序注入后发送一帧。"""
+        rnd = self._random.random
+        if self.loss and rnd() < self.loss:
+            self.stats.dropped += 1
+            return
+        if self.malformed and rnd() < self.malformed:
+            frame = self._corrupt(frame)
+            self.stats.malformed += 1
+        if self.reorder and foot.listen_port not in self._held and rnd() < self.reorder:
+            self._held[foot.listen_port] = frame
+            self.stats.reordered += 1
+            return
+        self._send(foot.listen_port, frame)
+        held = self._held.pop(foot.listen_port, None)
+        if held is not None:
+            self._send(foot.listen_port, held)
+
+    def _send(self, port: int, frame: bytes) -> None:
+        """发送一帧，发送失败计为丢包。"""
+        try:
+            self._send_sock.sendto(frame, (self.target_ip, port))
+            self.stats.sent += 1
+        except OSError:
+            self.stats.dropped += 1
+
+    def _corrupt(self, frame: bytes) -> bytes:
+        """随机截断、插入非法字符或去掉帧尾。"""
+        choice = self._random.randrange(3)
+        if choice == 0:
+            return frame[: self._random.randrange(3, len(frame) - 2)]
+        if choice == 1:
+            position = self._random.randrange(3, len(frame) - 3)
+            return frame[:position] + b"x?" + frame[position:]
+        return frame.replace(b",BB", b"")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口：启动模拟器并定期输出发送统计。"""
+    parser = argparse.ArgumentParser(description="鞋垫设备 UDP 模拟器")
+    parser.add_argument("--rate", type=float, default=100.0, help="每只设备的帧率 (Hz)")
+    parser.add_argument("--feet", type=int, default=2, help="模拟设备数量，按左/右交替分配端口")
+    parser.add_argument("--target-ip", default="127.0.0.1", help="数据帧发送目标地址")
+    parser.add_argument("--bind-ip", default="127.0.0.1", help="控制指令监听地址")
+    parser.add_argument("--left-port", type=int, default=LEFT_PORT)
+    parser.add_argument("--right-port", type=int, default=RIGHT_PORT)
+    parser.add_argument("--left-remote-port", type=int, default=LEFT_REMOTE_PORT)
+    parser.add_argument("--right-remote-port", type=int, default=RIGHT_REMOTE_PORT)
+    parser.add_argument("--cadence", type=float, default=1.0, help="步频 (步态周期/秒)")
+    parser.add_argument("--loss", type=float, default=0.0, help="丢包概率")
+    parser.add_argument("--reorder", type=float, default=0.0, help="乱序概率")
+    parser.add_argument("--malformed", type=float, default=0.0, help="畸形帧概率")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--autostart", action="store_true", help="不等待 start 指令直接推流")
+    parser.add_argument("--duration", type=float, default=0.0, help="运行时长（秒），0 表示直到 Ctrl+C")
+    args = parser.parse_args(argv)
+
+    setup_basic_logging()
+    simulator = InsoleSimulator(
+        feet=args.feet,
+        rate=args.rate,
+        target_ip=args.target_ip,
+        bind_ip=args.bind_ip,
+        left_port=args.left_port,
+        right_port=args.right_port,
+        left_remote_port=args.left_remote_port,
+        right_remote_port=args.right_remote_port,
+        cadence=args.cadence,
+        loss=args.loss,
+        reorder=args.reorder,
+        malformed=args.malformed,
+        seed=args.seed,
+    )
+    simulator.start(autostart=args.autostart)
+    LOG.info("模拟器已启动: feet=%s rate=%sHz", args.feet, args.rate)
+    deadline = time.monotonic() + args.duration if args.duration > 0 else None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(1.0)
+            LOG.info("发送统计 %s", simulator.stats.as_dict())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        LOG.info("模拟器已停止，统计 %s", simulator.stats.as_dict())
+
+
+if __name__ == "__main__":
+    main()
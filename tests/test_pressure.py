@@ -0,0 +1,70 @@
+"""校准网格与旧版逐点算法逐位一致。
+
+tests/data/pressure_golden.npz 由基线提交中逐点查表 + IDW 插值的 `compute_pressure_matrix`
+生成，覆盖全部点位标定、稀疏标定与仓库自带标定 CSV 三种情况。
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pytest
+
+from hardware.insole.constants import COLS, ROWS
+from hardware.insole.core.calibration import fit_calibration_from_csv
+from hardware.insole.core.pressure import apply_calibration_grid, compile_calibration_grid, compute_pressure_matrix
+
+Params = Dict[str, Tuple[float, float]]
+
+GOLDEN = Path(__file__).parent / "data" / "pressure_golden.npz"
+CALIBRATE_DATA = Path(__file__).resolve().parents[1] / "hardware" / "insole" / "calibrate_data"
+
+
+def _full(is_left: bool) -> Params:
+    """覆盖全部点位，左脚用“左脚r-c”（1 基）、右脚用“r-c”（0 基）键名。"""
+    params: Params = {}
+    for row in range(ROWS):
+        for col in range(COLS):
+            slope = 0.002 + 0.0001 * ((row * 7 + col * 3) % 11)
+            intercept = -0.3 + 0.05 * ((row + col) % 7)
+            key = f"左脚{row + 1}-{col + 1}" if is_left else f"{row}-{col}"
+            params[key] = (slope, intercept)
+    return params
+
+
+def _sparse(is_left: bool) -> Params:
+    """每 7 个点位保留一个标定点，其余依赖 IDW 插值。"""
+    return {key: value for index, (key, value) in enumerate(_full(is_left).items()) if index % 7 == 0}
+
+
+def _cases() -> Dict[str, Tuple[Params, Params]]:
+    return {
+        "full": (_full(True), _full(False)),
+        "sparse": (_sparse(True), _sparse(False)),
+        "csv": (
+            fit_calibration_from_csv(CALIBRATE_DATA / "Calibratedata_left.csv"),
+            fit_calibration_from_csv(CALIBRATE_DATA / "Calibratedata_right.csv"),
+        ),
+    }
+
+
+@pytest.fixture(scope="module")
+def golden() -> Dict[str, np.ndarray]:
+    with np.load(GOLDEN) as data:
+        return {key: data[key] for key in data.files}
+
+
+@pytest.mark.parametrize("case", ["full", "sparse", "csv"])
+@pytest.mark.parametrize("side", ["left", "right"])
+def test_matches_per_cell_algorithm(golden: Dict[str, np.ndarray], case: str, side: str) -> None:
+    left, right = _cases()[case]
+    is_left = side == "left"
+    expected = golden[f"{case}_{side}"]
+    grid = compile_calibration_grid(is_left, left, right)
+    # 单帧与批量形状都必须与逐点实现完全相同
+    for ad, want in zip(golden["ad"], expected):
+        np.testing.assert_array_equal(compute_pressure_matrix(ad, is_left, left, right), want)
+        np.testing.assert_array_equal(apply_calibration_grid(ad, grid), want)
+    np.testing.assert_array_equal(apply_calibration_grid(golden["ad"], grid), expected)
@@ -0,0 +1,58 @@
+"""触发式记录的阈值上升沿判断。"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from hardware.insole.constants import COLS, ROWS
+from hardware.insole.io.trigger import TriggeredRecorder
+
+
+class _MemoryLogger:
+    """只在内存中收集帧的日志对象，提供 TriggeredRecorder 需要的 append/active。"""
+
+    active = True
+
+    def __init__(self) -> None:
+        self.frames: List[Any] = []
+
+    def append(self, side_is_left: bool, pmatrix: np.ndarray, ts: float | None = None) -> None:
+        self.frames.append((side_is_left, ts))
+
+
+def _make_recorder(events: List[Dict[str, Any]]) -> TriggeredRecorder:
+    return TriggeredRecorder(
+        _MemoryLogger(),  # type: ignore[arg-type]
+        pre_seconds=1.0,
+        post_seconds=100.0,
+        threshold=100.0,
+        max_rate=400.0,
+        on_trigger=events.append,
+    )
+
+
+def test_alternating_feet_trigger_once_while_one_foot_stays_loaded() -> None:
+    events: List[Dict[str, Any]] = []
+    recorder = _make_recorder(events)
+    loaded = np.full((ROWS, COLS), 10.0, dtype=np.float32)
+    idle = np.zeros((ROWS, COLS), dtype=np.float32)
+    for index in range(200):
+        is_left = index % 2 == 0
+        recorder.append(is_left, loaded if is_left else idle, ts=index * 0.005)
+    assert len(events) == 1
+    assert events[0]["reason"] == "threshold"
+    assert not events[0]["extended"]
+
+
+def test_each_foot_rising_edge_triggers() -> None:
+    events: List[Dict[str, Any]] = []
+    recorder = _make_recorder(events)
+    loaded = np.full((ROWS, COLS), 10.0, dtype=np.float32)
+    idle = np.zeros((ROWS, COLS), dtype=np.float32)
+    frames = [(True, idle), (False, idle), (True, loaded), (False, idle), (True, loaded), (False, loaded)]
+    for index, (is_left, matrix) in enumerate(frames * 3):
+        recorder.append(is_left, matrix, ts=index * 0.005)
+    # 每轮左脚与右脚各有一次上升沿
+    assert len(events) == 6
@@ -1,12 +1,14 @@
 """Communication helpers exported for external modules."""
 
 from .ble import BleCommunicationError, BleDeviceClient, BleDeviceProfile
-from .udp import UdpReceiver, UdpSender
+from .udp import ReceiveOptions, UdpReceiver, UdpReceiverGroup, UdpSender
 
 __all__ = [
 	"BleCommunicationError",
 	"BleDeviceClient",
 	"BleDeviceProfile",
+	"ReceiveOptions",
 	"UdpReceiver",
+	"UdpReceiverGroup",
 	"UdpSender",
 ]
\ No newline at end of file
@@ -1,8 +1,89 @@
 """对 UDP 收发能力的轻量封装，提供线程安全的发送与监听工具。"""
 
+import logging
+import selectors
 import socket
+import struct
+import sys
 import threading
-from typing import Callable, Optional
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LOG = logging.getLogger(__name__)
+
+# Linux 专有的 socket 选项，标准库 socket 模块未导出对应常量
+_IS_LINUX = sys.platform.startswith("linux")
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35)
+SO_RXQ_OVFL = getattr(socket, "SO_RXQ_OVFL", 40)
+_TIMESPEC = struct.Struct("@ll")
+_DROP_COUNTER = struct.Struct("@I")
+
+
+@dataclass
+class ReceiveOptions:
+    """UDP 接收 socket 的调优选项，仅在二进制模式下提供内核时间戳与丢包计数。"""
+
+    rcvbuf: Optional[int] = None
+    kernel_timestamps: bool = False
+    track_drops: bool = False
+
+    @property
+    def needs_ancillary(self) -> bool:
+        """是否需要通过 recvmsg 读取控制消息。"""
+        return _IS_LINUX and (self.kernel_timestamps or self.track_drops)
+
+    @property
+    def ancillary_size(self) -> int:
+        """控制消息缓冲区大小。"""
+        return socket.CMSG_SPACE(_TIMESPEC.size) + socket.CMSG_SPACE(_DROP_COUNTER.size)
+
+
+def _open_udp_socket(bind_ip: str, local_port: int, options: ReceiveOptions) -> socket.socket:
+    """创建并绑定 UDP socket，按需设置接收缓冲区、内核时间戳与溢出计数。"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # 允许端口快速复用
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if options.rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, int(options.rcvbuf))
+            actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            LOG.debug("UDP %s SO_RCVBUF 请求 %s，实际 %s", local_port, options.rcvbuf, actual)
+        if options.kernel_timestamps or options.track_drops:
+            if not _IS_LINUX:
+                LOG.warning("当前平台不支持内核接收时间戳与丢包计数，已忽略")
+            if _IS_LINUX and options.kernel_timestamps:
+                sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+            if _IS_LINUX and options.track_drops:
+                sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        sock.bind((bind_ip, local_port))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _recv_with_meta(
+    sock: socket.socket,
+    view: memoryview,
+    options: ReceiveOptions,
+) -> Tuple[int, float, Optional[int]]:
+    """接收一个数据包到 view，返回 (长度, 接收时间, 内核累计丢包数或 None)。"""
+    if not options.needs_ancillary:
+        length = sock.recv_into(view)
+        return length, time.time(), None
+    length, ancdata, _, _ = sock.recvmsg_into([view], options.ancillary_size)
+    recv_ts: Optional[float] = None
+    drops: Optional[int] = None
+    for level, kind, data in ancdata:
+        if level != socket.SOL_SOCKET:
+            continue
+        if kind == SO_TIMESTAMPNS and len(data) >= _TIMESPEC.size:
+            seconds, nanos = _TIMESPEC.unpack_from(data)
+            recv_ts = seconds + nanos * 1e-9
+        elif kind == SO_RXQ_OVFL and len(data) >= _DROP_COUNTER.size:
+            drops = _DROP_COUNTER.unpack_from(data)[0]
+    return length, recv_ts if recv_ts is not None else time.time(), drops
 
 
 class UdpSender:
@@ -39,28 +120,49 @@ class UdpReceiver:
     """
     简单的 UDP 监听器：在单独线程中阻塞接收，每次回调传入文本帧。
     回调签名: (frame: str, port: int) -> None
+
+    binary=True 时改用预分配的缓冲环 + recv_into，避免逐包分配 bytes 与解码字符串，
+    回调签名变为 (view: memoryview, length: int, port: int, recv_ts: float) -> None。
+    view 指向环中的一个槽位，仅在之后 ring_size - 1 个数据包内保持有效，
+    需要长期保存时请自行复制。二进制模式下可通过 options 启用内核接收时间戳
+    （SO_TIMESTAMPNS）与内核丢包计数（SO_RXQ_OVFL）。
     """
 
-    def __init__(self, local_port: int, on_frame: Callable[[str, int], None], bind_ip: str = "0.0.0.0"):
+    def __init__(
+        self,
+        local_port: int,
+        on_frame: Callable[..., None],
+        bind_ip: str = "0.0.0.0",
+        *,
+        binary: bool = False,
+        buffer_size: int = 65536,
+        ring_size: int = 8,
+        options: Optional[ReceiveOptions] = None,
+    ):
         """初始化监听器，指定本地端口、回调与绑定地址。"""
 
         self.local_port = local_port
         self.on_frame = on_frame
         self.bind_ip = bind_ip
+        self.binary = binary
+        self.options = options or ReceiveOptions()
+        self.drop_count = 0
         self._sock: Optional[socket.socket] = None
         self._thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
+        self._ring: List[memoryview] = []
+        if binary:
+            size = max(1, int(buffer_size))
+            self._ring = [memoryview(bytearray(size)) for _ in range(max(1, int(ring_size)))]
 
     def start(self) -> None:
         """启动监听线程，若线程已存在则忽略。"""
         if self._thread and self._thread.is_alive():
             return
         self._stop.clear()
-        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        # 允许端口快速复用
-        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._sock.bind((self.bind_ip, self.local_port))
-        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._sock = _open_udp_socket(self.bind_ip, self.local_port, self.options)
+        target = self._run_binary if self.binary else self._run
+        self._thread = threading.Thread(target=target, daemon=True)
         self._thread.start()
 
     def stop(self) -> None:
@@ -88,4 +190,224 @@ class UdpReceiver:
                 break
             except Exception:
                 # 吞掉解析异常，继续接收
-                continue
\ No newline at end of file
+                continue
+
+    def _run_binary(self) -> None:
+        """线程入口（二进制模式）：轮流复用缓冲槽位接收数据，不产生额外分配。"""
+        sock = self._sock
+        assert sock is not None
+        ring = self._ring
+        slots = len(ring)
+        port = self.local_port
+        options = self.options
+        index = 0
+        while not self._stop.is_set():
+            view = ring[index]
+            try:
+                length, recv_ts, drops = _recv_with_meta(sock, view, options)
+            except OSError:
+                # 套接字关闭时退出
+                break
+            if drops is not None:
+                self.drop_count = drops
+            index = (index + 1) % slots
+            try:
+                if self.on_frame:
+                    self.on_frame(view, length, port, recv_ts)
+            except Exception:
+                # 吞掉解析异常，继续接收
+                continue
+
+
+class UdpReceiverGroup:
+    """
+    基于 selectors 的多端口 UDP 监听器：单个 I/O 线程服务任意数量的端口。
+    每次唤醒以非阻塞方式排空所有就绪 socket，回调签名与 UdpReceiver 相同，
+    回调中的 port 为数据到达的本地端口。运行期间可随时增删端口。
+    """
+
+    def __init__(
+        self,
+        on_frame: Callable[..., None],
+        bind_ip: str = "0.0.0.0",
+        *,
+        binary: bool = False,
+        buffer_size: int = 65536,
+        ring_size: int = 8,
+        max_batch: int = 64,
+        options: Optional[ReceiveOptions] = None,
+    ):
+        """初始化监听组，端口通过 add_port/set_ports 登记。"""
+
+        self.on_frame = on_frame
+        self.bind_ip = bind_ip
+        self.binary = binary
+        self.options = options or ReceiveOptions()
+        self._drops: Dict[int, int] = {}
+        self._buffer_size = max(1, int(buffer_size))
+        self._max_batch = max(1, int(max_batch))
+        self._ring = [memoryview(bytearray(self._buffer_size)) for _ in range(max(1, int(ring_size)))]
+        self._ring_index = 0
+        self._lock = threading.Lock()
+        self._sockets: Dict[int, socket.socket] = {}
+        self._pending: List[Tuple[str, int, Optional[socket.socket]]] = []
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def ports(self) -> List[int]:
+        """返回当前已登记的本地端口。"""
+        with self._lock:
+            return sorted(self._sockets)
+
+    def drop_counts(self) -> Dict[int, int]:
+        """返回各端口的内核累计丢包数（需启用 options.track_drops）。"""
+        with self._lock:
+            return {port: self._drops.get(port, 0) for port in sorted(self._sockets)}
+
+    def add_port(self, local_port: int) -> None:
+        """绑定并登记新端口；绑定失败时直接向调用方抛出异常。"""
+        with self._lock:
+            if local_port in self._sockets:
+                return
+            sock = _open_udp_socket(self.bind_ip, local_port, self.options)
+            sock.setblocking(False)
+            self._sockets[local_port] = sock
+            self._drops[local_port] = 0
+            self._pending.append(("add", local_port, sock))
+        self._wake()
+
+    def remove_port(self, local_port: int) -> None:
+        """注销端口并关闭对应 socket，未登记的端口忽略。"""
+        with self._lock:
+            sock = self._sockets.pop(local_port, None)
+            if sock is None:
+                return
+            self._drops.pop(local_port, None)
+            self._pending.append(("remove", local_port, sock))
+        self._wake()
+
+    def set_ports(self, ports: Iterable[int]) -> None:
+        """将端口集合同步为给定列表，多余端口注销，缺失端口补充绑定。"""
+        wanted = {int(port) for port in ports}
+        for port in set(self.ports) - wanted:
+            self.remove_port(port)
+        for port in sorted(wanted):
+            self.add_port(port)
+
+    def start(self) -> None:
+        """启动 I/O 线程，若线程已存在则忽略。"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, name="UdpReceiverGroup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止 I/O 线程并关闭全部端口。"""
+        self._stop.set()
+        self._wake()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        with self._lock:
+            sockets = list(self._sockets.values())
+            sockets.extend(sock for _, _, sock in self._pending if sock is not None)
+            self._sockets.clear()
+            self._pending.clear()
+        for sock in sockets:
+            sock.close()
+        for attr in ("_wake_r", "_wake_w"):
+            sock = getattr(self, attr)
+            if sock is not None:
+                sock.close()
+            setattr(self, attr, None)
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+    def _wake(self) -> None:
+        """写入一个字节唤醒 I/O 线程，使其处理端口变更或退出。"""
+        wake_w = self._wake_w
+        if wake_w is None:
+            return
+        try:
+            wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _apply_pending(self, selector: selectors.BaseSelector) -> None:
+        """在 I/O 线程中执行挂起的端口增删，避免与 select 并发修改。"""
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+        for action, port, sock in pending:
+            assert sock is not None
+            if action == "add":
+                selector.register(sock, selectors.EVENT_READ, port)
+            else:
+                try:
+                    selector.unregister(sock)
+                except (KeyError, ValueError):
+                    pass
+                sock.close()
+
+    def _run(self) -> None:
+        """线程入口：等待任意端口就绪，并一次性排空就绪 socket。"""
+        selector = self._selector
+        wake_r = self._wake_r
+        assert selector is not None and wake_r is not None
+        self._apply_pending(selector)
+        while not self._stop.is_set():
+            try:
+                events = selector.select()
+            except OSError:
+                break
+            for key, _ in events:
+                if key.data is None:
+                    try:
+                        while wake_r.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    self._apply_pending(selector)
+                    continue
+                self._drain(key.fileobj, key.data)  # type: ignore[arg-type]
+
+    def _drain(self, sock: socket.socket, port: int) -> None:
+        """非阻塞地读取单个 socket 中的积压数据，单次最多 max_batch 个包以保证公平。"""
+        ring = self._ring
+        slots = len(ring)
+        options = self.options
+        for _ in range(self._max_batch):
+            try:
+                if self.binary:
+                    view = ring[self._ring_index]
+                    length, recv_ts, drops = _recv_with_meta(sock, view, options)
+                    self._ring_index = (self._ring_index + 1) % slots
+                    if drops is not None:
+                        self._drops[port] = drops
+                else:
+                    data = sock.recv(self._buffer_size)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # 套接字已被注销关闭
+                return
+            try:
+                if not self.on_frame:
+                    continue
+                if self.binary:
+                    self.on_frame(view, length, port, recv_ts)
+                else:
+                    self.on_frame(data.decode("utf-8", errors="ignore"), port)
+            except Exception:
+                # 吞掉解析异常，继续接收
+                continue
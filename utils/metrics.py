@@ -0,0 +1,112 @@
+"""轻量级延迟统计工具：固定分桶直方图与按阶段聚合的计时器。"""
+
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Mapping, Sequence
+
+
+class LatencyHistogram:
+    """对数固定分桶的延迟直方图，记录开销为一次二分查找，可估算 p50/p95/p99。
+
+    桶边界从 min_seconds 起按每个倍频程 buckets_per_octave 个桶递增至 max_seconds，
+    分位数以所在桶的上界（且不超过观测最大值）近似，相对误差约 2^(1/buckets_per_octave)。
+    调用方负责加锁，参见 `StageMetrics`。
+    """
+
+    def __init__(
+        self,
+        *,
+        min_seconds: float = 1e-6,
+        max_seconds: float = 10.0,
+        buckets_per_octave: int = 4,
+    ) -> None:
+        octaves = math.log2(max_seconds / min_seconds)
+        count = int(math.ceil(octaves * buckets_per_octave)) + 1
+        self._bounds: List[float] = [min_seconds * 2 ** (i / buckets_per_octave) for i in range(count)]
+        self._counts: List[int] = [0] * (count + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """登记一次耗时（秒），负值按 0 处理。"""
+        if seconds < 0:
+            seconds = 0.0
+        self._counts[bisect_left(self._bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """返回第 q 百分位（0-100）的近似耗时（秒），无数据时返回 0。"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * q / 100.0)))
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            if seen >= rank:
+                if index >= len(self._bounds):
+                    return self.max
+                return min(self._bounds[index], self.max)
+        return self.max
+
+    def reset(self) -> None:
+        """清空全部计数。"""
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def snapshot(self) -> Dict[str, float | int]:
+        """以毫秒为单位输出计数、均值、最大值与常用分位数。"""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_ms": mean * 1e3,
+            "max_ms": self.max * 1e3,
+            "p50_ms": self.percentile(50) * 1e3,
+            "p95_ms": self.percentile(95) * 1e3,
+            "p99_ms": self.percentile(99) * 1e3,
+        }
+
+
+class StageMetrics:
+    """按阶段名聚合多个直方图，一帧的全部阶段耗时在一次加锁内登记。"""
+
+    def __init__(self, stages: Sequence[str]) -> None:
+        self._lock = threading.Lock()
+        self._stages = list(stages)
+        self._histograms: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in self._stages}
+
+    @property
+    def stages(self) -> List[str]:
+        """返回阶段名称列表，顺序与构造时一致。"""
+        return list(self._stages)
+
+    def record(self, durations: Mapping[str, float]) -> None:
+        """登记一组阶段耗时（秒），未知阶段忽略。"""
+        with self._lock:
+            for stage, seconds in durations.items():
+                histogram = self._histograms.get(stage)
+                if histogram is not None:
+                    histogram.record(seconds)
+
+    def snapshot(self, *, reset: bool = False) -> Dict[str, Dict[str, float | int]]:
+        """输出各阶段统计，reset=True 时在读取后清零，用于按周期上报。"""
+        with self._lock:
+            result = {name: self._histograms[name].snapshot() for name in self._stages}
+            if reset:
+                for histogram in self._histograms.values():
+                    histogram.reset()
+        return result
+
+    def reset(self) -> None:
+        """清空全部阶段的统计。"""
+        with self._lock:
+            for histogram in self._histograms.values():
+                histogram.reset()